@@ -3,7 +3,18 @@ The primary application script for Froggit
 
     app.py      (the primary controller class)
     level.py    (the subcontroller for a single game level)
+    cache.py    (caches for labels and other graphics objects)
+    compiler.py (the level compiler and compiled level cache)
     models.py   (the model classes)
+    lanes.py    (the lane classes)
+    engine.py   (the headless simulation of a level)
+    endless.py  (the endless generated level)
+    env.py      (the training environments for agents)
+    profiler.py (the frame profiler)
+    replay.py   (recording and playing back games)
+    bench.py    (the benchmark suite, run on its own)
+    batch.py    (plays levels many times, run on its own)
+    analyze.py  (checks levels before they ship, run on its own)
     consts.py   (the application constants)
 
     Fonts         (fonts to use for GLabel)
@@ -12,6 +23,9 @@ The primary application script for Froggit
     JSON          (json files with the game data)
 
 """
+import consts
+consts.parseargs()
+
 from consts import *
 from app import *
 
@@ -0,0 +1,1109 @@
+"""
+Level analyzer for Froggit
+
+This module checks a level before it ships: whether every exit can be reached, how soon
+all of the exits can be filled, and which lanes hold the frog up the most. To analyze
+some levels, type
+
+    python analyze.py easy2.json hard.json
+
+in the folder with the code. Use python analyze.py --help to see the options.
+
+The analyzer searches every way the frog can play at once, one animation frame at a
+time, with the rules of the Simulation (engine.py): cars hit the hitbox of the frog,
+logs carry a frog whose center is on them, and the hedge lets the frog into an empty
+exit or an open and pushes it back anywhere else. The frog may move whenever its
+cooldown is over, or wait.
+
+The search is a breadth-first search over (row, x, frame). The x coordinates of a row
+are the bits of one int, one bit per unit of the ring of the lane, so a single frame
+of the whole search is a few int operations per row. In a road or the hedge, bit i is
+the x coordinate i/scale-margin; in the water, bit u is a place on the ring that moves
+with the logs, so a frog riding a log keeps its bit. Each frame of a lane is the mask
+of its starting units turned by how far the lane has moved, which only depends on the
+frame modulo the period of the lane. These tables are kept in a cache shared by every
+level, so candidate levels with the same lanes do not compute them again.
+
+The completion time tries every order of the exits, which takes up to 2**n searches
+for n exits. With more than ANALYZE_ORDERS exits, the frogs fill the exits in the
+order they reach them instead, and the time is reported as an upper bound. A level
+that takes more than ANALYZE_BUDGET seconds (or the --budget option) is cut short and
+reported with 'timeout', so that one level cannot hold up a batch.
+
+A unit is 1/scale of a pixel, where scale is the smallest number for which every lane
+moves a whole number of units each frame (a lane at 100 pixels per second moves 5/3 of
+a pixel a frame at 60 frames per second, so scale is 3). A frog is then always on a
+whole unit, even after riding a log, and the analysis follows the Simulation exactly.
+If that would take more than ANALYZE_SCALE units a pixel (or the --scale option), that
+many are used and the lanes are kept to the nearest unit; a frog that clears the edge
+of a car or a log by less than half a unit for each time it got on or off a log may
+then be counted either way.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from engine import *
+from compiler import *
+from collections import OrderedDict
+from fractions import Fraction
+import argparse
+import heapq
+import json
+import math
+import time
+
+# The longest the search looks ahead, in seconds of simulation time
+ANALYZE_SECONDS = 120
+# The longest lane period (in frames) whose frames are kept in a table
+ANALYZE_PERIOD = 100000
+# The most lane tables kept in the cache
+ANALYZE_CACHE = 4096
+# The number of bottleneck lanes to report
+ANALYZE_BOTTLENECKS = 3
+# The most units a pixel is split into
+ANALYZE_SCALE = 60
+# The most exits for which every order is tried to find the completion time
+ANALYZE_ORDERS = 6
+# The most seconds (of real time) spent on one level
+ANALYZE_BUDGET = 10.0
+
+# The lane tables of the levels analyzed so far, by the contents of the lane, from the
+# least recently used to the most
+_tables = OrderedDict()
+
+
+class LaneTable(object):
+    """
+    A class with the unit masks of one lane, for every frame of its period.
+
+    A lane keeps the mask of the units it covers at the start. The mask of a
+    later frame is the same mask turned by the offset of the lane, and is kept
+    in a table indexed by the frame modulo the period of the lane (or by the
+    frame, if the period is too long). Unit i is the x coordinate i/scale-margin.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _kind: the lane type
+    # Invariant: _kind is LANE_GRASS, LANE_ROAD, LANE_WATER or LANE_HEDGE
+    #
+    # Attribute _size: the number of units of the ring of the lane
+    # Invariant: _size is an int > 0
+    #
+    # Attribute _step: how far the lane moves each frame, in units
+    # Invariant: _step is a Fraction
+    #
+    # Attribute _frames: the period of the lane in frames
+    # Invariant: _frames is an int > 0, or None if the lane does not repeat
+    # within ANALYZE_PERIOD frames
+    #
+    # Attribute _offsets: the offset in units of each frame seen so far
+    # Invariant: _offsets is a dictionary mapping table indices to ints
+    #
+    # Attribute _masks: the masks of the frames seen so far, by name
+    # Invariant: _masks is a dictionary mapping names to dictionaries mapping
+    # table indices to ints
+    #
+    # Attribute _rings: the mask of each name at the start
+    # Invariant: _rings is a dictionary mapping names to ints. A road has 'car'
+    # (the x coordinates where a car hits the frog), the water has 'log' (the
+    # places on a log) and 'ride' (the same one frame later), and a hedge has
+    # 'exit' and 'open'
+    #
+    # Attribute _exits: the mask of each exit of a hedge at the start
+    # Invariant: _exits is a list of ints
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getkind(self):
+        """
+        Returns the lane type
+        """
+        return self._kind
+
+    def getexits(self):
+        """
+        Returns the number of exits of a hedge (0 for other lanes)
+        """
+        return len(self._exits)
+
+    # INITIALIZER TO MAKE THE STARTING MASKS
+    def __init__(self,kind,step,centers,boxes,opens,size,frogbox):
+        """
+        Initializes the table of a lane.
+
+        All of the lengths are in units (see getscale).
+
+        Parameter kind: the lane type
+        Precondition: kind is LANE_GRASS, LANE_ROAD, LANE_WATER or LANE_HEDGE
+
+        Parameter step: how far the lane moves each frame
+        Precondition: step is a Fraction
+
+        Parameter centers: the center of each obstacle at the start, plus margin
+        Precondition: centers is a tuple of floats in [0,size)
+
+        Parameter boxes: the hitbox of each obstacle, mirrored if step < 0
+        Precondition: boxes is a tuple of (lo,hi) tuples, the length of centers
+
+        Parameter opens: whether each obstacle is an open of a hedge
+        Precondition: opens is a tuple of bools, the length of centers
+
+        Parameter size: the number of units of the ring of the lane
+        Precondition: size is an int > 0
+
+        Parameter frogbox: the hitbox of the frog, relative to its center
+        Precondition: frogbox is a (lo,hi) tuple
+        """
+        self._kind = kind
+        self._size = size
+        self._step = step
+        self._frames = None
+        if step == 0:
+            self._frames = 1
+        else:
+            frames = size/abs(step)
+            if frames.numerator <= ANALYZE_PERIOD:
+                self._frames = frames.numerator
+        self._offsets = {}
+        self._masks = {}
+        self._rings = {}
+        self._exits = []
+
+        if kind == LANE_ROAD:
+            ring = 0
+            for center, (lo, hi) in zip(centers,boxes):
+                ring |= _span(center+lo-frogbox[1],center+hi-frogbox[0],size)
+            self._rings['car'] = ring
+        elif kind == LANE_WATER:
+            ring = 0
+            for center, (lo, hi) in zip(centers,boxes):
+                ring |= _span(center+lo,center+hi,size)
+            self._rings['log'] = ring
+            # a riding frog is checked before it is carried, one frame behind
+            self._rings['ride'] = _turn(ring,round(step),size)
+        elif kind == LANE_HEDGE:
+            self._rings['exit'] = 0
+            self._rings['open'] = 0
+            for center, (lo, hi), isopen in zip(centers,boxes,opens):
+                span = _span(center+lo,center+hi,size)
+                if isopen:
+                    self._rings['open'] |= span
+                else:
+                    self._rings['exit'] |= span
+                    self._exits.append(span)
+
+    # PUBLIC NECESSARY HELPERS
+    def getoffset(self,frame):
+        """
+        Returns how far the lane has moved at frame, in units modulo the ring.
+
+        Parameter frame: the animation frame (the Simulation time is frame/TICK_RATE)
+        Precondition: frame is an int >= 0
+        """
+        index = self._index(frame)
+        offset = self._offsets.get(index)
+        if offset is None:
+            offset = round(frame*self._step) % self._size
+            self._offsets[index] = offset
+        return offset
+
+    def getmask(self,name,frame):
+        """
+        Returns the mask name at frame.
+
+        For a road or a hedge, bit i is the x coordinate i/scale-margin. For the water,
+        bit u is a place on the ring of the lane, so the masks are the same in
+        every frame.
+
+        Parameter name: the name of the mask (see _rings)
+        Precondition: name is a name of a mask of this lane
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int >= 0
+        """
+        if self._kind == LANE_WATER:
+            return self._rings[name]
+        table = self._masks.setdefault(name,{})
+        index = self._index(frame)
+        mask = table.get(index)
+        if mask is None:
+            mask = _turn(self._rings[name],self.getoffset(frame),self._size)
+            table[index] = mask
+        return mask
+
+    def getexit(self,exit,frame):
+        """
+        Returns the mask of one exit of a hedge at frame.
+
+        Parameter exit: the exit, in the order of the level JSON
+        Precondition: exit is an int in range(getexits())
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int >= 0
+        """
+        return _turn(self._exits[exit],self.getoffset(frame),self._size)
+
+    # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
+    def _index(self,frame):
+        """
+        Returns the table index of frame.
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int >= 0
+        """
+        if self._frames is None:
+            return frame
+        return frame % self._frames
+
+
+class Analyzer(object):
+    """
+    A class that searches the ways the frog can play one level.
+
+    The search from a frame keeps, for each row, the mask of the frogs that may
+    move now, and the masks of the frogs still waiting out their cooldown. Each
+    frame, the frogs that are hit or fall in the water are removed, and every
+    frog that may move adds the four moves to the masks (it may also wait).
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _tables: the table of each lane, from bottom to top
+    # Invariant: _tables is a list of LaneTable
+    #
+    # Attribute _scale: the number of units in a pixel
+    # Invariant: _scale is an int > 0
+    #
+    # Attribute _size: the number of units of the ring of every lane
+    # Invariant: _size is an int > 0
+    #
+    # Attribute _margin: the offscreen buffer in units
+    # Invariant: _margin is a non-negative int
+    #
+    # Attribute _width: the width of the level in units
+    # Invariant: _width is an int > 0
+    #
+    # Attribute _start: the row and unit where the frog starts
+    # Invariant: _start is a (row,unit) tuple of ints
+    #
+    # Attribute _frogwidth: the width of the hitbox of the frog in units
+    # Invariant: _frogwidth is a number > 0
+    #
+    # Attribute _cooldown: the frames after a move before the frog may move again
+    # Invariant: _cooldown is an int > 0
+    #
+    # Attribute _exits: the (row,exit) of every exit, in order
+    # Invariant: _exits is a list of (int,int) tuples
+    #
+    # Attribute _edges: the units where the frog may move left and right, and
+    # where a frog on a log is still on the screen
+    # Invariant: _edges is a dictionary mapping 'left', 'right' and 'screen' to
+    # masks of x coordinates (bit i is x = i/scale-margin)
+    #
+    # Attribute _deadline: the time (of time.perf_counter) when searches stop
+    # Invariant: _deadline is a float, or None if searches are not timed
+    #
+    # Attribute _timeout: whether a search stopped at the deadline
+    # Invariant: _timeout is a bool
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getscale(self):
+        """
+        Returns the number of units in a pixel
+        """
+        return self._scale
+
+    def getexits(self):
+        """
+        Returns the list of (row,column) of the exits at the start
+        """
+        return [(row,self._column(self._tables[row].getexit(exit,0)))
+                for row, exit in self._exits]
+
+    def getcooldown(self):
+        """
+        Returns the frames after a move before the frog may move again
+        """
+        return self._cooldown
+
+    # INITIALIZER TO LOAD THE LEVEL
+    def __init__(self,level,shapes=None,scale=ANALYZE_SCALE):
+        """
+        Initializes an analyzer for the given level.
+
+        Parameter level: the level
+        Precondition: level is a CompiledLevel or a dictionary in the level JSON
+        format
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+
+        Parameter scale: the most units a pixel is split into (1 is the fastest,
+        but keeps the lanes to the nearest pixel)
+        Precondition: scale is an int > 0
+        """
+        if shapes is None:
+            shapes = {}
+        if not isinstance(level,CompiledLevel):
+            level = compilelevel(level)
+        rows = range(level.getlanecount())
+        scale = self._scale = _getscale([level.getspeed(row) for row in rows],scale)
+        self._margin = level.getoffscreen()*GRID_SIZE*scale
+        self._width = level.getsize()[0]*GRID_SIZE*scale
+        self._size = self._width+2*self._margin
+        lo, hi = getshape(shapes,FROG_IMAGE[:-4])
+        frogbox = (lo*scale,hi*scale)
+        self._frogwidth = frogbox[1]-frogbox[0]
+        start = level.getstart()
+        self._start = (int(start[1]),
+            int(round((start[0]*GRID_SIZE+0.5*GRID_SIZE)*scale))+self._margin)
+
+        names = level.getnames()
+        self._tables = []
+        self._exits = []
+        for row in rows:
+            table = gettable(level.getkind(row),level.getspeed(row),
+                [names[kind] for kind in level.gettypes(row)],
+                level.getpositions(row),shapes,self._size,self._margin,frogbox,scale)
+            self._tables.append(table)
+            for exit in range(table.getexits()):
+                self._exits.append((row,exit))
+
+        # the cooldown runs out the same way as in Simulation._whichkeypressed
+        dt = 1.0/TICK_RATE
+        left = FROG_SPEED
+        self._cooldown = 1
+        while left > dt:
+            left = left-dt
+            self._cooldown += 1
+
+        margin = self._margin
+        grid = GRID_SIZE*scale
+        edge = GRID_SIZE//4*scale
+        self._edges = {'left': _span(grid+margin,self._size,self._size),
+            'right': _span(-1,self._width-grid+margin,self._size),
+            'screen': _span(margin-edge-1,margin+self._width+edge+1,self._size)}
+        self._deadline = None
+        self._timeout = False
+
+    # PUBLIC METHODS TO SEARCH
+    def search(self,frame=0,ready=1,used=(),first=False,limit=ANALYZE_SECONDS,
+               history=None):
+        """
+        Returns (found,arrivals) after searching the ways a frog can play.
+
+        The frog is put at the start after frame, and may first move at frame
+        ready. found is a dictionary mapping each exit reached (an index into
+        the exits) to the (frame,unit) where it is first reached, and arrivals
+        is a list of the first frame at which the frog may be in each row (None
+        if it never is). The exits that already hold a safe frog are not
+        searched for. The search stops once every other exit is reached (or the
+        first one, if first is True), when no frog is left, after limit
+        seconds, or when the deadline of analyze has passed.
+
+        Parameter frame: the frame before the frog is put at the start
+        Precondition: frame is an int >= 0
+
+        Parameter ready: the first frame the frog may move (frame+1 if sooner)
+        Precondition: ready is an int at most frame+getcooldown()
+
+        Parameter used: the (exit,unit) of the safe frogs already in the exits
+        Precondition: used is a sequence of (int,int) tuples, one per exit
+
+        Parameter first: whether to stop at the first exit reached
+        Precondition: first is a bool
+
+        Parameter limit: how far ahead to search, in seconds
+        Precondition: limit is a number > 0
+
+        Parameter history: a list to add the masks of every frame to (see getpath)
+        Precondition: history is None or a list
+        """
+        rows = len(self._tables)
+        cooldown = self._cooldown
+        blocked = [0]*rows
+        for exit, unit in used:
+            blocked[self._exits[exit][0]] |= _span(unit-self._frogwidth,
+                unit+self._frogwidth,self._size)
+        found = dict.fromkeys(exit for exit, unit in used)
+
+        ready = max(ready,frame+1)
+        now = [0]*rows
+        waiting = [[0]*cooldown for row in range(rows)]
+        row, unit = self._start
+        if self._tables[row].getkind() == LANE_WATER:
+            unit = (unit-self._tables[row].getoffset(frame)) % self._size
+        if ready == frame+1:
+            now[row] = 1 << unit
+        else:
+            waiting[row][ready % cooldown] = 1 << unit
+
+        arrivals = [None]*rows
+        arrivals[row] = frame
+        if not history is None:
+            history.append((list(now),[list(slots) for slots in waiting],[0]*rows))
+        end = frame+int(limit*TICK_RATE)
+        while frame < end and len(found) < len(self._exits):
+            if not self._deadline is None and time.perf_counter() > self._deadline:
+                self._timeout = True
+                break
+            frame += 1
+            slot = frame % cooldown
+            alive = False
+            goal = [0]*rows
+            for row in range(rows):
+                slots = waiting[row]
+                if now[row] == 0 and not any(slots):
+                    continue
+                keep, safe = self._keep(row,frame,blocked[row])
+                if keep is not None:
+                    for pos in range(cooldown):
+                        mask = slots[pos]
+                        if mask:
+                            goal[row] |= mask & safe
+                            slots[pos] = mask & keep
+                    goal[row] |= now[row] & safe
+                    now[row] &= keep
+                now[row] |= slots[slot]
+                slots[slot] = 0
+                if now[row] or any(slots):
+                    alive = True
+                    if arrivals[row] is None:
+                        arrivals[row] = frame
+
+            for row in range(rows):
+                if now[row]:
+                    self._move(row,now[row],frame,waiting,slot,blocked,goal)
+            for row in range(rows):
+                if goal[row]:
+                    self._reach(row,goal[row],frame,found)
+                if arrivals[row] is None and (goal[row] or any(waiting[row])):
+                    arrivals[row] = frame
+            if not history is None:
+                history.append((list(now),[list(slots) for slots in waiting],goal))
+            if first and len(found) > len(used):
+                break
+            if not alive:
+                break
+        for exit, unit in used:
+            del found[exit]
+        return (found,arrivals)
+
+    def analyze(self,limit=ANALYZE_SECONDS,budget=ANALYZE_BUDGET):
+        """
+        Returns a dictionary with the analysis of the level.
+
+        The keys are 'exits' (a list with the row, column and earliest 'time' of
+        each exit, None if it cannot be reached), 'reachable' (True if every exit
+        can be reached), 'completion' (the time when every exit is filled, None
+        if they cannot all be), 'exact' (False if the completion is only an upper
+        bound), 'timeout' (True if the budget ran out), 'lanes' (the row, type,
+        earliest 'arrival' and 'wait' of each lane) and 'bottlenecks' (the rows
+        of the lanes the frog waits on the longest, or that it never reaches).
+
+        The wait of a lane is how much later the frog first gets into it than
+        it could if the lane were empty. The completion is the soonest the exits
+        can be filled in any order if there are at most ANALYZE_ORDERS exits.
+        Otherwise it is the time when the frogs fill them one after the other,
+        each going to the exit it reaches first (see _complete).
+
+        The search stops after budget seconds, so one level cannot hold up a
+        batch of them. If it does, the exits not found yet may still be
+        reachable, and the completion is only an upper bound (or None).
+
+        Parameter limit: how far ahead to search, in seconds
+        Precondition: limit is a number > 0
+
+        Parameter budget: the most seconds to spend (no limit if None)
+        Precondition: budget is None or a number >= 0
+        """
+        self._timeout = False
+        if not budget is None:
+            self._deadline = time.perf_counter()+budget
+        found, arrivals = self.search(limit=limit)
+        exits = []
+        for pos, (row, column) in enumerate(self.getexits()):
+            reach = found.get(pos)
+            exits.append({'row': row, 'column': column,
+                'time': None if reach is None else reach[0]/TICK_RATE})
+
+        completion = None
+        exact = True
+        if len(found) == len(self._exits) and len(self._exits) > 0:
+            frame, exact = self._complete(found,limit)
+            if not frame is None:
+                completion = frame/TICK_RATE
+        self._deadline = None
+
+        lanes = []
+        waits = []
+        unreached = []
+        for row in range(len(self._tables)):
+            arrival = arrivals[row]
+            wait = None
+            if arrival is not None and row > 0 and arrivals[row-1] is not None:
+                wait = max(arrival-arrivals[row-1]-self._cooldown,0)/TICK_RATE
+                if wait > 0:
+                    waits.append((wait,row))
+            elif arrival is None:
+                unreached.append(row)
+            lanes.append({'row': row,
+                'type': LANE_TYPES[self._tables[row].getkind()],
+                'arrival': None if arrival is None else arrival/TICK_RATE,
+                'wait': wait})
+        bottlenecks = unreached[:1]+[row for wait, row in sorted(waits,reverse=True)]
+        return {'exits': exits,
+                'reachable': len(found) == len(self._exits) and len(exits) > 0,
+                'completion': completion, 'exact': exact and not self._timeout,
+                'timeout': self._timeout, 'lanes': lanes,
+                'bottlenecks': bottlenecks[:ANALYZE_BOTTLENECKS]}
+
+    def getpath(self,exit,limit=ANALYZE_SECONDS):
+        """
+        Returns the keys that take the first frog to exit the soonest.
+
+        The result has the key of every frame, from the first frame up to the one
+        at which the frog reaches the exit: 'up', 'down', 'left', 'right', or
+        None to wait. It can be played with a ScriptedInput. The result is None
+        if the exit cannot be reached.
+
+        The search keeps the masks of every frame, and the path is followed back
+        from the exit: each frog in a mask came from a frog in the masks of the
+        frame before, or moved in this frame from a frog that was ready to.
+
+        Parameter exit: the exit, an index into getexits()
+        Precondition: exit is an int in range(len(getexits()))
+
+        Parameter limit: how far ahead to search, in seconds
+        Precondition: limit is a number > 0
+        """
+        history = []
+        found, _ = self.search(limit=limit,history=history)
+        if found.get(exit) is None:
+            return None
+        frame, unit = found[exit]
+        keys = [None]*frame
+        row = self._exits[exit][0]
+        where = 'goal'
+        while frame > 0:
+            now, waiting, goal = history[frame]
+            before, waited, _ = history[frame-1]
+            slot = frame % self._cooldown
+            if where == 'goal' or where == slot:
+                move = self._source(row,unit,frame,now,where == 'goal')
+                if not move is None:
+                    keys[frame-1], row, unit = move
+                    where = 'now'
+                    continue
+            if before[row] >> unit & 1 and (where == 'now' or where == 'goal'):
+                where = 'now'
+            elif where == 'now':
+                where = slot
+            elif where == 'goal':
+                where = [pos for pos in range(self._cooldown)
+                         if waited[row][pos] >> unit & 1][0]
+            frame -= 1
+        return keys
+
+    # HELPER METHODS FOR THE SEARCH
+    def _complete(self,found,limit):
+        """
+        Returns (frame,exact), where frame is the first frame at which every exit
+        can be filled (None if never).
+
+        The exits are filled one frog at a time, and each frog starts when the one
+        before reaches its exit, after its cooldown. With at most ANALYZE_ORDERS
+        exits, every order of the exits is tried: this is a shortest path search
+        over the sets of filled exits (kept as a bitmask), where a set is reached
+        at the frame its last exit is first filled. Each set is only searched
+        from that frame, since a frog that starts later could have waited at the
+        start instead. This takes up to 2**n searches for n exits, so with more
+        exits they are filled in the order the frogs reach them (see _greedy)
+        instead. exact is False if so, and frame is then only an upper bound (or
+        None if that order fails).
+
+        Parameter found: the exits the first frog reaches (see search)
+        Precondition: found is a dictionary mapping exit indices to (frame,unit)
+        tuples
+
+        Parameter limit: how far ahead to search for each frog, in seconds
+        Precondition: limit is a number > 0
+        """
+        queue = [(frame,1 << exit,((exit,unit),))
+                 for exit, (frame, unit) in found.items()]
+        heapq.heapify(queue)
+        if len(self._exits) > ANALYZE_ORDERS:
+            frame, filled, used = queue[0]
+            return (self._greedy(frame,used,limit),False)
+
+        full = (1 << len(self._exits))-1
+        done = set()
+        while len(queue) > 0:
+            frame, filled, used = heapq.heappop(queue)
+            if filled in done:
+                continue
+            if filled == full:
+                return (frame,True)
+            done.add(filled)
+            reach, _ = self.search(frame,frame+self._cooldown,used,False,limit)
+            for exit, (later, unit) in reach.items():
+                if not filled | 1 << exit in done:
+                    heapq.heappush(queue,(later,filled | 1 << exit,used+((exit,unit),)))
+        return (None,True)
+
+    def _greedy(self,frame,used,limit):
+        """
+        Returns the frame at which the exits are filled when each frog goes to the
+        first empty exit it can reach (None if a frog reaches none).
+
+        This takes one search per exit left.
+
+        Parameter frame: the frame the last safe frog reached its exit
+        Precondition: frame is an int >= 0
+
+        Parameter used: the (exit,unit) of the safe frogs already in the exits
+        Precondition: used is a tuple of (int,int) tuples
+
+        Parameter limit: how far ahead to search for each frog, in seconds
+        Precondition: limit is a number > 0
+        """
+        while len(used) < len(self._exits):
+            reach, _ = self.search(frame,frame+self._cooldown,used,True,limit)
+            if len(reach) == 0:
+                return None
+            exit, (frame, unit) = min(reach.items(),key=lambda item: item[1])
+            used = used+((exit,unit),)
+        return frame
+
+    def _keep(self,row,frame,blocked):
+        """
+        Returns (keep,safe), the masks of the frogs in row that stay in play
+        after frame, and of those that are safe.
+
+        This is the first half of Simulation.update: frogs in a road are hit by
+        cars, frogs in the water must be on a log (and on the screen), and frogs
+        in the hedge that are in an empty exit are safe. keep is None if every
+        frog stays in play (on the grass).
+
+        Parameter row: the row of the frogs
+        Precondition: row is an int in range of the lanes
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+
+        Parameter blocked: the units of the safe frogs in the row
+        Precondition: blocked is an int
+        """
+        table = self._tables[row]
+        kind = table.getkind()
+        if kind == LANE_ROAD:
+            return (~table.getmask('car',frame),0)
+        elif kind == LANE_WATER:
+            screen = _turn(self._edges['screen'],-table.getoffset(frame),self._size)
+            return (table.getmask('ride',frame) & screen,0)
+        elif kind == LANE_HEDGE:
+            safe = table.getmask('exit',frame) & ~blocked
+            return (~safe,safe)
+        return (None,0)
+
+    def _move(self,row,mask,frame,waiting,slot,blocked,goal):
+        """
+        Adds the four moves of the frogs of mask in row to the waiting frogs.
+
+        This is the second half of Simulation.update. A frog that is pushed back
+        by the hedge is dropped, since it is no better off than one that waits.
+
+        Parameter row: the row of the frogs
+        Precondition: row is an int in range of the lanes
+
+        Parameter mask: the frogs that may move
+        Precondition: mask is an int
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+
+        Parameter waiting: the frogs waiting out their cooldown in each row
+        Precondition: waiting is a list of lists of ints
+
+        Parameter slot: the index in waiting of the frogs moved in this frame
+        Precondition: slot is an int in range(getcooldown())
+
+        Parameter blocked: the units of the safe frogs in each row
+        Precondition: blocked is a list of ints, one per lane
+
+        Parameter goal: the frogs that reached an exit in each row
+        Precondition: goal is a list of ints, one per lane
+        """
+        for key, target, moved, how in self._moves(row,mask,frame):
+            self._land(row,target,moved,frame,waiting,slot,blocked,goal,how)
+
+    def _moves(self,row,mask,frame):
+        """
+        Returns the four moves of the frogs of mask in row, before they land.
+
+        The result is a list of (key,row,mask,how) tuples: the key that moves
+        the frogs, the row they move into, the frogs after the move (still in the
+        units of the row they moved from) and how they moved (see _land).
+
+        Parameter row: the row of the frogs
+        Precondition: row is an int in range of the lanes
+
+        Parameter mask: the frogs that may move
+        Precondition: mask is an int
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+        """
+        size = self._size
+        table = self._tables[row]
+        offset = table.getoffset(frame) if table.getkind() == LANE_WATER else 0
+        left = mask & _turn(self._edges['left'],-offset,size)
+        right = mask & _turn(self._edges['right'],-offset,size)
+        grid = GRID_SIZE*self._scale
+        moves = [('left',row,_turn(left,-grid,size),'side'),
+                 ('right',row,_turn(right,grid,size),'side')]
+        if row < len(self._tables)-1:
+            moves.append(('up',row+1,mask,'up'))
+        if row >= 1:
+            moves.append(('down',row-1,mask,'down'))
+        return moves
+
+    def _source(self,row,unit,frame,ready,safe):
+        """
+        Returns (key,row,unit) of a frog that moves to unit of row in frame, or
+        None if no frog that is ready does.
+
+        Parameter row: the row the frog moves into
+        Precondition: row is an int in range of the lanes
+
+        Parameter unit: the unit the frog moves to
+        Precondition: unit is an int in range of the units
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+
+        Parameter ready: the frogs in each row that may move in frame
+        Precondition: ready is a list of ints, one per lane
+
+        Parameter safe: whether the frog moves into an exit
+        Precondition: safe is a bool
+        """
+        rows = len(self._tables)
+        grid = GRID_SIZE*self._scale
+        offsets = [table.getoffset(frame) if table.getkind() == LANE_WATER else 0
+                   for table in self._tables]
+        for source in (row-1,row,row+1):
+            if source < 0 or source >= rows:
+                continue
+            if source == row:
+                units = (unit+grid,unit-grid)
+            else:
+                units = (unit+offsets[row]-offsets[source],)
+            for start in units:
+                start %= self._size
+                if not ready[source] >> start & 1:
+                    continue
+                for key, target, moved, how in self._moves(source,1 << start,frame):
+                    if target != row:
+                        continue
+                    waiting = [[0]*self._cooldown for pos in range(rows)]
+                    goal = [0]*rows
+                    self._land(source,row,moved,frame,waiting,0,[0]*rows,goal,how)
+                    landed = goal[row] if safe else waiting[row][0]
+                    if landed >> unit & 1:
+                        return (key,source,start)
+        return None
+
+
+    def _land(self,source,row,mask,frame,waiting,slot,blocked,goal,how):
+        """
+        Checks the frogs of mask that just moved from source into row.
+
+        See Simulation._checklane and Simulation._checkmove.
+
+        Parameter source: the row the frogs moved from
+        Precondition: source is an int in range of the lanes
+
+        Parameter row: the row the frogs moved into
+        Precondition: row is an int in range of the lanes
+
+        Parameter mask: the frogs, in the units of source
+        Precondition: mask is an int
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+
+        Parameter waiting: the frogs waiting out their cooldown in each row
+        Precondition: waiting is a list of lists of ints
+
+        Parameter slot: the index in waiting of the frogs moved in this frame
+        Precondition: slot is an int in range(getcooldown())
+
+        Parameter blocked: the units of the safe frogs in each row
+        Precondition: blocked is a list of ints, one per lane
+
+        Parameter goal: the frogs that reached an exit in each row
+        Precondition: goal is a list of ints, one per lane
+
+        Parameter how: how the frogs moved
+        Precondition: how is 'side', 'up' or 'down'
+        """
+        if mask == 0:
+            return
+        table = self._tables[row]
+        kind = table.getkind()
+        if source != row:
+            turn = 0
+            if self._tables[source].getkind() == LANE_WATER:
+                turn += self._tables[source].getoffset(frame)
+            if kind == LANE_WATER:
+                turn -= table.getoffset(frame)
+            mask = _turn(mask,turn,self._size)
+
+        if kind == LANE_ROAD:
+            mask &= ~table.getmask('car',frame)
+        elif kind == LANE_WATER:
+            mask &= table.getmask('log',frame)
+        elif kind == LANE_HEDGE:
+            if how != 'down':
+                safe = mask & table.getmask('exit',frame) & ~blocked[row]
+                goal[row] |= safe
+                mask &= ~safe
+            if how == 'side':
+                mask = 0
+            else:
+                mask &= table.getmask('open',frame)
+        waiting[row][slot] |= mask
+
+    def _reach(self,row,mask,frame,found):
+        """
+        Records the exits of row that the frogs of mask reached at frame.
+
+        Parameter row: the hedge row
+        Precondition: row is an int in range of the lanes
+
+        Parameter mask: the frogs that reached an exit
+        Precondition: mask is an int > 0
+
+        Parameter frame: the animation frame
+        Precondition: frame is an int > 0
+
+        Parameter found: the exits reached so far
+        Precondition: found is a dictionary mapping exit indices to
+        (frame,unit) tuples
+        """
+        table = self._tables[row]
+        for pos, (where, exit) in enumerate(self._exits):
+            if where == row and pos not in found:
+                hits = mask & table.getexit(exit,frame)
+                if hits:
+                    found[pos] = (frame,(hits & -hits).bit_length()-1)
+
+    def _column(self,mask):
+        """
+        Returns the grid column of the middle of the units of mask.
+
+        Parameter mask: units of a road or hedge
+        Precondition: mask is an int > 0
+        """
+        low = (mask & -mask).bit_length()-1
+        middle = (low+mask.bit_length()-1)/2-self._margin
+        return int(middle // (GRID_SIZE*self._scale))
+
+
+def gettable(kind,speed,types,positions,shapes,size,margin,frogbox,scale=1):
+    """
+    Returns the LaneTable of a lane, from the cache if it was made before.
+
+    The cache keeps the ANALYZE_CACHE tables used most recently.
+
+    The lengths are in units of 1/scale of a pixel, except for the speed.
+
+    Parameter kind: the lane type
+    Precondition: kind is LANE_GRASS, LANE_ROAD, LANE_WATER or LANE_HEDGE
+
+    Parameter speed: the speed of the lane in pixels per second
+    Precondition: speed is a number
+
+    Parameter types: the type name of each obstacle
+    Precondition: types is a list of strings
+
+    Parameter positions: the position of each obstacle in grid squares
+    Precondition: positions is a sequence of numbers, the length of types
+
+    Parameter shapes: the hitboxes of the object types
+    Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter size: the number of units of the ring of the lane
+    Precondition: size is an int > 0
+
+    Parameter margin: the offscreen buffer in units
+    Precondition: margin is a non-negative int
+
+    Parameter frogbox: the hitbox of the frog, relative to its center
+    Precondition: frogbox is a (lo,hi) tuple
+
+    Parameter scale: the number of units in a pixel
+    Precondition: scale is an int > 0
+    """
+    shift = .5*GRID_SIZE*scale+margin
+    centers = tuple((pos*GRID_SIZE*scale+shift) % size for pos in positions)
+    boxes = []
+    for name in types:
+        lo, hi = getshape(shapes,name)
+        lo, hi = lo*scale, hi*scale
+        boxes.append((-hi,-lo) if speed < 0 else (lo,hi))
+    boxes = tuple(boxes)
+    opens = tuple(name == 'open' for name in types)
+    step = _getstep(speed)*scale
+    if kind == LANE_GRASS:
+        step, centers, boxes, opens = Fraction(0), (), (), ()
+    key = (kind,step,centers,boxes,opens,size,frogbox)
+    table = _tables.get(key)
+    if table is None:
+        if len(_tables) >= ANALYZE_CACHE:
+            _tables.popitem(last=False)
+        table = LaneTable(kind,step,centers,boxes,opens,size,frogbox)
+        _tables[key] = table
+    else:
+        _tables.move_to_end(key)
+    return table
+
+
+def analyzelevel(level,shapes=None,limit=ANALYZE_SECONDS,scale=ANALYZE_SCALE,
+                 budget=ANALYZE_BUDGET):
+    """
+    Returns a dictionary with the analysis of the level (see Analyzer.analyze).
+
+    Parameter level: the level
+    Precondition: level is a CompiledLevel or a dictionary in the level JSON format
+
+    Parameter shapes: the hitboxes of the object types (optional)
+    Precondition: shapes is None or a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter limit: how far ahead to search, in seconds
+    Precondition: limit is a number > 0
+
+    Parameter scale: the most units a pixel is split into
+    Precondition: scale is an int > 0
+
+    Parameter budget: the most seconds to spend (no limit if None)
+    Precondition: budget is None or a number >= 0
+    """
+    return Analyzer(level,shapes,scale).analyze(limit,budget)
+
+
+def main(args=None):
+    """
+    Analyzes the levels and writes the results as JSON.
+
+    Parameter args: the command line arguments (sys.argv[1:] if None)
+    Precondition: args is None or a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Checks Froggit levels.')
+    parser.add_argument('levels',nargs='+',help='the level JSON files')
+    parser.add_argument('--seconds',type=float,default=ANALYZE_SECONDS,
+        help='how far ahead to search')
+    parser.add_argument('--scale',type=int,default=ANALYZE_SCALE,
+        help='the most units a pixel is split into (1 is faster but rounds)')
+    parser.add_argument('--budget',type=float,default=ANALYZE_BUDGET,
+        help='the most seconds of real time to spend on a level')
+    parser.add_argument('--objects',default=OBJECT_DATA,
+        help='the object data with the hitboxes')
+    parser.add_argument('--output',help='the file to write (standard output if none)')
+    options = parser.parse_args(args)
+    shapes = loadshapes(options.objects)
+
+    results = []
+    start = time.perf_counter()
+    for name in options.levels:
+        result = {'level': name}
+        result.update(analyzelevel(loadlevel(name),shapes,options.seconds,
+            options.scale,options.budget))
+        results.append(result)
+    elapsed = time.perf_counter()-start
+
+    report = {'tickrate': TICK_RATE, 'frogspeed': FROG_SPEED,
+              'seconds': options.seconds, 'budget': options.budget,
+              'elapsed': elapsed,
+              'levels_per_sec': len(results)/elapsed, 'results': results}
+    text = json.dumps(report,indent=2,sort_keys=True)
+    if options.output is None:
+        print(text)
+    else:
+        with open(options.output,'w') as file:
+            file.write(text+'\n')
+
+
+# HELPERS FOR THE UNIT MASKS
+def _getstep(speed):
+    """
+    Returns how far a lane at speed moves each frame, in pixels.
+
+    Parameter speed: the speed of the lane in pixels per second
+    Precondition: speed is a number
+    """
+    return Fraction(speed).limit_denominator(ANALYZE_PERIOD)/Fraction(TICK_RATE)
+
+
+def _getscale(speeds,most):
+    """
+    Returns the number of units in a pixel for lanes at the given speeds.
+
+    This is the smallest number for which every lane moves a whole number of units
+    each frame, or most if that is more.
+
+    Parameter speeds: the speed of each lane in pixels per second
+    Precondition: speeds is a sequence of numbers
+
+    Parameter most: the most units in a pixel
+    Precondition: most is an int > 0
+    """
+    scale = 1
+    for speed in speeds:
+        denominator = _getstep(speed).denominator
+        scale = scale*denominator//math.gcd(scale,denominator)
+        if scale > most:
+            return most
+    return scale
+
+
+def _span(lo,hi,size):
+    """
+    Returns the mask of the units strictly between lo and hi, around the ring.
+
+    Parameter lo: the left edge
+    Precondition: lo is a number
+
+    Parameter hi: the right edge
+    Precondition: hi is a number, with 0 <= hi-lo <= size
+    """
+    first = int(math.floor(lo))+1
+    end = min(int(math.ceil(hi)),first+size)
+    if end <= first:
+        return 0
+    shift = first % size
+    mask = ((1 << (end-first))-1) << shift
+    return (mask | (mask >> size)) & ((1 << size)-1)
+
+
+def _turn(mask,shift,size):
+    """
+    Returns the mask turned around the ring by shift units (to the right).
+
+    Parameter mask: the units
+    Precondition: mask is an int in [0,2**size)
+
+    Parameter shift: the number of units
+    Precondition: shift is an int
+
+    Parameter size: the number of units of the ring
+    Precondition: size is an int > 0
+    """
+    shift %= size
+    if shift == 0 or mask == 0:
+        return mask
+    return ((mask << shift) | (mask >> (size-shift))) & ((1 << size)-1)
+
+
+# Script code
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,10 @@ Date: December 21, 2020
 from consts import *
 from game2d import *
 from level import *
-import introcs
+from cache import *
+from compiler import *
+from profiler import *
+from replay import *
 
 from kivy.logger import Logger
 
@@ -69,6 +72,36 @@ class Froggit(GameApp):
     #
     # Attribute self._frogy: an x position of the frog to set to
     # Invariant: self._frogy is a float
+    #
+    # Attribute _accum: the frame time not yet simulated by the level
+    # Invariant: _accum is a float between 0 and 1/TICK_RATE, inclusive
+    #
+    # Attribute _labels: the labels shown over the level, built once each
+    # Invariant: _labels is a LabelCache for the current window size
+    #
+    # Attribute _images: the images of every level, each loaded once
+    # Invariant: _images is an ImageCache
+    #
+    # Attribute _loader: the level being loaded in the background
+    # Invariant: _loader is a LevelLoader, or None if no level is being loaded
+    #
+    # Attribute _profiler: the profiler that times the phases of each frame
+    # Invariant: _profiler is a FrameProfiler, or None if profiling is off
+    #
+    # Attribute _profiletext: the overlay with the statistics of _profiler
+    # Invariant: _profiletext is a GLabel, or None if there is nothing to show
+    #
+    # Attribute _profiletime: the time since the overlay was last refreshed
+    # Invariant: _profiletime is a non-negative float
+    #
+    # Attribute _recorder: the replay file the game is recorded to
+    # Invariant: _recorder is a Recorder, or None if the game is not recorded
+    #
+    # Attribute _replay: the keys of the replay being watched
+    # Invariant: _replay is a ReplayInput, or None if the game is played
+    #
+    # Attribute _startup: the timer of the startup, until the first frame
+    # Invariant: _startup is a StartupTimer, or None if the startup is not timed
 
     # DO NOT MAKE A NEW INITIALIZER!
 
@@ -76,7 +109,14 @@ class Froggit(GameApp):
     def start(self):
         """
         Initializes the application.
+
+        If the startup is timed, everything up to here (the imports and
+        opening the window) is its first step.
         """
+        self._startup = None
+        if STARTUP:
+            self._startup = StartupTimer()
+            self._startup.mark('window')
         self._title = GLabel(text='FROGGIT',x=self.width//2,y= self.height//2,
         font_name=ALLOY_FONT,font_size=ALLOY_LARGE,linecolor='dark green')
         self._text = GLabel(text = "PRESS 'S' TO START",top=self._title.bottom,
@@ -87,6 +127,15 @@ class Froggit(GameApp):
         self._pausetext = None
         self._losetext = None
         self._wintext = None
+        self._accum = 0.0
+        self._labels = LabelCache()
+        self._images = ImageCache()
+        self._loader = None
+        self._profiler = FrameProfiler() if PROFILE else None
+        self._profiletext = None
+        self._profiletime = 0.0
+        self._recorder = None
+        self._replay = None
 
     def update(self,dt):
         """
@@ -94,6 +143,9 @@ class Froggit(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        profiler = self._profiler
+        if not profiler is None:
+            mark = profiler.mark()
         self._determineState()
         if self._state == STATE_INACTIVE:
             self._stateinactive(dt)
@@ -107,11 +159,17 @@ class Froggit(GameApp):
             self._statecontinue(dt)
         if self._state == STATE_COMPLETE:
             self._statecomplete(dt)
+        if not profiler is None:
+            profiler.lap('update',mark)
+            self._refreshprofile(dt)
 
     def draw(self):
         """
         Draws the game objects to the view.
         """
+        profiler = self._profiler
+        if not profiler is None:
+            mark = profiler.mark()
 
         if not self._text is None:
             self._text.draw(self.view)
@@ -120,7 +178,7 @@ class Froggit(GameApp):
             self._title.draw(self.view)
 
         if not self._level is None:
-            self._level.draw(self.view)
+            self._level.draw(self.view,self._accum*TICK_RATE)
 
         if not self._pausetext is None:
             self._pausetext.draw(self.view)
@@ -131,6 +189,22 @@ class Froggit(GameApp):
         if not self._wintext is None:
             self._wintext.draw(self.view)
 
+        if not profiler is None:
+            profiler.lap('draw',mark)
+
+        if not self._profiletext is None:
+            self._profiletext.draw(self.view)
+
+        if not self._startup is None:
+            self._endstartup()
+
+    def on_stop(self):
+        """
+        Writes the frame timings to PROFILE_FILE if the profiler is on when the
+        window is closed (this is the Kivy App event for it).
+        """
+        self._dumpprofile()
+
     # HELPER METHODS FOR THE STATES GO HERE
     def _determineState(self):
         """
@@ -148,8 +222,11 @@ class Froggit(GameApp):
                 self._state = STATE_LOADING
                 self._title = None
                 self._text = None
-            if self.input.is_key_down('c') and self._state == STATE_PAUSED:
+            if (self.input.is_key_down('c') and self._state == STATE_PAUSED and
+                self._replay is None):
                 self._state = STATE_CONTINUE
+            if self.input.is_key_down(PROFILE_KEY):
+                self._toggleprofiler()
         # Update last_keys
         self.lastkeys=curr_keys
 
@@ -159,10 +236,31 @@ class Froggit(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        dictform = self.load_json(DEFAULT_LEVEL)
-        self._level = Level(dictform)
+        replay = None
+        if not REPLAY_FILE is None:
+            replay = loadreplay(REPLAY_FILE)
+            if replay is None:
+                Logger.warning('Not a replay file: '+REPLAY_FILE)
+
+        seed = ENDLESS_SEED if ENDLESS else None
+        if not replay is None:
+            seed = replay.getseed()
+        if not seed is None:
+            compiled = compilelevel(makelevel(seed))
+            self._level = EndlessLevel(seed, self.load_json(OBJECT_DATA),
+            self._labels, self._images)
+        else:
+            if self._loader is None:
+                self._loader = LevelLoader(DEFAULT_LEVEL)
+            compiled = self._loader.getlevel()
+            self._loader = None
+            self._level = Level(compiled, self.load_json(OBJECT_DATA),
+            self._labels, self._images)
+        self._startreplay(replay, compiled.gethash(), seed)
+        self._level.setprofiler(self._profiler)
         self.width = self._level.getwidth()
-        self.height = self._level.getheight() + GRID_SIZE
+        self.height = self._level.getviewheight() + GRID_SIZE
+        self._labels.resize(self.width,self.height)
         self._frogx = self._level.getfrog().x
         self._frogy = self._level.getfrog().y
         self._state = STATE_ACTIVE
@@ -175,8 +273,13 @@ class Froggit(GameApp):
         """
         if self._level.nolives() is True or self._level.exitfill() is True:
             self._state = STATE_COMPLETE
+            self._dumpprofile()
+        elif (not self._replay is None and
+            self._replay.apply(self._level.getticks(),self._level)):
+            self._pausetext = None
+            self._state = STATE_ACTIVE
         else:
-            self._pausetext = GLabel(text = "PRESS 'C' TO CONTINUE",
+            self._pausetext = self._labels.getlabel("PRESS 'C' TO CONTINUE",
             x = self.width//2, y= (self.height-GRID_SIZE)//2,
             width = self.width, height = GRID_SIZE, font_name = ALLOY_FONT,
             font_size = ALLOY_SMALL, linecolor = 'white',
@@ -188,14 +291,17 @@ class Froggit(GameApp):
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        if not self._recorder is None:
+            self._recorder.finish(self._level.getticks())
+            self._recorder = None
         if self._level.nolives() is True:
-            self._losetext = GLabel(text = "YOU LOSE", x = self.width//2,
+            self._losetext = self._labels.getlabel("YOU LOSE", x = self.width//2,
             y= (self.height-GRID_SIZE)//2, width = self.width,
             height = GRID_SIZE, font_name = ALLOY_FONT,
             font_size = ALLOY_SMALL, linecolor = 'white',
             fillcolor = 'dark green')
         if self._level.exitfill() is True:
-            self._losetext = GLabel(text = "YOU WIN", x = self.width//2,
+            self._losetext = self._labels.getlabel("YOU WIN", x = self.width//2,
             y= (self.height-GRID_SIZE)//2, width = self.width,
             height=GRID_SIZE,font_name=ALLOY_FONT,font_size=ALLOY_SMALL,
             linecolor = 'white', fillcolor = 'dark green')
@@ -207,24 +313,151 @@ class Froggit(GameApp):
         Precondition: dt is a number (int or float)
         """
         self._level.setfrog(self._frogx,self._frogy)
+        self._accum = 0.0
         self._pausetext = None
         self._state = STATE_ACTIVE
 
     def _stateactive(self, dt):
         """
         Handles the settings of the game when the game is in STATE_ACTIVE
+
+        The level is updated in fixed steps of 1/TICK_RATE seconds, no matter
+        how long the frame was, so the game plays the same at any frame rate.
+        The time left over is carried to the next frame. After a long hitch,
+        at most MAX_SUBSTEPS steps are run and the rest of the time is dropped.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
-        self._level.update(self.input,dt)
-        if self._level.getfrog() is None:
-            self._state = STATE_PAUSED
+        tick = 1.0/TICK_RATE
+        self._accum += dt
+        steps = 0
+        while self._accum >= tick and steps < MAX_SUBSTEPS:
+            if self._replay is None:
+                self._level.update(self.input,tick)
+            else:
+                self._replay.apply(self._level.getticks(),self._level)
+                self._level.update(self._replay,tick)
+            self._accum -= tick
+            steps += 1
+            if self._level.getfrog() is None:
+                self._state = STATE_PAUSED
+                self._accum = 0.0
+                break
+        if self._accum > tick:
+            self._accum = tick
 
     def _stateinactive(self, dt):
         """
         Handles the settings of the game when the game is in STATE_INACTIVE
+
+        While the title is shown, DEFAULT_LEVEL is loaded on a worker thread, so
+        that STATE_LOADING only has to pick up the result. An endless level is
+        made as it is played, so there is nothing to load for it.
+
         Parameter dt: The time in seconds since last update
         Precondition: dt is a number (int or float)
         """
+        if self._loader is None and self._level is None and not ENDLESS:
+            self._loader = LevelLoader(DEFAULT_LEVEL)
         if self._title != None:
             self._text.top = self._title.bottom
+
+    # HELPER METHODS FOR REPLAYS
+    def _startreplay(self, replay, digest, seed):
+        """
+        Starts watching replay, or else starts recording the game.
+
+        The game is only recorded if RECORD is True. A game that cannot be
+        recorded (e.g. the folder cannot be written) is still played. A replay
+        that would not play back the same way (see Replay.getmismatch) is not
+        watched; the game is played instead.
+
+        Parameter replay: the replay to watch
+        Precondition: replay is a Replay, or None to play
+
+        Parameter digest: the hash of the level (see CompiledLevel.gethash)
+        Precondition: digest is a bytes object of length 32
+
+        Parameter seed: the seed of an endless level
+        Precondition: seed is an int, or None for a level file
+        """
+        shapehash = self._level.getsim().getshapehash()
+        if not replay is None:
+            mismatch = replay.getmismatch(digest, shapehash, TICK_RATE)
+            if not mismatch is None:
+                Logger.warning('Not watching the replay: '+mismatch)
+                replay = None
+        if not replay is None:
+            self._replay = ReplayInput(replay)
+        elif RECORD:
+            try:
+                self._recorder = Recorder(replayname(), digest, shapehash, seed)
+            except OSError:
+                self._recorder = None
+            self._level.setrecorder(self._recorder)
+
+    # HELPER METHODS FOR THE PROFILER
+    def _endstartup(self):
+        """
+        Marks the first frame as drawn, writes the startup times to
+        STARTUP_FILE, and quits.
+        """
+        seconds = self._startup.mark('frame')
+        self._startup.dump(STARTUP_FILE,{'level': DEFAULT_LEVEL})
+        Logger.info('Started in %.0f ms, times written to %s' %
+            (1000*seconds,STARTUP_FILE))
+        self._startup = None
+        self.stop()
+
+    def _toggleprofiler(self):
+        """
+        Turns the frame profiler on or off.
+
+        When the profiler is turned off, its statistics are written to
+        PROFILE_FILE, so that runs of different builds can be compared.
+        """
+        if self._profiler is None:
+            self._profiler = FrameProfiler()
+            self._profiletime = PROFILE_REFRESH
+        else:
+            self._dumpprofile()
+            self._profiler = None
+            self._profiletext = None
+        if not self._level is None:
+            self._level.setprofiler(self._profiler)
+
+    def _dumpprofile(self):
+        """
+        Writes the statistics of the frame profiler to PROFILE_FILE, if it is on.
+
+        This is done when the profiler is turned off, when the level ends and when
+        the window is closed, so that a run with the profiler on always leaves its
+        timings behind.
+        """
+        if not self._profiler is None:
+            self._profiler.dump(PROFILE_FILE,{'level': DEFAULT_LEVEL})
+            Logger.info('Frame timings written to '+PROFILE_FILE)
+
+    def _refreshprofile(self, dt):
+        """
+        Refreshes the profiler overlay every PROFILE_REFRESH seconds.
+
+        Changing the text of a label lays it out again, so it is not done on
+        every frame.
+
+        Parameter dt: The time in seconds since last update
+        Precondition: dt is a number (int or float)
+        """
+        self._profiletime += dt
+        if self._profiletime < PROFILE_REFRESH:
+            return
+        self._profiletime = 0.0
+        text = self._profiler.totext()
+        if self._profiletext is None:
+            self._profiletext = GLabel(text=text,font_size=ALLOY_SMALL//3,
+            halign='left',valign='top',linecolor='white',fillcolor='black')
+        else:
+            self._profiletext.text = text
+        self._profiletext.left = 0
+        self._profiletext.top = self.height
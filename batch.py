@@ -0,0 +1,492 @@
+"""
+Batch runner for Froggit
+
+This module plays agents through level files many thousands of times, to see how hard
+each level is. An agent is a policy that picks the keys to hold down every frame. The
+built-in policies are
+
+    random    any key (or none) with equal chances
+    forward   mostly up, sometimes sideways, rarely down
+    up        always up
+
+and any other policy is a JSON file with a list of key presses, one entry per frame, in
+the format of a ScriptedInput. Every game is played until the lives run out, the exits
+are filled or BATCH_SECONDS pass, and a frog that dies or reaches an exit is put back
+at the start, as when the player continues.
+
+The games are split into chunks and played on a process pool with one process per
+core. Each process loads the levels once (memory mapping the compiled level cache) and
+sends back only the totals of its chunk, so the throughput grows with the number of
+cores. The totals are shown as they come in, and the results are written as JSON:
+the survival rate, the completion rate and time, and the deaths in each lane by cause.
+To play every policy 1000 times on a level, type
+
+    python batch.py easy2.json
+
+in the folder with the code. Use python batch.py --help to see the options.
+
+Only the headless simulation (engine.py) is used, so nothing is drawn and Kivy is not
+needed. The results only depend on the seed, not on the number of processes.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from engine import *
+from compiler import *
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+# The number of games to play for each level and policy
+BATCH_RUNS = 1000
+# The number of games in each chunk sent to a process
+BATCH_CHUNK = 50
+# The longest a game may last, in seconds of simulation time
+BATCH_SECONDS = 120
+# The seconds between the progress lines
+BATCH_REFRESH = 1.0
+# The keys a policy may press
+BATCH_KEYS = ('left','right','up','down')
+# The policies that do not need a file
+BATCH_POLICIES = ('random','forward','up')
+
+# The levels, hitboxes and longest game of a worker process (set by _initworker)
+_worker = {}
+
+
+class PolicyInput(object):
+    """
+    A replacement for GInput that holds down the keys chosen by a policy.
+
+    Attribute key_count: The number of keys held down
+    Invariant: key_count is an int >= 0
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _keys: The keys held down
+    # Invariant: _keys is a tuple of key names
+
+    def __init__(self):
+        """
+        Initializes the input with no keys held down.
+        """
+        self._keys = ()
+        self.key_count = 0
+
+    def setkeys(self,keys):
+        """
+        Sets the keys held down.
+
+        Parameter keys: the keys held down
+        Precondition: keys is None (no keys), a key name or a tuple of key names
+        """
+        if keys is None:
+            self._keys = ()
+        elif type(keys) == str:
+            self._keys = (keys,)
+        else:
+            self._keys = tuple(keys)
+        self.key_count = len(self._keys)
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down.
+
+        Parameter key: The key name
+        Precondition: key is a string
+        """
+        return key in self._keys
+
+
+class ScriptPolicy(object):
+    """
+    A policy that presses the keys of a script, one entry per frame of the game.
+
+    Once the script runs out, no keys are pressed.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _script: The key presses, one entry per frame
+    # Invariant: _script is a list of None, strings or lists of strings
+
+    def __init__(self,script):
+        """
+        Initializes the policy with the given script.
+
+        Parameter script: The key presses, one entry per frame
+        Precondition: script is a list of None, strings or lists of strings
+        """
+        self._script = script
+
+    def __call__(self,sim,rand):
+        """
+        Returns the keys to hold down in the current frame of sim.
+
+        Parameter sim: the game being played
+        Precondition: sim is a Simulation
+
+        Parameter rand: the random numbers of the game (not used)
+        Precondition: rand is a random.Random
+        """
+        tick = sim.getticks()
+        if tick < len(self._script):
+            return self._script[tick]
+        return None
+
+
+def randompolicy(sim,rand):
+    """
+    Returns any key, or None, with equal chances.
+
+    Parameter sim: the game being played
+    Precondition: sim is a Simulation
+
+    Parameter rand: the random numbers of the game
+    Precondition: rand is a random.Random
+    """
+    return rand.choice((None,)+BATCH_KEYS)
+
+
+def forwardpolicy(sim,rand):
+    """
+    Returns up half of the time, and otherwise mostly a sideways key or None.
+
+    Parameter sim: the game being played
+    Precondition: sim is a Simulation
+
+    Parameter rand: the random numbers of the game
+    Precondition: rand is a random.Random
+    """
+    roll = rand.random()
+    if roll < 0.5:
+        return 'up'
+    elif roll < 0.65:
+        return 'left'
+    elif roll < 0.8:
+        return 'right'
+    elif roll < 0.85:
+        return 'down'
+    return None
+
+
+def uppolicy(sim,rand):
+    """
+    Returns up.
+
+    Parameter sim: the game being played
+    Precondition: sim is a Simulation
+
+    Parameter rand: the random numbers of the game (not used)
+    Precondition: rand is a random.Random
+    """
+    return 'up'
+
+
+def getpolicy(name):
+    """
+    Returns the policy with the given name.
+
+    A policy is called as policy(sim,rand) every frame, and returns the keys to
+    hold down in the format of a ScriptedInput entry. A name that is not one of
+    BATCH_POLICIES is a JSON file with a script (see ScriptPolicy).
+
+    Parameter name: the name of a policy or a script file
+    Precondition: name is a string
+    """
+    if name == 'random':
+        return randompolicy
+    elif name == 'forward':
+        return forwardpolicy
+    elif name == 'up':
+        return uppolicy
+    with open(name) as file:
+        return ScriptPolicy(json.load(file))
+
+
+def playgame(level,shapes,policy,seed,seconds=BATCH_SECONDS):
+    """
+    Returns a dictionary with the result of one game of level played by policy.
+
+    The keys are 'complete' (True if the exits were filled), 'lives' (the lives
+    left), 'time' (the simulation time when the game ended), 'timeout' (True if
+    the game was stopped after seconds) and 'deaths' (a list of the (row,cause)
+    of every death, see Simulation.getdeath).
+
+    Parameter level: the level to play
+    Precondition: level is a CompiledLevel or a dictionary in the level JSON format
+
+    Parameter shapes: the hitboxes of the object types
+    Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter policy: the policy that picks the keys
+    Precondition: policy is a policy returned by getpolicy
+
+    Parameter seed: the seed of the random numbers given to the policy
+    Precondition: seed is an int
+
+    Parameter seconds: the longest the game may last
+    Precondition: seconds is a number > 0
+    """
+    sim = Simulation(level,shapes)
+    start = sim.getfrog()
+    start = (start.x,start.y)
+    rand = random.Random(seed)
+    input = PolicyInput()
+    dt = 1.0/TICK_RATE
+    ticks = int(seconds*TICK_RATE)
+    lives = sim.getlives()
+    deaths = []
+    while sim.getticks() < ticks:
+        if sim.getfrog() is None:
+            if sim.nolives() or sim.exitfill():
+                break
+            sim.setfrog(*start)
+        input.setkeys(policy(sim,rand))
+        sim.update(input,dt)
+        if sim.getlives() < lives:
+            lives = sim.getlives()
+            deaths.append(sim.getdeath())
+    return {'complete': sim.exitfill(), 'lives': sim.getlives(),
+            'time': sim.gettime(), 'timeout': sim.getticks() >= ticks,
+            'deaths': deaths}
+
+
+def main(args=None):
+    """
+    Plays the games on a process pool and writes the results as JSON.
+
+    Parameter args: the command line arguments (sys.argv[1:] if None)
+    Precondition: args is None or a list of strings
+    """
+    parser = argparse.ArgumentParser(description='Plays Froggit levels in a batch.')
+    parser.add_argument('levels',nargs='+',help='the level JSON files')
+    parser.add_argument('--policy',action='append',dest='policies',
+        help='a policy (%s) or a JSON script file; may be given more than once '
+        '(default: all of %s)' % (', '.join(BATCH_POLICIES),
+        ', '.join(BATCH_POLICIES)))
+    parser.add_argument('--runs',type=int,default=BATCH_RUNS,
+        help='the number of games for each level and policy')
+    parser.add_argument('--seconds',type=float,default=BATCH_SECONDS,
+        help='the longest a game may last')
+    parser.add_argument('--jobs',type=int,default=os.cpu_count() or 1,
+        help='the number of processes (default: one per core)')
+    parser.add_argument('--objects',default=OBJECT_DATA,
+        help='the object data with the hitboxes')
+    parser.add_argument('--seed',type=int,default=0,help='the random seed')
+    parser.add_argument('--output',help='the file to write (standard output if none)')
+    options = parser.parse_args(args)
+    policies = list(BATCH_POLICIES) if options.policies is None else options.policies
+    for name in policies:
+        getpolicy(name)
+    for name in options.levels:
+        loadlevel(name)         # Fails early, and fills the cache for the workers
+
+    tasks = []
+    for first in range(0,options.runs,BATCH_CHUNK):
+        count = min(BATCH_CHUNK,options.runs-first)
+        for level in range(len(options.levels)):
+            for policy in policies:
+                tasks.append((level,policy,options.seed+first,count))
+
+    totals = {}
+    for level in options.levels:
+        for policy in policies:
+            totals[(level,policy)] = _newtotals()
+    setup = (options.levels,options.objects,options.seconds)
+    start = time.perf_counter()
+    shown = start
+    if options.jobs == 1:
+        _initworker(*setup)
+        chunks = map(_playchunk,tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(options.jobs,_initworker,setup)
+        chunks = pool.imap_unordered(_playchunk,tasks)
+    try:
+        for done, (level, policy, chunk) in enumerate(chunks):
+            _addtotals(totals[(options.levels[level],policy)],chunk)
+            now = time.perf_counter()
+            if now-shown >= BATCH_REFRESH or done+1 == len(tasks):
+                shown = now
+                _showprogress(totals,done+1,len(tasks),now-start)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter()-start
+
+    results = []
+    for level in options.levels:
+        for policy in policies:
+            result = {'level': level, 'policy': policy}
+            result.update(_summarize(totals[(level,policy)]))
+            results.append(result)
+    games = options.runs*len(results)
+    report = {'tickrate': TICK_RATE, 'frogspeed': FROG_SPEED, 'lives': FROG_LIVES,
+              'seconds': options.seconds, 'seed': options.seed, 'jobs': options.jobs,
+              'elapsed': elapsed, 'games_per_sec': games/elapsed, 'results': results}
+    text = json.dumps(report,indent=2,sort_keys=True)
+    if options.output is None:
+        print(text)
+    else:
+        with open(options.output,'w') as file:
+            file.write(text+'\n')
+
+
+# HELPERS FOR THE WORKER PROCESSES
+def _initworker(levels,objects,seconds):
+    """
+    Loads the levels and hitboxes of a worker process.
+
+    Parameter levels: the level JSON files
+    Precondition: levels is a list of strings
+
+    Parameter objects: the object data file (see OBJECT_DATA)
+    Precondition: objects is a string
+
+    Parameter seconds: the longest a game may last
+    Precondition: seconds is a number > 0
+    """
+    _worker['levels'] = [loadlevel(name) for name in levels]
+    _worker['shapes'] = loadshapes(objects)
+    _worker['seconds'] = seconds
+
+
+def _playchunk(task):
+    """
+    Returns (level,policy,totals) after playing a chunk of games.
+
+    Game k of the chunk uses the seed first+k, so every game has the same seed
+    whichever process plays it.
+
+    Parameter task: the chunk to play
+    Precondition: task is a (level,policy,first,count) tuple, where level is
+    an index into the levels of the worker and policy is a policy name
+    """
+    level, policy, first, count = task
+    compiled = _worker['levels'][level]
+    play = getpolicy(policy)
+    totals = _newtotals()
+    for seed in range(first,first+count):
+        _addgame(totals,playgame(compiled,_worker['shapes'],play,seed,
+            _worker['seconds']))
+    return (level,policy,totals)
+
+
+# HELPERS FOR THE TOTALS
+def _newtotals():
+    """
+    Returns the totals of no games.
+
+    The totals are a dictionary with the number of games ('runs'), of games
+    where the exits were filled ('complete'), of games with lives left
+    ('survived') and of games that were stopped ('timeouts'), the times of the
+    complete games ('times'), and the number of deaths by row and cause
+    ('deaths', mapping each row to a dictionary mapping causes to counts).
+    """
+    return {'runs': 0, 'complete': 0, 'survived': 0, 'timeouts': 0, 'times': [],
+            'deaths': {}}
+
+
+def _addgame(totals,game):
+    """
+    Adds the result of one game to the totals.
+
+    Parameter totals: the totals to add to
+    Precondition: totals is a dictionary returned by _newtotals
+
+    Parameter game: the result of the game
+    Precondition: game is a dictionary returned by playgame
+    """
+    totals['runs'] += 1
+    if game['complete']:
+        totals['complete'] += 1
+        totals['times'].append(game['time'])
+    if game['lives'] > 0:
+        totals['survived'] += 1
+    if game['timeout']:
+        totals['timeouts'] += 1
+    for row, cause in game['deaths']:
+        causes = totals['deaths'].setdefault(row,{})
+        causes[cause] = causes.get(cause,0)+1
+
+
+def _addtotals(totals,other):
+    """
+    Adds the totals other to totals.
+
+    Parameter totals: the totals to add to
+    Precondition: totals is a dictionary returned by _newtotals
+
+    Parameter other: the totals to add
+    Precondition: other is a dictionary returned by _newtotals
+    """
+    for key in ('runs','complete','survived','timeouts'):
+        totals[key] += other[key]
+    totals['times'].extend(other['times'])
+    for row in other['deaths']:
+        causes = totals['deaths'].setdefault(row,{})
+        for cause, count in other['deaths'][row].items():
+            causes[cause] = causes.get(cause,0)+count
+
+
+def _summarize(totals):
+    """
+    Returns a dictionary with the rates and times of the totals.
+
+    The survival rate is the share of games that ended with lives left, and the
+    completion rate the share of games where every exit was filled. The times
+    are over the complete games, and are None if there are none. The deaths map
+    each row (as a string, for JSON) to the deaths in it by cause.
+
+    Parameter totals: the totals of the games
+    Precondition: totals is a dictionary returned by _newtotals with runs > 0
+    """
+    runs = totals['runs']
+    times = sorted(totals['times'])
+    result = {'runs': runs, 'survival_rate': totals['survived']/runs,
+              'completion_rate': totals['complete']/runs,
+              'timeout_rate': totals['timeouts']/runs,
+              'time_mean': None, 'time_p50': None, 'time_p95': None,
+              'deaths': dict((str(row),totals['deaths'][row])
+                             for row in sorted(totals['deaths']))}
+    if len(times) > 0:
+        result['time_mean'] = sum(times)/len(times)
+        result['time_p50'] = times[int(math.ceil(0.50*len(times)))-1]
+        result['time_p95'] = times[int(math.ceil(0.95*len(times)))-1]
+    return result
+
+
+def _showprogress(totals,done,tasks,elapsed):
+    """
+    Writes the survival and completion rates so far to standard error.
+
+    Parameter totals: the totals of each level and policy
+    Precondition: totals is a dictionary mapping (level,policy) to totals
+
+    Parameter done: the number of chunks played
+    Precondition: done is an int >= 0
+
+    Parameter tasks: the number of chunks to play
+    Precondition: tasks is an int > 0
+
+    Parameter elapsed: the seconds since the games started
+    Precondition: elapsed is a number > 0
+    """
+    games = sum(totals[key]['runs'] for key in totals)
+    lines = ['[%d/%d chunks, %.0f games/s]' % (done,tasks,games/elapsed)]
+    for (level, policy), total in totals.items():
+        if total['runs'] > 0:
+            lines.append('  %s %s: %d games, survival %.1f%%, complete %.1f%%' %
+                (level,policy,total['runs'],100*total['survived']/total['runs'],
+                 100*total['complete']/total['runs']))
+    sys.stderr.write('\n'.join(lines)+'\n')
+
+
+# Script code
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,360 @@
+"""
+Benchmark suite for Froggit
+
+This module generates levels in the level JSON format (size, lanes, offscreen and
+start), from a level the size of the stock easy level up to thousands of lanes with
+tens of thousands of objects, and times the simulation on each of them:
+
+    load      compiling the JSON, and loading it cold (compile and write the cache)
+              and warm (memory map the cache)
+    build     making the Simulation of the compiled level
+    steps     simulation steps per second with no keys pressed, with the obstacles
+              of every lane computed each step (as if all of them were drawn), and
+              with only the update (which moves just the lane of the frog)
+    keypress  the time of a step in which the frog moves (p50, p95 and p99)
+    collision the time of one carcollision or onalog call
+    memory    the peak memory used to build the level and run it
+
+With --imports, the time to import each headless module in a fresh Python is timed
+too, along with whether that loaded Kivy or game2d (it should not).
+
+The results are written as JSON, so that runs of different builds can be compared. To
+run the default sizes, type
+
+    python bench.py
+
+in the folder with the code. Use python bench.py --help to see the options.
+
+Drawing needs a Kivy window, so only the headless simulation (engine.py) and the level
+compiler (compiler.py) are timed here. Use the frame profiler (profiler.py) to time the
+drawing phases in the game itself.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from engine import *
+from compiler import *
+from profiler import *
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# The level sizes to run by default, as (name, width, lanes, objects per lane)
+BENCH_SIZES = (('easy', 16, 12, 3), ('medium', 32, 100, 10),
+               ('large', 64, 1000, 20), ('huge', 64, 4000, 10))
+# The number of simulation steps timed for each level
+BENCH_STEPS = 2000
+# The number of calls timed for each collision method
+BENCH_CALLS = 20000
+# The object types for each kind of moving lane
+BENCH_OBJECTS = {'road': ('car1', 'car2', 'truck1'), 'water': ('log2', 'log3')}
+# The headless modules whose imports are timed with --imports
+BENCH_MODULES = ('consts', 'compiler', 'engine', 'endless', 'profiler', 'replay',
+                 'env', 'analyze', 'batch')
+# The code run in a fresh Python to time the import of a module
+BENCH_IMPORT = ('import sys, time; start = time.perf_counter(); import %s; '
+                'print(time.perf_counter()-start, "kivy" in sys.modules, '
+                '"game2d" in sys.modules)')
+
+
+def makebenchlevel(width,lanes,objects,seed=0):
+    """
+    Returns a random level as a dictionary in the level JSON format.
+
+    The bottom lane is grass with the frog in the middle, and the top lane is a
+    hedge with exits and opens in turn in every other column. The lanes in
+    between are roads, water and grass, with objects spread evenly over the
+    lane and the offscreen buffer.
+
+    Parameter width: the width of the level in grid squares
+    Precondition: width is an int >= 2
+
+    Parameter lanes: the number of lanes
+    Precondition: lanes is an int >= 2
+
+    Parameter objects: the number of objects in each road or water lane
+    Precondition: objects is an int >= 0
+
+    Parameter seed: the seed of the random level
+    Precondition: seed is an int
+    """
+    rand = random.Random(seed)
+    offscreen = 4
+    data = [{'type': 'grass'}]
+    for row in range(1,lanes-1):
+        kind = rand.choice(('road','road','water','water','grass'))
+        if kind == 'grass':
+            data.append({'type': 'grass'})
+            continue
+        speed = rand.choice((-1,1))*rand.randint(40,200)
+        span = width+2*offscreen
+        things = []
+        for pos in range(objects):
+            position = (pos*span/objects+rand.uniform(0,span/objects/2)) % span
+            things.append({'type': rand.choice(BENCH_OBJECTS[kind]),
+                           'position': position-offscreen})
+        data.append({'type': kind, 'speed': speed, 'objects': things})
+    hedge = []
+    for col in range(1,width,2):
+        hedge.append({'type': 'exit' if col % 4 == 1 else 'open', 'position': col})
+    data.append({'type': 'hedge', 'objects': hedge})
+    return {'version': 1, 'size': [width,lanes], 'start': [width//2,0],
+            'offscreen': offscreen, 'lanes': data}
+
+
+def benchlevel(name,data,steps=BENCH_STEPS,calls=BENCH_CALLS,seed=0):
+    """
+    Returns a dictionary with the benchmark results of one level.
+
+    Parameter name: the name of the level in the results
+    Precondition: name is a string
+
+    Parameter data: the level
+    Precondition: data is a dictionary in the level JSON format
+
+    Parameter steps: the number of simulation steps to time
+    Precondition: steps is an int > 0
+
+    Parameter calls: the number of calls to time for each collision method
+    Precondition: calls is an int > 0
+
+    Parameter seed: the seed of the random frog positions
+    Precondition: seed is an int
+    """
+    result = {'level': name, 'width': data['size'][0], 'lanes': data['size'][1],
+              'objects': sum(len(lane.get('objects',())) for lane in data['lanes'])}
+    result.update(_benchload(data))
+
+    start = time.perf_counter()
+    sim = Simulation(compilelevel(data))
+    result['build_ms'] = 1000*(time.perf_counter()-start)
+
+    result.update(_benchsteps(sim,steps))
+    result.update(_benchkeys(Simulation(compilelevel(data)),steps))
+    result.update(_benchcollisions(sim,calls,seed))
+
+    tracemalloc.start()
+    sim = Simulation(compilelevel(data))
+    sim.run(ScriptedInput(),1.0/TICK_RATE,min(steps,100))
+    result['peak_mb'] = tracemalloc.get_traced_memory()[1]/2**20
+    tracemalloc.stop()
+    return result
+
+
+def benchimports(modules=BENCH_MODULES):
+    """
+    Returns a list with the import time of each module, in milliseconds.
+
+    Each module is imported in a fresh Python, so that nothing is loaded yet.
+    Besides the import itself, the time of the whole process is given, which
+    includes starting Python. A module that loads Kivy or game2d is flagged.
+
+    Parameter modules: the names of the modules to import
+    Precondition: modules is a sequence of strings, modules next to this one
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for module in modules:
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable,'-c',BENCH_IMPORT % module],
+            cwd=folder,stdout=subprocess.PIPE,check=True).stdout.split()
+        results.append({'module': module, 'import_ms': 1000*float(output[0]),
+                        'process_ms': 1000*(time.perf_counter()-start),
+                        'kivy': output[1] == b'True',
+                        'game2d': output[2] == b'True'})
+    return results
+
+
+def main(args=None):
+    """
+    Runs the benchmarks and writes the results as JSON.
+
+    Parameter args: the command line arguments (sys.argv[1:] if None)
+    Precondition: args is None or a list of strings
+    """
+    sizes = dict((size[0],size[1:]) for size in BENCH_SIZES)
+    parser = argparse.ArgumentParser(description='Times the Froggit simulation.')
+    parser.add_argument('levels',nargs='*',default=[size[0] for size in BENCH_SIZES],
+        help='the level sizes to run (%s) or level JSON files' % ', '.join(sizes))
+    parser.add_argument('--steps',type=int,default=BENCH_STEPS,
+        help='the number of simulation steps to time')
+    parser.add_argument('--calls',type=int,default=BENCH_CALLS,
+        help='the number of calls to time for each collision method')
+    parser.add_argument('--seed',type=int,default=0,help='the random seed')
+    parser.add_argument('--imports',action='store_true',
+        help='also time the imports of the headless modules')
+    parser.add_argument('--output',help='the file to write (standard output if none)')
+    options = parser.parse_args(args)
+
+    results = []
+    for name in options.levels:
+        if name in sizes:
+            data = makebenchlevel(*sizes[name],seed=options.seed)
+        else:
+            with open(name) as file:
+                data = json.load(file)
+        results.append(benchlevel(name,data,options.steps,options.calls,
+            options.seed))
+
+    report = {'python': platform.python_version(), 'numpy': loadnumpy() is not None,
+              'tickrate': TICK_RATE, 'steps': options.steps, 'results': results}
+    if options.imports:
+        report['imports'] = benchimports()
+    text = json.dumps(report,indent=2,sort_keys=True)
+    if options.output is None:
+        print(text)
+    else:
+        with open(options.output,'w') as file:
+            file.write(text+'\n')
+
+
+# HELPERS FOR THE BENCHMARKS
+def _benchload(data):
+    """
+    Returns the load times of the level, in milliseconds.
+
+    Parameter data: the level
+    Precondition: data is a dictionary in the level JSON format
+    """
+    start = time.perf_counter()
+    compilelevel(data)
+    compiled = time.perf_counter()-start
+
+    folder = tempfile.mkdtemp()
+    try:
+        filename = os.path.join(folder,'bench.json')
+        with open(filename,'w') as file:
+            json.dump(data,file)
+        start = time.perf_counter()
+        loadlevel(filename,folder)
+        cold = time.perf_counter()-start
+        start = time.perf_counter()
+        loadlevel(filename,folder)
+        warm = time.perf_counter()-start
+    finally:
+        shutil.rmtree(folder,ignore_errors=True)
+    return {'compile_ms': 1000*compiled, 'load_cold_ms': 1000*cold,
+            'load_warm_ms': 1000*warm}
+
+
+def _benchsteps(sim,steps):
+    """
+    Returns the number of simulation steps per second with no keys pressed.
+
+    The update of a step only moves the lane of the frog, and the others catch
+    up when they are used. So steps_per_sec also computes the obstacles of every
+    lane after each update, which is the most a frame can need, and
+    update_steps_per_sec is the update alone.
+
+    Parameter sim: the simulation to run
+    Precondition: sim is a Simulation
+
+    Parameter steps: the number of steps to time
+    Precondition: steps is an int > 0
+    """
+    input = ScriptedInput()
+    tick = 1.0/TICK_RATE
+    start = time.perf_counter()
+    for pos in range(steps):
+        sim.update(input,tick)
+        for lane in sim.getlanes():
+            lane.getxs()
+    full = time.perf_counter()-start
+
+    start = time.perf_counter()
+    sim.run(input,tick,steps)
+    return {'steps_per_sec': steps/full,
+            'update_steps_per_sec': steps/(time.perf_counter()-start)}
+
+
+def _benchkeys(sim,steps):
+    """
+    Returns the times of the steps in which the frog moved, in milliseconds.
+
+    A key is pressed as soon as the frog may move again. A frog that dies or
+    reaches an exit is put back at the start.
+
+    Parameter sim: the simulation to run
+    Precondition: sim is a Simulation
+
+    Parameter steps: the number of steps to run
+    Precondition: steps is an int > 0
+    """
+    profiler = FrameProfiler(steps)
+    keys = ('up','left','up','right','down')
+    wait = int(math.ceil(FROG_SPEED*TICK_RATE))+1
+    script = []
+    for pos in range(steps):
+        script.append(keys[pos//wait % len(keys)] if pos % wait == 0 else None)
+    input = ScriptedInput(script)
+    start = sim.getfrog()
+    start = (start.x,start.y)
+    tick = 1.0/TICK_RATE
+    for pos in range(steps):
+        if sim.getfrog() is None:
+            sim.setfrog(*start)
+        if input.key_count > 0:
+            mark = profiler.mark()
+            sim.update(input,tick)
+            profiler.lap('keypress',mark)
+        else:
+            sim.update(input,tick)
+        input.advance()
+    stats = profiler.getstats('keypress')
+    return {'keypress_p50_ms': stats['p50'], 'keypress_p95_ms': stats['p95'],
+            'keypress_p99_ms': stats['p99']}
+
+
+def _benchcollisions(sim,calls,seed):
+    """
+    Returns the average time of one collision call, in microseconds.
+
+    Each call checks a frog at a random x coordinate of a random road (for
+    carcollision) or water lane (for onalog).
+
+    Parameter sim: the simulation with the lanes to check
+    Precondition: sim is a Simulation
+
+    Parameter calls: the number of calls to time for each method
+    Precondition: calls is an int > 0
+
+    Parameter seed: the seed of the random frog positions
+    Precondition: seed is an int
+    """
+    rand = random.Random(seed)
+    frogbox = getshape({},FROG_IMAGE[:-4])
+    result = {}
+    for cls, key in ((SimRoad,'carcollision_us'),(SimWater,'onalog_us')):
+        lanes = [lane for lane in sim.getlanes() if type(lane) == cls]
+        if len(lanes) == 0:
+            continue
+        checks = []
+        for pos in range(calls):
+            lane = rand.choice(lanes)
+            frog = SimFrog(rand.uniform(0,sim.getwidth()),
+                (lane.getrow()+0.5)*GRID_SIZE)
+            checks.append((lane,frog))
+        start = time.perf_counter()
+        if cls == SimRoad:
+            for lane, frog in checks:
+                lane.carcollision(frog,frogbox)
+        else:
+            for lane, frog in checks:
+                lane.onalog(frog)
+        result[key] = 1e6*(time.perf_counter()-start)/calls
+    return result
+
+
+# Script code
+if __name__ == '__main__':
+    main()
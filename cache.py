@@ -0,0 +1,463 @@
+"""
+Cache module for Froggit
+
+This module contains caches for graphics objects that are expensive to make, so that
+they are made once and then reused on every frame. Building a GLabel lays out its
+font and creates a new texture, which is far too slow to do 60 times a second. In the
+same way, objects that almost never change can be gathered into one StaticLayer and
+handed to the view as a single drawing instruction.
+
+Images work the same way. An ImageCache decodes each PNG file once and packs all of
+them into one texture atlas. Every CachedImage made from the cache shares its region
+of the atlas, so a level with thousands of cars loads the car image only once.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from game2d import *
+from kivy.core.image import Image as CoreImage
+from kivy.graphics import InstructionGroup, Fbo, ClearColor, ClearBuffers
+from kivy.graphics import Color, Rectangle, PushMatrix, PopMatrix, Translate, Rotate
+import os
+
+# The width of a texture atlas in pixels
+ATLAS_WIDTH = 2048
+
+
+class LabelCache(object):
+    """
+    A class that builds each GLabel once and reuses it afterwards.
+
+    Labels are looked up by their text and all of the other GLabel attributes. The
+    cache belongs to one window size: the positions of most labels depend on the
+    size of the window, so changing the size throws every label away.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _labels: The labels built so far
+    # Invariant: _labels is a dictionary mapping tuples (the text and sorted
+    # attributes) to GLabel objects
+    #
+    # Attribute _width: The window width the labels were built for
+    # Invariant: _width is a number, or None if no size has been set
+    #
+    # Attribute _height: The window height the labels were built for
+    # Invariant: _height is a number, or None if no size has been set
+
+    def __init__(self):
+        """
+        Initializes an empty label cache.
+        """
+        self._labels = {}
+        self._width = None
+        self._height = None
+
+    def resize(self,width,height):
+        """
+        Sets the window size, throwing away every label if the size changed.
+
+        The first call keeps the labels built so far, since they were made for
+        the window that is being set up.
+
+        Parameter width: the window width in pixels
+        Precondition: width is a number
+
+        Parameter height: the window height in pixels
+        Precondition: height is a number
+        """
+        if self._width is None:
+            self._width = width
+            self._height = height
+        elif width != self._width or height != self._height:
+            self._labels = {}
+            self._width = width
+            self._height = height
+
+    def getlabel(self,text,**keywords):
+        """
+        Returns a GLabel with the given text and attributes.
+
+        The label is only built the first time it is asked for. Afterwards the
+        same GLabel object is returned, so it should not be modified.
+
+        Parameter text: the text of the label
+        Precondition: text is a string
+
+        Parameter keywords: the other GLabel attributes (x, font_size, etc.)
+        Precondition: keywords are valid GLabel attributes with hashable values
+        """
+        key = (text,)+tuple(sorted(keywords.items()))
+        if not key in self._labels:
+            self._labels[key] = GLabel(text=text,**keywords)
+        return self._labels[key]
+
+
+class StaticLayer(object):
+    """
+    A class that draws a list of objects that rarely change as one instruction.
+
+    The first time the layer is drawn, the drawing instructions of all of its
+    objects are collected into one Kivy InstructionGroup. After that, drawing the
+    layer only adds that one group to the view, however many objects it holds.
+    When one of the objects changes, or objects are added or removed, the layer
+    must be told with invalidate so that it collects the instructions again.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _objects: The objects in the layer, in drawing order
+    # Invariant: _objects is a list of GObjects
+    #
+    # Attribute _group: The drawing instructions of every object in the layer
+    # Invariant: _group is an InstructionGroup
+    #
+    # Attribute _dirty: Whether _group needs to be collected again
+    # Invariant: _dirty is a bool
+
+    def __init__(self,objects=()):
+        """
+        Initializes the layer with the given objects.
+
+        Parameter objects: the objects in the layer, in drawing order
+        Precondition: objects is an iterable of GObjects
+        """
+        self._objects = list(objects)
+        self._group = InstructionGroup()
+        self._dirty = True
+
+    def setobjects(self,objects):
+        """
+        Replaces the objects in the layer.
+
+        Parameter objects: the objects in the layer, in drawing order
+        Precondition: objects is an iterable of GObjects
+        """
+        self._objects = list(objects)
+        self._dirty = True
+
+    def invalidate(self):
+        """
+        Marks the layer as changed, so it is collected again when next drawn.
+        """
+        self._dirty = True
+
+    def draw(self,view):
+        """
+        Draws every object in the layer with a single instruction.
+
+        Parameter view: The view window
+        Precondition: view is a GView
+        """
+        if self._dirty:
+            self._group.clear()
+            recorder = _Recorder(self._group)
+            for obj in self._objects:
+                obj.draw(recorder)
+            self._dirty = False
+        view.draw(self._group)
+
+
+class _Recorder(object):
+    """
+    A stand-in for GView that collects drawing instructions into a group.
+
+    GObject.draw hands its instructions to the draw method of a view. Passing a
+    recorder instead keeps those instructions for a StaticLayer.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _group: The group the instructions are added to
+    # Invariant: _group is an InstructionGroup
+
+    def __init__(self,group):
+        """
+        Initializes a recorder that adds to group.
+
+        Parameter group: The group the instructions are added to
+        Precondition: group is an InstructionGroup
+        """
+        self._group = group
+
+    def draw(self,cmd):
+        """
+        Adds a drawing instruction to the group.
+
+        Parameter cmd: The instruction to add
+        Precondition: cmd is a Kivy graphics instruction
+        """
+        self._group.add(cmd)
+
+
+class ImageCache(object):
+    """
+    A class that loads each image file once and shares it between all images.
+
+    The images are packed side by side, in rows, into one atlas texture. The
+    texture of each image is a region of that atlas. Images asked for after the
+    atlas was made are packed into a new atlas of their own.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _textures: The texture of each image file loaded so far
+    # Invariant: _textures is a dictionary mapping file names to Kivy textures
+    #
+    # Attribute _atlases: The frame buffers that hold the atlas textures
+    # Invariant: _atlases is a list of Fbo objects
+    #
+    # Attribute _spares: The images given back with release, to be used again
+    # Invariant: _spares is a dictionary mapping file names to lists of
+    # CachedImages with the size of that file
+
+    def __init__(self):
+        """
+        Initializes an empty image cache.
+        """
+        self._textures = {}
+        self._atlases = []
+        self._spares = {}
+
+    def preload(self,sources):
+        """
+        Loads every image file in sources that is not in the cache yet.
+
+        All of the new images are packed into one atlas. Loading every image of
+        a level with a single call keeps them in one texture.
+
+        Parameter sources: the image file names (e.g. 'car1.png')
+        Precondition: sources is an iterable of strings
+        """
+        images = []
+        for source in sources:
+            if not source in self._textures and not source in images:
+                images.append(source)
+        if len(images) == 0:
+            return
+
+        # decode each file once, and place it on the next free spot of a row
+        textures = [CoreImage(_findimage(source)).texture for source in images]
+        spots = []
+        x = 0
+        y = 0
+        rowheight = 0
+        for texture in textures:
+            if x > 0 and x+texture.width > ATLAS_WIDTH:
+                x = 0
+                y += rowheight
+                rowheight = 0
+            spots.append((x,y))
+            x += texture.width
+            rowheight = max(rowheight,texture.height)
+        width = max(spot[0]+texture.width for spot, texture in zip(spots,textures))
+
+        # draw every image into the atlas, then keep only its regions
+        atlas = Fbo(size=(width,y+rowheight))
+        with atlas:
+            ClearColor(0,0,0,0)
+            ClearBuffers()
+            Color(1,1,1,1)
+            for spot, texture in zip(spots,textures):
+                Rectangle(texture=texture,pos=spot,size=texture.size)
+        atlas.draw()
+        self._atlases.append(atlas)
+        for pos in range(len(images)):
+            self._textures[images[pos]] = atlas.texture.get_region(spots[pos][0],
+                spots[pos][1],textures[pos].width,textures[pos].height)
+
+    def gettexture(self,source):
+        """
+        Returns the texture of the image file source, loading it if necessary.
+
+        Parameter source: the image file name (e.g. 'car1.png')
+        Precondition: source is a string
+        """
+        if not source in self._textures:
+            self.preload([source])
+        return self._textures[source]
+
+    def getsize(self,source):
+        """
+        Returns the (width,height) in pixels of the image file source.
+
+        Parameter source: the image file name (e.g. 'car1.png')
+        Precondition: source is a string
+        """
+        return tuple(self.gettexture(source).size)
+
+    def getimage(self,source,x=0,y=0,width=None,height=None,angle=0):
+        """
+        Returns a CachedImage of the image file source.
+
+        An image with the size of the file is taken from the images given back
+        with release, if there are any, instead of making a new one.
+
+        Parameter source: the image file name (e.g. 'car1.png')
+        Precondition: source is a string
+
+        Parameter x: the x coordinate of the image center
+        Precondition: x is a number
+
+        Parameter y: the y coordinate of the image center
+        Precondition: y is a number
+
+        Parameter width: the width of the image, or None for the file width
+        Precondition: width is None or a number > 0
+
+        Parameter height: the height of the image, or None for the file height
+        Precondition: height is None or a number > 0
+
+        Parameter angle: the rotation of the image in degrees
+        Precondition: angle is a number
+        """
+        if width is None and height is None:
+            spares = self._spares.get(source)
+            if spares:
+                image = spares.pop()
+                image.x = x
+                image.y = y
+                image.angle = angle
+                return image
+        return CachedImage(self.gettexture(source),x,y,width,height,angle)
+
+    def release(self,source,image):
+        """
+        Gives back an image that is no longer shown, so getimage can reuse it.
+
+        Parameter source: the image file name (e.g. 'car1.png')
+        Precondition: source is a string
+
+        Parameter image: the image to give back
+        Precondition: image is a CachedImage made by getimage with this source
+        and no width or height
+        """
+        self._spares.setdefault(source,[]).append(image)
+
+
+class CachedImage(object):
+    """
+    A class representing an image whose texture comes from an ImageCache.
+
+    It is drawn like a GImage and has the same x, y and angle attributes, but it
+    does not load a texture of its own.
+
+    Attribute x: The x coordinate of the image center
+    Invariant: x is a float
+
+    Attribute y: The y coordinate of the image center
+    Invariant: y is a float
+
+    Attribute angle: The rotation of the image in degrees, counterclockwise
+    Invariant: angle is a float
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _group: The drawing instructions of the image
+    # Invariant: _group is an InstructionGroup
+    #
+    # Attribute _move: The instruction that places the image center
+    # Invariant: _move is a Translate
+    #
+    # Attribute _turn: The instruction that rotates the image
+    # Invariant: _turn is a Rotate
+    #
+    # Attribute _width: The width of the image in pixels
+    # Invariant: _width is a number > 0
+    #
+    # Attribute _height: The height of the image in pixels
+    # Invariant: _height is a number > 0
+
+    @property
+    def x(self):
+        """The x coordinate of the image center"""
+        return self._move.x
+
+    @x.setter
+    def x(self,value):
+        self._move.x = value
+
+    @property
+    def y(self):
+        """The y coordinate of the image center"""
+        return self._move.y
+
+    @y.setter
+    def y(self,value):
+        self._move.y = value
+
+    @property
+    def angle(self):
+        """The rotation of the image in degrees"""
+        return self._turn.angle
+
+    @angle.setter
+    def angle(self,value):
+        self._turn.angle = value
+
+    @property
+    def width(self):
+        """The width of the image in pixels"""
+        return self._width
+
+    @property
+    def height(self):
+        """The height of the image in pixels"""
+        return self._height
+
+    @property
+    def left(self):
+        """The x coordinate of the left edge of the (unrotated) image"""
+        return self.x-self._width/2
+
+    def __init__(self,texture,x=0,y=0,width=None,height=None,angle=0):
+        """
+        Initializes an image showing the given texture.
+
+        Parameter texture: the shared texture of the image
+        Precondition: texture is a Kivy texture (usually an atlas region)
+
+        Parameter x: the x coordinate of the image center
+        Precondition: x is a number
+
+        Parameter y: the y coordinate of the image center
+        Precondition: y is a number
+
+        Parameter width: the width of the image, or None for the texture width
+        Precondition: width is None or a number > 0
+
+        Parameter height: the height of the image, or None for the texture height
+        Precondition: height is None or a number > 0
+
+        Parameter angle: the rotation of the image in degrees
+        Precondition: angle is a number
+        """
+        self._width = texture.width if width is None else width
+        self._height = texture.height if height is None else height
+        self._move = Translate(x,y)
+        self._turn = Rotate(angle=angle,axis=(0,0,1))
+        self._group = InstructionGroup()
+        self._group.add(PushMatrix())
+        self._group.add(self._move)
+        self._group.add(self._turn)
+        self._group.add(Color(1,1,1,1))
+        self._group.add(Rectangle(texture=texture,pos=(-self._width/2,
+            -self._height/2),size=(self._width,self._height)))
+        self._group.add(PopMatrix())
+
+    def draw(self,view):
+        """
+        Draws this image to the view.
+
+        Parameter view: The view window
+        Precondition: view is a GView
+        """
+        view.draw(self._group)
+
+
+def _findimage(source):
+    """
+    Returns the path to the image file source.
+
+    The file is looked for in the Images folder next to this module, and
+    otherwise as given.
+
+    Parameter source: the image file name
+    Precondition: source is a string
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),'Images',
+        source)
+    if os.path.isfile(path):
+        return path
+    return source
@@ -0,0 +1,445 @@
+"""
+Level compiler module for Froggit
+
+This module turns a level JSON into a compact binary form: the lane types and speeds
+and the object types and positions, each stored as one packed array. Compiled levels
+are cached on disk, in a file named by a hash of the JSON contents, and are read back
+with a memory map. Loading a cached level does not parse any JSON or walk any
+dictionaries; the arrays are used where they lie in the file.
+
+Only consts.py is used here, so levels can be compiled without game2d or Kivy.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from array import array
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+
+# The first bytes of every compiled level file
+LEVEL_MAGIC   = b'FRGL'
+# The version of the compiled format (change it whenever the format changes)
+LEVEL_VERSION = 1
+# The header: magic, version, byte order, width, height, offscreen, start x,
+# start y, number of lanes, number of objects, size of the type name table
+LEVEL_HEADER  = struct.Struct('=4sHBxIIIddIII')
+
+
+class CompiledLevel(object):
+    """
+    A class representing a level in compiled form.
+
+    The lanes and their objects are stored in packed arrays, with the objects of
+    all lanes one after the other. Use gettypes(row) and getpositions(row) to get
+    the objects of one lane. Object types are stored as indices into a table of
+    type names.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _size: the width and height of the level in grid squares
+    # Invariant: _size is a tuple of two ints
+    #
+    # Attribute _offscreen: the offscreen buffer in grid squares
+    # Invariant: _offscreen is a non-negative int
+    #
+    # Attribute _start: the starting grid square of the frog
+    # Invariant: _start is a tuple of two numbers
+    #
+    # Attribute _names: the object type names
+    # Invariant: _names is a tuple of strings
+    #
+    # Attribute _kinds: the type of each lane (see LANE_TYPES)
+    # Invariant: _kinds is a sequence of ints (format 'B'), one per lane
+    #
+    # Attribute _speeds: the speed of each lane in pixels per second
+    # Invariant: _speeds is a sequence of floats (format 'd'), one per lane
+    #
+    # Attribute _firsts: the index of the first object of each lane
+    # Invariant: _firsts is a sequence of ints (format 'I'), one more than the
+    # number of lanes; the last entry is the number of objects
+    #
+    # Attribute _types: the type of each object, as an index into _names
+    # Invariant: _types is a sequence of ints (format 'H')
+    #
+    # Attribute _positions: the position of each object in grid squares
+    # Invariant: _positions is a sequence of floats (format 'd')
+    #
+    # Attribute _buffer: the memory map the arrays point into
+    # Invariant: _buffer is an mmap, or None if the arrays are in memory
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getsize(self):
+        """
+        Returns the (width,height) of the level in grid squares
+        """
+        return self._size
+
+    def getoffscreen(self):
+        """
+        Returns the offscreen buffer in grid squares
+        """
+        return self._offscreen
+
+    def getstart(self):
+        """
+        Returns the (x,y) grid square where the frog starts
+        """
+        return self._start
+
+    def getnames(self):
+        """
+        Returns the tuple of object type names
+        """
+        return self._names
+
+    def getlanecount(self):
+        """
+        Returns the number of lanes in the level
+        """
+        return len(self._kinds)
+
+    def getkind(self,row):
+        """
+        Returns the type of lane row, one of LANE_GRASS, LANE_ROAD, LANE_WATER or
+        LANE_HEDGE
+
+        Parameter row: the lane, counted from the bottom
+        Precondition: row is a valid lane index
+        """
+        return self._kinds[row]
+
+    def getspeed(self,row):
+        """
+        Returns the speed of lane row in pixels per second
+
+        Parameter row: the lane, counted from the bottom
+        Precondition: row is a valid lane index
+        """
+        return self._speeds[row]
+
+    def gettypes(self,row):
+        """
+        Returns the object types of lane row, as indices into getnames()
+
+        The result is a view of the packed array, not a copy.
+
+        Parameter row: the lane, counted from the bottom
+        Precondition: row is a valid lane index
+        """
+        return self._types[self._firsts[row]:self._firsts[row+1]]
+
+    def getpositions(self,row):
+        """
+        Returns the object positions of lane row in grid squares
+
+        The result is a view of the packed array, not a copy.
+
+        Parameter row: the lane, counted from the bottom
+        Precondition: row is a valid lane index
+        """
+        return self._positions[self._firsts[row]:self._firsts[row+1]]
+
+    def __init__(self,size,offscreen,start,names,kinds,speeds,firsts,types,
+                 positions,buffer=None):
+        """
+        Initializes a compiled level from its arrays.
+
+        Use compilelevel or loadlevel instead of calling this directly.
+
+        Parameter size: the width and height of the level in grid squares
+        Precondition: size is a tuple of two ints
+
+        Parameter offscreen: the offscreen buffer in grid squares
+        Precondition: offscreen is a non-negative int
+
+        Parameter start: the starting grid square of the frog
+        Precondition: start is a tuple of two numbers
+
+        Parameter names: the object type names
+        Precondition: names is a tuple of strings
+
+        Parameter kinds: the type of each lane
+        Precondition: kinds is a memoryview of format 'B'
+
+        Parameter speeds: the speed of each lane
+        Precondition: speeds is a memoryview of format 'd'
+
+        Parameter firsts: the index of the first object of each lane
+        Precondition: firsts is a memoryview of format 'I'
+
+        Parameter types: the type of each object
+        Precondition: types is a memoryview of format 'H'
+
+        Parameter positions: the position of each object
+        Precondition: positions is a memoryview of format 'd'
+
+        Parameter buffer: the memory map the arrays point into
+        Precondition: buffer is an mmap or None
+        """
+        self._size = size
+        self._offscreen = offscreen
+        self._start = start
+        self._names = names
+        self._kinds = kinds
+        self._speeds = speeds
+        self._firsts = firsts
+        self._types = types
+        self._positions = positions
+        self._buffer = buffer
+
+    def tobytes(self):
+        """
+        Returns this level in the binary format read by unpacklevel.
+
+        The arrays are written largest element first, so each of them stays
+        aligned within the file.
+        """
+        names = '\n'.join(self._names).encode('utf-8')
+        header = LEVEL_HEADER.pack(LEVEL_MAGIC,LEVEL_VERSION,_byteorder(),
+            self._size[0],self._size[1],self._offscreen,self._start[0],
+            self._start[1],len(self._kinds),len(self._types),len(names))
+        padding = b'\0'*(-(len(header)+len(names)) % 8)
+        return b''.join((header,names,padding,self._speeds.tobytes(),
+            self._positions.tobytes(),self._firsts.tobytes(),
+            self._types.tobytes(),self._kinds.tobytes()))
+
+    def gethash(self):
+        """
+        Returns the SHA-256 digest (32 bytes) of this level in binary form.
+
+        Two levels with the same lanes and objects have the same hash, however
+        they were loaded, on machines with the same byte order.
+        """
+        return hashlib.sha256(self.tobytes()).digest()
+
+
+class LevelLoader(object):
+    """
+    A class that loads a level with loadlevel on a worker thread.
+
+    The loader starts as soon as it is made. Reading, hashing and compiling the
+    level JSON do not touch any graphics, so they can run while the game shows
+    something else. Only getlevel waits for the thread.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _thread: The worker thread
+    # Invariant: _thread is a Thread
+    #
+    # Attribute _level: The loaded level
+    # Invariant: _level is a CompiledLevel, or None if it is not loaded (yet)
+    #
+    # Attribute _error: The error raised while loading
+    # Invariant: _error is an Exception, or None if there was no error
+
+    def __init__(self,filename,directory=None):
+        """
+        Initializes the loader and starts loading the level file filename.
+
+        Parameter filename: the name of a level JSON file
+        Precondition: filename is a string
+
+        Parameter directory: the cache folder (optional, see loadlevel)
+        Precondition: directory is None or a string
+        """
+        self._level = None
+        self._error = None
+        self._thread = threading.Thread(target=self._load,
+            args=(filename,directory),daemon=True)
+        self._thread.start()
+
+    def isdone(self):
+        """
+        Returns True if the worker thread has finished (with or without error).
+        """
+        return not self._thread.is_alive()
+
+    def getlevel(self):
+        """
+        Returns the loaded CompiledLevel, waiting for the worker if necessary.
+
+        If loading failed, the error from the worker thread is raised here.
+        """
+        self._thread.join()
+        if not self._error is None:
+            raise self._error
+        return self._level
+
+    def _load(self,filename,directory):
+        """
+        Loads the level. This is the body of the worker thread.
+
+        Parameter filename: the name of a level JSON file
+        Precondition: filename is a string
+
+        Parameter directory: the cache folder
+        Precondition: directory is None or a string
+        """
+        try:
+            self._level = loadlevel(filename,directory)
+        except Exception as e:
+            self._error = e
+
+
+def compilelevel(data):
+    """
+    Returns the CompiledLevel for the given level JSON.
+
+    This is the only place where the lanes and objects of a level dictionary are
+    read one by one.
+
+    Parameter data: the level data
+    Precondition: data is a dictionary in the level JSON format
+    """
+    names = []
+    lookup = {}
+    kinds = array('B')
+    speeds = array('d')
+    firsts = array('I',[0])
+    types = array('H')
+    positions = array('d')
+
+    for item in data['lanes']:
+        kinds.append(LANE_TYPES.index(item['type']))
+        speeds.append(item['speed'] if 'speed' in item else 0)
+        if 'objects' in item:
+            for obj in item['objects']:
+                if not obj['type'] in lookup:
+                    lookup[obj['type']] = len(names)
+                    names.append(obj['type'])
+                types.append(lookup[obj['type']])
+                positions.append(obj['position'])
+        firsts.append(len(types))
+
+    return CompiledLevel((data['size'][0],data['size'][1]),data['offscreen'],
+        (data['start'][0],data['start'][1]),tuple(names),memoryview(kinds),
+        memoryview(speeds),memoryview(firsts),memoryview(types),
+        memoryview(positions))
+
+
+def unpacklevel(buffer):
+    """
+    Returns the CompiledLevel stored in buffer, or None if buffer is not valid.
+
+    The arrays of the result are views into buffer; nothing is copied. A buffer
+    written by a different format version or on a machine with the other byte
+    order is not valid.
+
+    Parameter buffer: the bytes of a compiled level
+    Precondition: buffer supports the buffer protocol (bytes, mmap, etc.)
+    """
+    view = memoryview(buffer)
+    if len(view) < LEVEL_HEADER.size:
+        return None
+    (magic,version,order,width,height,offscreen,startx,starty,nlanes,nobjs,
+     namesize) = LEVEL_HEADER.unpack_from(view)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION or order != _byteorder():
+        return None
+
+    pos = LEVEL_HEADER.size
+    text = bytes(view[pos:pos+namesize]).decode('utf-8')
+    names = tuple(text.split('\n')) if text else ()
+    pos += namesize
+    pos += -pos % 8
+
+    arrays = []
+    for code, count in (('d',nlanes),('d',nobjs),('I',nlanes+1),('H',nobjs),
+                        ('B',nlanes)):
+        size = count*struct.calcsize(code)
+        if pos+size > len(view):
+            return None
+        arrays.append(view[pos:pos+size].cast(code))
+        pos += size
+
+    speeds, positions, firsts, types, kinds = arrays
+    return CompiledLevel((width,height),offscreen,(startx,starty),names,kinds,
+        speeds,firsts,types,positions,buffer if type(buffer) == mmap.mmap
+        else None)
+
+
+def loadlevel(filename,directory=None):
+    """
+    Returns the CompiledLevel for the level JSON file filename.
+
+    The file is looked for in the JSON folder next to this module, and otherwise
+    as given. The compiled level is cached in the folder LEVEL_CACHE (or in
+    directory, if given) under the SHA-256 hash of the JSON file contents. If
+    that cache file exists it is memory mapped instead of parsing the JSON. If
+    not, the level is compiled and the cache file is written for next time. A
+    cache that cannot be written is not an error; the level is still returned.
+
+    Parameter filename: the name of a level JSON file
+    Precondition: filename is a string
+
+    Parameter directory: the cache folder (optional)
+    Precondition: directory is None or a string
+    """
+    path = _findlevel(filename)
+    with open(path,'rb') as file:
+        contents = file.read()
+
+    if directory is None:
+        directory = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+            LEVEL_CACHE)
+    digest = hashlib.sha256(contents).hexdigest()
+    cachepath = os.path.join(directory,digest+'.lvl')
+
+    level = _mapcache(cachepath)
+    if not level is None:
+        return level
+
+    level = compilelevel(json.loads(contents.decode('utf-8')))
+    temppath = cachepath+'.%d.tmp' % os.getpid()
+    try:
+        os.makedirs(directory,exist_ok=True)
+        try:
+            with open(temppath,'wb') as file:
+                file.write(level.tobytes())
+            os.replace(temppath,cachepath)
+        finally:
+            if os.path.exists(temppath):
+                os.remove(temppath)  # The write or the rename failed
+    except OSError:
+        pass # Play without a cache
+    return level
+
+
+def _findlevel(filename):
+    """
+    Returns the path to the level JSON file filename.
+
+    Parameter filename: the name of a level JSON file
+    Precondition: filename is a string
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),'JSON',
+        filename)
+    if os.path.isfile(path):
+        return path
+    return filename
+
+
+def _mapcache(cachepath):
+    """
+    Returns the CompiledLevel in the cache file cachepath, or None if there is
+    no valid cache file there.
+
+    Parameter cachepath: the path of a compiled level file
+    Precondition: cachepath is a string
+    """
+    try:
+        with open(cachepath,'rb') as file:
+            buffer = mmap.mmap(file.fileno(),0,access=mmap.ACCESS_READ)
+    except (OSError,ValueError):
+        return None
+    return unpacklevel(buffer)
+
+
+def _byteorder():
+    """
+    Returns 0 on little-endian machines and 1 on big-endian machines.
+    """
+    return 0 if sys.byteorder == 'little' else 1
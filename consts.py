@@ -9,8 +9,8 @@ access them.
 Author: Caroline Ryu (jr894)
 Date: December 19, 2020
 """
-import introcs
 import sys
+import time
 
 ### WINDOW CONSTANTS (all coordinates are in pixels) ###
 
@@ -20,6 +20,10 @@ GAME_WIDTH  = 1024
 GAME_HEIGHT = 896
 # The size in pixels of a single grid square
 GRID_SIZE    = 64
+# The largest part of a level (in pixels) shown at once; taller levels scroll
+VIEW_HEIGHT  = GAME_HEIGHT-GRID_SIZE
+# The number of lanes past the top and bottom of the window that are still drawn
+VIEW_MARGIN  = 1
 
 ### FROG CONSTANTS ###
 
@@ -64,6 +68,25 @@ STATE_CONTINUE = 4
 # The state when the game is complete (won or lost)
 STATE_COMPLETE = 5
 
+# The number of simulation steps per second (each step has the same length)
+TICK_RATE    = 60
+# The most simulation steps to run in one animation frame (to recover from hitches)
+MAX_SUBSTEPS = 5
+
+
+### LANE CONSTANTS ###
+
+# A grass lane (safe, no obstacles)
+LANE_GRASS = 0
+# A road lane with cars
+LANE_ROAD  = 1
+# A water lane with logs
+LANE_WATER = 2
+# The hedge lane with the exits
+LANE_HEDGE = 3
+# The lane type names used in the level JSON, indexed by the constants above
+LANE_TYPES = ('grass','road','water','hedge')
+
 
 ### FONT CONSTANTS ###
 
@@ -93,6 +116,71 @@ TRILL_SOUND = 'trill.wav'
 DEFAULT_LEVEL  = 'easy2.json'
 # The object data (hitboxes) file
 OBJECT_DATA    = 'objects.json'
+# The folder (next to the code) where compiled levels are cached
+LEVEL_CACHE    = '.levelcache'
+
+
+### PROFILER CONSTANTS ###
+
+# Whether to time the phases of every frame when the game starts
+PROFILE      = False
+# The command line flag that turns on the profiler
+PROFILE_FLAG = '--profile'
+# The key that turns the profiler (and its overlay) on and off
+PROFILE_KEY  = 'p'
+# The number of frames of timings kept for each phase
+PROFILE_SIZE = 600
+# The file the timings are written to when the profiler is turned off
+PROFILE_FILE = 'profile.json'
+# The number of seconds between refreshes of the profiler overlay
+PROFILE_REFRESH = 0.5
+
+
+### STARTUP CONSTANTS ###
+
+# Whether to time the startup of the game, and quit once the first frame is drawn
+STARTUP      = False
+# The command line flag that times the startup
+STARTUP_FLAG = '--startup'
+# The file the startup times are written to
+STARTUP_FILE = 'startup.json'
+# The time this module was first imported; the first thing the game does, so the
+# startup is timed from here
+STARTUP_TIME = time.perf_counter()
+
+
+### ENDLESS MODE CONSTANTS ###
+
+# Whether to play an endless generated level instead of DEFAULT_LEVEL
+ENDLESS       = False
+# The command line flag for endless mode (--endless, or --endless=SEED for a seed)
+ENDLESS_FLAG  = '--endless'
+# The seed of the endless level (the same seed always makes the same level)
+ENDLESS_SEED  = 0
+# The width of an endless level in grid squares
+ENDLESS_WIDTH = GAME_WIDTH//GRID_SIZE
+# The number of lanes kept in play (the size of the lane ring buffer)
+ENDLESS_LANES = 32
+# The number of lanes kept ahead of the frog
+ENDLESS_AHEAD = 16
+# Every lane whose row is a multiple of this is grass, where a new frog starts
+ENDLESS_GRASS = 5
+# The offscreen buffer of an endless level in grid squares
+ENDLESS_OFFSCREEN = 4
+
+
+### REPLAY CONSTANTS ###
+
+# Whether to record every game to a replay file (off unless --record is given)
+RECORD        = False
+# The command line flag that records the game to a replay file
+RECORD_FLAG   = '--record'
+# The folder (next to the code) where games are recorded
+REPLAY_FOLDER = 'replays'
+# The command line flag to watch a replay instead of playing (--replay=FILE)
+REPLAY_FLAG   = '--replay'
+# The replay file to watch, or None to play
+REPLAY_FILE   = None
 
 
 ### USE COMMAND LINE ARGUMENTS TO CHANGE DEFAULT LEVEL FILE AND FROG SPEED
@@ -102,27 +190,79 @@ everything after the word python. So if you start the game typing
 
     python froggit default.json 1
 
-Python puts ['froggit', 'default.json', '1'] into sys.argv. Below, we take advantage of
-this fact to change the constant DEFAULT_LEVEL. This is the level file to be used when
-you start the game.
+Python puts ['froggit', 'default.json', '1'] into sys.argv. The function parseargs below
+takes advantage of this fact to change the constant DEFAULT_LEVEL. This is the level file
+to be used when you start the game.
 
 The second argument is the FROG_SPEED, which is the amount of time between move steps.
 A large value means a much slower moving frog.
+
+The third argument is the TICK_RATE, the number of simulation steps per second.
+
+The flags --profile, --startup, --record, --endless (or --endless=SEED) and
+--replay=FILE may be given anywhere. They turn on the frame profiler, the startup
+timing, the recording of the game, the endless mode and the playback of a replay, and
+are taken out of sys.argv before the other arguments are read (Kivy does not know them
+either).
+
+Only the game reads these arguments: __main__.py calls parseargs before it imports any
+other module, so that every module sees the new constants. The other scripts and the
+tests import this module without calling it, so that their own arguments are left alone.
 """
-try:
-    file = sys.argv[1]
-    if file[-5:].lower() == '.json':
-        DEFAULT_LEVEL = file
-    else:
-        DEFAULT_LEVEL = file+'.json'
-except:
-    pass # Use original value
-
-try:
-    value = float(sys.argv[2])
-    FROG_SPEED = value
-except:
-    pass # Use original value
+def parseargs():
+    """
+    Changes the constants given on the command line, and takes the flags out of
+    sys.argv.
+
+    This must be called before any other module imports these constants.
+    """
+    global PROFILE, STARTUP, RECORD, ENDLESS, ENDLESS_SEED, REPLAY_FILE
+    global DEFAULT_LEVEL, FROG_SPEED, TICK_RATE
+    if PROFILE_FLAG in sys.argv:
+        PROFILE = True
+        sys.argv = [arg for arg in sys.argv if arg != PROFILE_FLAG]
+
+    if STARTUP_FLAG in sys.argv:
+        STARTUP = True
+        sys.argv = [arg for arg in sys.argv if arg != STARTUP_FLAG]
+
+    if RECORD_FLAG in sys.argv:
+        RECORD = True
+        sys.argv = [arg for arg in sys.argv if arg != RECORD_FLAG]
+
+    for arg in sys.argv[1:]:
+        if arg == ENDLESS_FLAG or arg.startswith(ENDLESS_FLAG+'='):
+            ENDLESS = True
+            try:
+                ENDLESS_SEED = int(arg[len(ENDLESS_FLAG)+1:])
+            except:
+                pass # Use original value
+            sys.argv.remove(arg)
+        elif arg.startswith(REPLAY_FLAG+'='):
+            REPLAY_FILE = arg[len(REPLAY_FLAG)+1:]
+            sys.argv.remove(arg)
+
+    try:
+        file = sys.argv[1]
+        if file[-5:].lower() == '.json':
+            DEFAULT_LEVEL = file
+        else:
+            DEFAULT_LEVEL = file+'.json'
+    except:
+        pass # Use original value
+
+    try:
+        value = float(sys.argv[2])
+        FROG_SPEED = value
+    except:
+        pass # Use original value
+
+    try:
+        value = int(sys.argv[3])
+        if value > 0:
+            TICK_RATE = value
+    except:
+        pass # Use original value
 
 
 ### ADD MORE CONSTANTS (PROPERLY COMMENTED) AS NECESSARY ###
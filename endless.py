@@ -0,0 +1,309 @@
+"""
+Endless mode module for Froggit
+
+This module generates an endless level, one lane at a time, as the frog moves up. Every
+lane is made from the seed and its row alone, so the same seed always makes the same
+level, in whatever order the lanes are made.
+
+Only ENDLESS_LANES lanes are kept in play, in a ring buffer: when a new lane is made
+ahead of the frog, it takes the place of the lane furthest behind the frog. Memory and
+the work done each frame stay the same however far the frog goes.
+
+Only consts.py and engine.py are used here, so the endless mode can be simulated
+without game2d or Kivy.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from engine import *
+import random
+
+# The object types of the cars on a road
+ENDLESS_CARS = ('car1', 'car2', 'truck1')
+# The object types of the logs on the water
+ENDLESS_LOGS = ('log2', 'log3')
+# Every object type of an endless level
+ENDLESS_NAMES = ENDLESS_CARS+ENDLESS_LOGS
+
+
+def makelane(seed,row,width=ENDLESS_WIDTH):
+    """
+    Returns the lane in row of the endless level with the given seed.
+
+    The lane is a dictionary in the format of a lane in the level JSON. Every
+    row that is a multiple of ENDLESS_GRASS is grass. The other rows are roads
+    or water, with lanes higher up moving faster.
+
+    Parameter seed: the seed of the level
+    Precondition: seed is an int
+
+    Parameter row: the row of the lane, counted from the bottom
+    Precondition: row is an int >= 0
+
+    Parameter width: the width of the level in grid squares
+    Precondition: width is an int > 0
+    """
+    if row % ENDLESS_GRASS == 0:
+        return {'type': 'grass'}
+
+    rand = random.Random('%d:%d' % (seed,row))
+    kind = rand.choice(('road','water'))
+    speed = rand.choice((-1,1))*rand.randint(40,80+min(row,120))
+    if kind == 'road':
+        names = ENDLESS_CARS
+        gap = (3,6)
+    else:
+        names = ENDLESS_LOGS
+        gap = (3,4)
+
+    objects = []
+    position = rand.uniform(0,gap[1])
+    while position < width+2*ENDLESS_OFFSCREEN:
+        objects.append({'type': rand.choice(names),
+                        'position': position-ENDLESS_OFFSCREEN})
+        position += rand.randint(*gap)
+    return {'type': kind, 'speed': speed, 'objects': objects}
+
+
+def makelevel(seed,lanes=ENDLESS_LANES,width=ENDLESS_WIDTH):
+    """
+    Returns the first lanes of the endless level as a level JSON dictionary.
+
+    The frog starts in the middle of the bottom lane, which is grass.
+
+    Parameter seed: the seed of the level
+    Precondition: seed is an int
+
+    Parameter lanes: the number of lanes
+    Precondition: lanes is an int > 0
+
+    Parameter width: the width of the level in grid squares
+    Precondition: width is an int > 0
+    """
+    return {'version': 1, 'size': [width,lanes], 'start': [width//2,0],
+            'offscreen': ENDLESS_OFFSCREEN,
+            'lanes': [makelane(seed,row,width) for row in range(lanes)]}
+
+
+class EndlessSimulation(Simulation):
+    """
+    This class simulates an endless level of Froggit.
+
+    It starts with the first ENDLESS_LANES lanes of makelevel. Whenever the frog
+    gets closer than ENDLESS_AHEAD lanes to the top, the next lane is made and
+    replaces the bottom lane. The rows keep counting up, so getlane(row) and the
+    y coordinates of the frog work as in a Simulation, for the rows in getrows().
+
+    There are no exits, so an endless level is never won. The score is the
+    highest row the frog has reached.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _seed: the seed of the level
+    # Invariant: _seed is an int
+    #
+    # Attribute _shapes: the hitboxes of the object types
+    # Invariant: _shapes is a dictionary mapping strings to (lo,hi) tuples
+    #
+    # Attribute _first: the lowest row still in play
+    # Invariant: _first is an int >= 0, and row r is kept in
+    # _lanes[r % ENDLESS_LANES] for every r from _first to _first+ENDLESS_LANES-1
+    #
+    # Attribute _best: the highest row the frog has reached
+    # Invariant: _best is an int >= 0
+    #
+    # Attribute _spares: the lanes thrown away, by lane type, to be reset and
+    # used again by _makelane
+    # Invariant: _spares is a dictionary mapping lane types to lists of SimLanes
+    # of the class of that type (see LANE_CLASSES)
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getseed(self):
+        """
+        Returns the seed of the level
+        """
+        return self._seed
+
+    def getscore(self):
+        """
+        Returns the highest row the frog has reached
+        """
+        return self._best
+
+    def getrows(self):
+        """
+        Returns the (first,end) rows in play: the frog may be in any row from
+        first up to (but not including) end.
+        """
+        return (self._first,self._first+len(self._lanes))
+
+    def getlanes(self):
+        """
+        Returns the list of lanes in play, from bottom to top, moved to the
+        current time
+        """
+        first, end = self.getrows()
+        return [self.getlane(row) for row in range(first,end)]
+
+    def getlane(self,row):
+        """
+        Returns the simulated lane in row, moved to the current time
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int in the range of getrows()
+        """
+        lane = self._lanes[row % len(self._lanes)]
+        if lane.gettime() != self._time:
+            lane.settime(self._time)
+        return lane
+
+    def getkind(self,row):
+        """
+        Returns the lane type of row (LANE_GRASS, LANE_ROAD or LANE_WATER)
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int in the range of getrows()
+        """
+        return self._kinds[row % len(self._kinds)]
+
+    def setfrog(self,frogx,frogy):
+        """
+        Puts the frog back in play at (frogx,frogy), facing north.
+
+        A row that is no longer in play is replaced by the lowest grass row that
+        is, so the frog never starts in a lane that was thrown away.
+
+        Parameter frogx: the x position of the frog (in pixels)
+        Precondition: frogx is a float
+
+        Parameter frogy: the y position of the frog (in pixels)
+        Precondition: frogy is a float
+        """
+        if frogy < self._first*GRID_SIZE:
+            row = -(-self._first // ENDLESS_GRASS)*ENDLESS_GRASS
+            frogy = row*GRID_SIZE+0.5*GRID_SIZE
+        super().setfrog(frogx,frogy)
+
+    # INITIALIZER TO CREATE THE FROG AND LANES
+    def __init__(self,seed=ENDLESS_SEED,shapes=None,width=ENDLESS_WIDTH):
+        """
+        Initializes an endless level with the given seed.
+
+        Parameter seed: the seed of the level
+        Precondition: seed is an int
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+
+        Parameter width: the width of the level in grid squares
+        Precondition: width is an int > 0
+        """
+        super().__init__(makelevel(seed,ENDLESS_LANES,width),shapes)
+        self._seed = seed
+        self._shapes = {} if shapes is None else shapes
+        self._shapehash = hashshapes(self._shapes,ENDLESS_NAMES)
+        self._first = 0
+        self._best = 0
+        self._spares = {}
+
+    # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
+    def update(self,input,dt):
+        """
+        Advances the simulation by one animation frame.
+
+        Afterwards, new lanes are made until there are ENDLESS_AHEAD lanes
+        above the frog.
+
+        Parameter input: the keys held down in this frame
+        Precondition: input is a GInput or a ScriptedInput
+
+        Parameter dt: time in seconds since the last call to update
+        Precondition: dt is a non-negative float
+        """
+        super().update(input,dt)
+        row = self._frogrow()
+        if row is None:
+            return
+        self._best = max(self._best,row)
+        while row+ENDLESS_AHEAD >= self._first+len(self._lanes):
+            self._nextlane()
+
+    def snapshot(self):
+        """
+        Returns a Snapshot of the current state of the simulation.
+
+        Besides the state of a Simulation, the snapshot keeps the lowest row in
+        play and the score. The lanes themselves are not kept, since they can
+        always be made again from the seed.
+        """
+        snapshot = super().snapshot()
+        snapshot.extra = (self._first,self._best)
+        return snapshot
+
+    def restore(self,snapshot):
+        """
+        Puts the simulation back in the state of snapshot.
+
+        Every lane in play that is not the one the snapshot had in its row is
+        made again from the seed.
+
+        Parameter snapshot: the state to go back to
+        Precondition: snapshot is a Snapshot made by snapshot() of this
+        simulation
+        """
+        self._first, self._best = snapshot.extra
+        for row in range(self._first,self._first+len(self._lanes)):
+            if self._lanes[row % len(self._lanes)].getrow() != row:
+                self._makelane(row)
+        self._height = (self._first+len(self._lanes))*GRID_SIZE
+        super().restore(snapshot)
+
+    # PUBLIC NECESSARY HELPERS
+    def exitfill(self):
+        """
+        Returns False, since an endless level has no exits to fill
+        """
+        return False
+
+    # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
+    def _nextlane(self):
+        """
+        Makes the lane above the top lane, in place of the bottom lane.
+        """
+        self._makelane(self._first+len(self._lanes))
+        self._first += 1
+        self._height = (self._first+len(self._lanes))*GRID_SIZE
+
+    def _makelane(self,row):
+        """
+        Makes the lane in row from the seed, in place of the lane kept in the
+        same position of the ring buffer.
+
+        No new SimLane is made once there is a spare lane of each type: the lane
+        that is replaced is reset if it has the same type, and otherwise it is
+        kept as a spare and a spare of the new type is reset instead.
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int >= 0
+        """
+        data = makelane(self._seed,row,self._width//GRID_SIZE)
+        kind = LANE_TYPES.index(data['type'])
+        objects = data.get('objects',[])
+        slot = row % len(self._lanes)
+        lane = self._lanes[slot]
+        if self._kinds[slot] != kind:
+            self._spares.setdefault(self._kinds[slot],[]).append(lane)
+            spares = self._spares.get(kind)
+            lane = spares.pop() if spares else None
+        args = (row,data.get('speed',0),
+            [ENDLESS_NAMES.index(obj['type']) for obj in objects],
+            [obj['position'] for obj in objects],ENDLESS_NAMES,self._shapes,
+            self._width,self._buffer)
+        if lane is None:
+            lane = LANE_CLASSES[kind](*args)
+        else:
+            lane.reset(*args)
+        lane.settime(self._time)
+        self._lanes[slot] = lane
+        self._kinds[slot] = kind
@@ -0,0 +1,1413 @@
+"""
+Headless simulation module for Froggit
+
+This module contains a pure-Python version of the rules of a Froggit level: obstacle
+motion, road collisions, the water carry, the hedge exits and the frog movement. None
+of the classes here touch game2d or Kivy, so a level can be simulated without a window
+(for example on a CI machine). The Level class in level.py owns one Simulation and only
+copies its state into the GImage objects that are drawn on screen.
+
+Instead of a GInput, the simulation can be driven by a ScriptedInput, which replays a
+fixed list of key presses one animation frame at a time.
+
+The state of a simulation can be saved in a small Snapshot and restored later, to roll
+a game back or to search ahead from one state many times.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from compiler import *
+from bisect import bisect_left, bisect_right
+from array import array
+import hashlib
+import json
+import os
+import struct
+
+# NumPy is optional. Without it, lanes keep their positions in plain lists. Importing
+# it takes longer than everything else here, so it is only imported when the first
+# lane is made (see loadnumpy); until then numpy is None.
+numpy = None
+# Whether loadnumpy has tried to import NumPy yet
+_numpytried = False
+
+
+def loadnumpy():
+    """
+    Returns the NumPy module, or None if it is not installed.
+
+    NumPy is imported the first time this is called, and kept in numpy from then
+    on. A module that uses numpy should call this before it does.
+    """
+    global numpy, _numpytried
+    if not _numpytried:
+        _numpytried = True
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    return numpy
+
+
+def compileshapes(data=None,sizes=None):
+    """
+    Returns a dictionary with the hitbox of each object type.
+
+    A hitbox is a tuple (lo,hi), the horizontal extent of the object relative to
+    its center. The object data (from OBJECT_DATA) maps each object type, like
+    'car1' or 'log2', to a dictionary whose 'hitbox' is a list of [x,y] points
+    relative to the center of the object. Only the x coordinates matter, since
+    every object fills its own row. Types without a hitbox fall back to the
+    width given in sizes.
+
+    This is meant to be called once when a level is loaded. The collision checks
+    in the lanes then only compare numbers against these tuples.
+
+    Parameter data: the object data (optional)
+    Precondition: data is None or a dictionary in the OBJECT_DATA format
+
+    Parameter sizes: the width in pixels of each object type (optional)
+    Precondition: sizes is None or a dictionary mapping strings to numbers
+    """
+    shapes = {}
+    if not sizes is None:
+        for kind in sizes:
+            shapes[kind] = (-sizes[kind]/2,sizes[kind]/2)
+    if not data is None:
+        for kind in data:
+            entry = data[kind]
+            if type(entry) == dict and 'hitbox' in entry:
+                xs = [point[0] for point in entry['hitbox']]
+                shapes[kind] = (min(xs),max(xs))
+    return shapes
+
+
+def loadshapes(filename=OBJECT_DATA):
+    """
+    Returns the hitboxes in the object data file filename, as the game makes them.
+
+    The file is looked for in the JSON folder next to this module, and otherwise as
+    given. As in Level, the types without a hitbox are as wide as their images in
+    the Images folder (the widths are read from the PNG headers, without Kivy). If
+    the default OBJECT_DATA cannot be found, only the image widths are used, and
+    without them every object is one grid square wide.
+
+    Parameter filename: the object data file
+    Precondition: filename is a string
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    sizes = {}
+    images = os.path.join(folder,'Images')
+    if os.path.isdir(images):
+        for name in os.listdir(images):
+            if name.endswith('.png'):
+                width = _pngwidth(os.path.join(images,name))
+                if not width is None:
+                    sizes[name[:-4]] = width
+
+    path = os.path.join(folder,'JSON',filename)
+    if not os.path.isfile(path):
+        path = filename
+    if filename == OBJECT_DATA and not os.path.isfile(path):
+        return compileshapes(None,sizes)
+    with open(path) as file:
+        return compileshapes(json.load(file),sizes)
+
+
+def _pngwidth(path):
+    """
+    Returns the width in pixels of the PNG file path, or None if it is not a PNG.
+
+    Parameter path: the path of an image file
+    Precondition: path is a string
+    """
+    with open(path,'rb') as file:
+        header = file.read(24)
+    if len(header) < 24 or header[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    return struct.unpack('>I',header[16:20])[0]
+
+
+def getshape(shapes,kind):
+    """
+    Returns the hitbox (lo,hi) of the given object type.
+
+    Types that are not in shapes are one grid square wide.
+
+    Parameter shapes: the hitboxes made by compileshapes
+    Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter kind: the object type
+    Precondition: kind is a string
+    """
+    if kind in shapes:
+        return shapes[kind]
+    return (-GRID_SIZE/2,GRID_SIZE/2)
+
+
+def hashshapes(shapes,names):
+    """
+    Returns the SHA-256 hash (32 bytes) of the hitboxes of the object types names
+    and of the frog.
+
+    Two simulations of a level with the same hash have the same hitboxes, so the
+    same keys play out the same way in both. Types missing from shapes are hashed
+    with their default hitbox (see getshape).
+
+    Parameter shapes: the hitboxes made by compileshapes
+    Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter names: the object types of the level
+    Precondition: names is a sequence of strings
+    """
+    digest = hashlib.sha256()
+    for kind in sorted(set(names) | {FROG_IMAGE[:-4]}):
+        lo, hi = getshape(shapes,kind)
+        digest.update(('%s:%r:%r;' % (kind,float(lo),float(hi))).encode('utf-8'))
+    return digest.digest()
+
+
+class ScriptedInput(object):
+    """
+    A replacement for GInput that plays back a script of key presses.
+
+    Each entry of the script is the set of keys held down during one animation frame.
+    An entry may be None (no keys), a single key name like 'up', or a tuple of key
+    names. Once the script runs out, no keys are pressed.
+
+    Attribute key_count: The number of keys held down in the current frame
+    Invariant: key_count is an int >= 0
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _script: The key presses, one entry per animation frame
+    # Invariant: _script is a list of tuples of key names
+    #
+    # Attribute _tick: The index of the current animation frame
+    # Invariant: _tick is an int >= 0
+
+    def __init__(self,script=()):
+        """
+        Initializes the input with the given script.
+
+        Parameter script: The key presses, one entry per animation frame
+        Precondition: script is an iterable of None, strings or tuples of strings
+        """
+        self._script = []
+        for entry in script:
+            if entry is None:
+                self._script.append(())
+            elif type(entry) == str:
+                self._script.append((entry,))
+            else:
+                self._script.append(tuple(entry))
+        self._tick = 0
+        self.key_count = len(self._current())
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down in the current frame.
+
+        Parameter key: The key name
+        Precondition: key is a string
+        """
+        return key in self._current()
+
+    def advance(self):
+        """
+        Moves the script forward by one animation frame.
+        """
+        self._tick += 1
+        self.key_count = len(self._current())
+
+    def finished(self):
+        """
+        Returns True if every frame of the script has been played.
+        """
+        return self._tick >= len(self._script)
+
+    def _current(self):
+        """
+        Returns the tuple of keys held down in the current frame.
+        """
+        if self._tick < len(self._script):
+            return self._script[self._tick]
+        return ()
+
+
+class SimFrog(object):
+    """
+    A class representing the position and heading of the simulated frog.
+
+    Attribute x: The x coordinate of the frog center in pixels
+    Invariant: x is a float
+
+    Attribute y: The y coordinate of the frog center in pixels
+    Invariant: y is a float
+
+    Attribute angle: The heading of the frog
+    Invariant: angle is one of FROG_NORTH, FROG_WEST, FROG_EAST or FROG_SOUTH
+    """
+    __slots__ = ('x','y','angle')
+
+    def __init__(self,x,y):
+        """
+        Initializes the frog at (x,y), facing north.
+
+        Parameter x: The x coordinate of the frog center in pixels
+        Precondition: x is a float
+
+        Parameter y: The y coordinate of the frog center in pixels
+        Precondition: y is a float
+        """
+        self.reset(x,y)
+
+    def reset(self,x,y):
+        """
+        Moves the frog to (x,y), facing north.
+
+        This lets a frog that was removed from play be used again.
+
+        Parameter x: The x coordinate of the frog center in pixels
+        Precondition: x is a float
+
+        Parameter y: The y coordinate of the frog center in pixels
+        Precondition: y is a float
+        """
+        self.x = x
+        self.y = y
+        self.angle = FROG_NORTH
+
+
+class Snapshot(object):
+    """
+    A class representing the state of a Simulation at one moment.
+
+    A snapshot holds only numbers, tuples and arrays, never a lane or an image, so
+    it is small and quick to make. The obstacles are not stored at all: every lane
+    computes its positions from the time, so restoring the time moves them back.
+    A snapshot is never changed, so it can be restored any number of times.
+
+    Attribute time: The simulation time in seconds
+    Invariant: time is a non-negative float
+
+    Attribute ticks: The number of times update had been called
+    Invariant: ticks is an int >= 0
+
+    Attribute cooldown: The time left before the frog may move again
+    Invariant: cooldown is a float
+
+    Attribute lives: The number of lives left
+    Invariant: lives is an int between 0 and FROG_LIVES
+
+    Attribute safe: The number of safe frogs (filled exits)
+    Invariant: safe is an int >= 0
+
+    Attribute frog: The position and heading of the frog
+    Invariant: frog is an (x,y,angle) tuple, or None if there was no frog in play
+
+    Attribute death: The row and cause of the last death of the frog
+    Invariant: death is a (row,cause) tuple, or None
+
+    Attribute hedges: The centers of the safe frogs in each hedge, from bottom
+    to top
+    Invariant: hedges is a tuple of arrays of floats, each holding x0,y0,x1,y1,...
+
+    Attribute extra: The state kept by a subclass of Simulation
+    Invariant: extra is a tuple, or None if there is none
+    """
+    __slots__ = ('time','ticks','cooldown','lives','safe','frog','death','hedges',
+                 'extra')
+
+    def __init__(self,time,ticks,cooldown,lives,safe,frog,death,hedges,extra=None):
+        """
+        Initializes a snapshot with the given state.
+
+        The parameters are the attributes of the same name, with the same
+        preconditions as their invariants.
+        """
+        self.time = time
+        self.ticks = ticks
+        self.cooldown = cooldown
+        self.lives = lives
+        self.safe = safe
+        self.frog = frog
+        self.death = death
+        self.hedges = hedges
+        self.extra = extra
+
+
+class SimLane(object):
+    """
+    Parent class for a simulated lane.
+
+    A lane is one row of the level. All of its obstacles move at the same speed, so
+    their cyclic left-to-right order never changes. The lane stores each obstacle
+    once, by its center at the start of the level (its base), and a single offset
+    for how far the whole lane has moved since. The current x coordinate of an
+    obstacle is (base + offset) % _period - _margin.
+
+    The offset is not added up frame by frame. It is computed in closed form as
+    speed*t modulo _period, where t is the simulation time, so a lane can be moved
+    to any time at once and does not drift when the frame times vary.
+
+    The bases are also kept sorted, so the obstacle under a point is found with a
+    binary search instead of a scan over every obstacle.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _row: The row of the lane, counted from the bottom of the level
+    # Invariant: _row is an int >= 0
+    #
+    # Attribute _speed: The speed of the obstacles in pixels per second
+    # Invariant: _speed is a number (0 for lanes that do not move)
+    #
+    # Attribute _margin: The offscreen buffer in pixels
+    # Invariant: _margin is a non-negative number
+    #
+    # Attribute _period: The distance an obstacle travels before it wraps around
+    # Invariant: _period is the level width plus twice _margin
+    #
+    # Attribute _offset: How far the lane has moved at time _time, modulo _period
+    # Invariant: _offset is a float in [0,_period)
+    #
+    # Attribute _time: The simulation time the lane was last moved to
+    # Invariant: _time is a float
+    #
+    # Attribute _base: The center of each obstacle at the start, plus _margin
+    # Invariant: _base is a float NumPy array (a list without NumPy) of values in
+    # [0,_period), in the order of the objects in the level JSON
+    #
+    # Attribute _xs: The current x coordinates of the obstacle centers
+    # Invariant: _xs is a float NumPy array (a list without NumPy), the same
+    # length as _base; it is only up to date right after a call to getxs
+    #
+    # Attribute _centers: The values of _base, sorted
+    # Invariant: _centers is a sorted list of floats
+    #
+    # Attribute _order: The obstacle at each position of _centers
+    # Invariant: _order is a list of indices into _base
+    #
+    # Attribute _reach: The largest distance from a center to its hitbox edge
+    # Invariant: _reach is a non-negative number
+    #
+    # Attribute _names: The object type names of the level
+    # Invariant: _names is a tuple of strings
+    #
+    # Attribute _ids: The type of each obstacle, as an index into _names
+    # Invariant: _ids is a list of ints, the same length as _base
+    #
+    # Attribute _los: The left edge of each hitbox, relative to the obstacle center
+    # Invariant: _los is a list of numbers, the same length as _base
+    #
+    # Attribute _his: The right edge of each hitbox, relative to the obstacle center
+    # Invariant: _his is a list of numbers, the same length as _base
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getrow(self):
+        """
+        Returns the row of this lane, counted from the bottom of the level
+        """
+        return self._row
+
+    def getspeed(self):
+        """
+        Returns the speed of the obstacles in this lane in pixels per second
+        """
+        return self._speed
+
+    def gettime(self):
+        """
+        Returns the simulation time in seconds that the lane was last moved to
+        """
+        return self._time
+
+    def getxs(self,t=None):
+        """
+        Returns the x coordinates of the obstacle centers (an array or a list)
+
+        The coordinates are in the order of the objects in the level JSON. They
+        are computed when this method is called, so the result is only valid
+        until the next call. If t is given, they are the positions at time t,
+        without moving the lane there (this is used to draw between two
+        simulation steps).
+
+        Parameter t: the simulation time in seconds (optional)
+        Precondition: t is None or a float
+        """
+        if t is None:
+            offset = self._offset
+        else:
+            offset = (t*self._speed) % self._period
+        if numpy is None:
+            period = self._period
+            margin = self._margin
+            self._xs = [(base+offset) % period - margin for base in self._base]
+        else:
+            numpy.add(self._base,offset,out=self._xs)
+            numpy.remainder(self._xs,self._period,out=self._xs)
+            self._xs -= self._margin
+        return self._xs
+
+    def gettypes(self):
+        """
+        Returns the list of obstacle types (e.g. 'car1' or 'exit') in this lane
+
+        The types are in the order of the objects in the level JSON.
+        """
+        return [self._names[kind] for kind in self._ids]
+
+    # INITIALIZER TO SET LANE POSITION AND OBJECTS
+    def __init__(self,row,speed,types,positions,names,shapes,width,buffer):
+        """
+        Initializes one simulated lane from the arrays of a compiled level.
+
+        The parameters are the same as for reset.
+        """
+        self.reset(row,speed,types,positions,names,shapes,width,buffer)
+
+    def reset(self,row,speed,types,positions,names,shapes,width,buffer):
+        """
+        Makes this lane the lane in row with the given obstacles, at time 0.
+
+        This is what the initializer does, so a level that throws lanes away as
+        it scrolls (see endless.py) can reuse them instead of making new ones.
+
+        Obstacles in a lane with negative speed are drawn turned around, so
+        their hitboxes are mirrored. With NumPy, the obstacle arrays are
+        converted in bulk rather than one obstacle at a time.
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int >= 0
+
+        Parameter speed: the speed of the lane in pixels per second
+        Precondition: speed is a number
+
+        Parameter types: the type of each obstacle, as an index into names
+        Precondition: types is a sequence of ints
+
+        Parameter positions: the position of each obstacle in grid squares
+        Precondition: positions is a sequence of numbers, the same length as types
+
+        Parameter names: the object type names of the level
+        Precondition: names is a tuple of strings
+
+        Parameter shapes: the hitbox of each object type (see compileshapes)
+        Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+        Parameter width: the width of the level in pixels
+        Precondition: width is a non-negative number
+
+        Parameter buffer: the offscreen buffer, in grid squares
+        Precondition: buffer is a non-negative int
+        """
+        self._row = row
+        self._speed = speed
+        self._margin = buffer*GRID_SIZE
+        self._period = width+2*self._margin
+        self._offset = 0.0
+        self._time = 0.0
+        self._names = names
+
+        # the hitbox of each type, mirrored if the lane moves left
+        los = []
+        his = []
+        for name in names:
+            lo, hi = getshape(shapes,name)
+            if speed < 0:
+                lo, hi = -hi, -lo
+            los.append(lo)
+            his.append(hi)
+
+        shift = .5*GRID_SIZE+self._margin
+        if loadnumpy() is None:
+            self._ids = list(types)
+            self._base = [(pos*GRID_SIZE+shift) % self._period for pos in positions]
+            self._xs = list(self._base)
+            self._los = [los[kind] for kind in self._ids]
+            self._his = [his[kind] for kind in self._ids]
+            self._order = sorted(range(len(self._base)),
+                key=lambda pos: self._base[pos])
+            self._centers = [self._base[pos] for pos in self._order]
+        else:
+            ids = numpy.asarray(types,dtype=numpy.intp)
+            self._ids = ids.tolist()
+            self._base = numpy.remainder(
+                numpy.asarray(positions,dtype=float)*GRID_SIZE+shift,self._period)
+            self._xs = numpy.empty(len(self._base))
+            self._los = numpy.asarray(los,dtype=float)[ids].tolist()
+            self._his = numpy.asarray(his,dtype=float)[ids].tolist()
+            order = numpy.argsort(self._base,kind='stable')
+            self._order = order.tolist()
+            self._centers = self._base[order].tolist()
+
+        self._reach = 0
+        if len(self._ids) > 0:
+            self._reach = max(0,max(self._his),-min(self._los))
+
+    def settime(self,t):
+        """
+        Moves the obstacles to where they are at simulation time t.
+
+        Only the offset of the lane changes; obstacles that move more than the
+        offscreen buffer past the edge of the level wrap around to the other side
+        because the offset is taken modulo _period. This takes constant time, for
+        any t, forwards or backwards.
+
+        Parameter t: the simulation time in seconds
+        Precondition: t is a float
+        """
+        self._time = t
+        self._offset = (t*self._speed) % self._period
+
+    def _getx(self,pos):
+        """
+        Returns the current x coordinate of the center of obstacle pos.
+
+        Parameter pos: the index of the obstacle
+        Precondition: pos is a valid index of _base
+        """
+        return (self._base[pos]+self._offset) % self._period - self._margin
+
+    def _nearby(self,x,reach):
+        """
+        Returns the obstacles whose centers are at most reach pixels from x.
+
+        The result is a list of indices into _base. The search is a binary search
+        over the sorted centers, so it takes O(log n) time plus the number of
+        obstacles found.
+
+        Parameter x: an x coordinate in pixels
+        Precondition: x is a number
+
+        Parameter reach: the search distance in pixels
+        Precondition: reach is a non-negative number
+        """
+        left = max(x-reach,-self._margin)
+        right = min(x+reach,self._period-self._margin)
+        if left > right:
+            return []
+        start = (left+self._margin-self._offset) % self._period
+        end = start+(right-left)
+        first = bisect_left(self._centers,start)
+        if end < self._period:
+            return self._order[first:bisect_right(self._centers,end)]
+        last = bisect_right(self._centers,end-self._period)
+        return self._order[first:]+self._order[:last]
+
+    def _contains(self,pos,x):
+        """
+        Returns True if the hitbox of obstacle pos contains the x coordinate x.
+
+        Parameter pos: the index of the obstacle
+        Precondition: pos is a valid index of _base
+
+        Parameter x: an x coordinate in pixels
+        Precondition: x is a number
+        """
+        d = x-self._getx(pos)
+        return self._los[pos] < d < self._his[pos]
+
+
+class SimGrass(SimLane):
+    """
+    A class representing a simulated 'safe' grass area.
+    """
+    pass
+
+
+class SimRoad(SimLane):
+    """
+    A class representing a simulated roadway with cars.
+    """
+    def carcollision(self,frog,frogbox):
+        """
+        Returns True if the hitbox of a car overlaps the hitbox of the frog.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog in this lane
+
+        Parameter frogbox: the hitbox of the frog, relative to its center
+        Precondition: frogbox is a (lo,hi) tuple
+        """
+        left = frog.x+frogbox[0]
+        right = frog.x+frogbox[1]
+        reach = self._reach+max(frogbox[1],-frogbox[0])
+        for pos in self._nearby(frog.x,reach):
+            x = self._getx(pos)
+            if x+self._los[pos] < right and left < x+self._his[pos]:
+                return True
+        return False
+
+
+class SimWater(SimLane):
+    """
+    A class representing a simulated waterway with logs.
+    """
+    def onalog(self,frog):
+        """
+        Returns True if a log contains the center of the frog.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog in this lane
+        """
+        for pos in self._nearby(frog.x,self._reach):
+            if self._contains(pos,frog.x):
+                return True
+        return False
+
+    def frogoffscreen(self,frog,width):
+        """
+        Returns True if the frog has been carried off screen by a log.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog
+
+        Parameter width: the width of the level in pixels
+        Precondition: width is a non-negative number
+        """
+        return frog.x < -GRID_SIZE//4 or frog.x > width+GRID_SIZE//4
+
+
+class SimHedge(SimLane):
+    """
+    A class representing the simulated exit hedge.
+
+    Besides the exits and opens, a hedge keeps the positions of the frogs that made
+    it safely into an exit.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _safefrogs: The centers of the frogs that reached an exit
+    # Invariant: _safefrogs is a list of (x,y) tuples
+    #
+    # Attribute _exits: The number of exits in the hedge
+    # Invariant: _exits is an int >= 0
+    #
+    # Attribute _occupied: The grid columns that hold a safe frog
+    # Invariant: _occupied is an int whose bit col is set exactly when
+    # _columns has the key col
+    #
+    # Attribute _columns: The x coordinates of the safe frogs in each column
+    # Invariant: _columns is a dictionary mapping column numbers to non-empty
+    # lists of the x coordinates in _safefrogs
+
+    def getsafefrogs(self):
+        """
+        Returns the list of (x,y) centers of the frogs that reached an exit
+        """
+        return self._safefrogs
+
+    def getexits(self):
+        """
+        Returns the number of exits in the hedge
+        """
+        return self._exits
+
+    def getcoords(self):
+        """
+        Returns the centers of the safe frogs as one array x0,y0,x1,y1,...
+        """
+        coords = array('d')
+        for frog in self._safefrogs:
+            coords.extend(frog)
+        return coords
+
+    def setcoords(self,coords):
+        """
+        Replaces the safe frogs with the ones centered at coords.
+
+        The list of safe frogs is replaced by a new list, so a view that holds
+        the old one can tell that it changed.
+
+        Parameter coords: the centers of the safe frogs, as x0,y0,x1,y1,...
+        Precondition: coords is a sequence of floats of even length
+        """
+        self._safefrogs = []
+        self._occupied = 0
+        self._columns = {}
+        for pos in range(0,len(coords),2):
+            self._safefrogs.append((coords[pos],coords[pos+1]))
+            col = self._column(coords[pos])
+            self._occupied |= 1 << col
+            self._columns.setdefault(col,[]).append(coords[pos])
+
+    def reset(self,row,speed,types,positions,names,shapes,width,buffer):
+        """
+        Makes this hedge the hedge in row with the given obstacles, and no safe
+        frogs.
+
+        The parameters are the same as for SimLane.
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int >= 0
+
+        Parameter speed: the speed of the lane in pixels per second
+        Precondition: speed is a number
+
+        Parameter types: the type of each obstacle, as an index into names
+        Precondition: types is a sequence of ints
+
+        Parameter positions: the position of each obstacle in grid squares
+        Precondition: positions is a sequence of numbers, the same length as types
+
+        Parameter names: the object type names of the level
+        Precondition: names is a tuple of strings
+
+        Parameter shapes: the hitbox of each object type (see compileshapes)
+        Precondition: shapes is a dictionary mapping strings to (lo,hi) tuples
+
+        Parameter width: the width of the level in pixels
+        Precondition: width is a non-negative number
+
+        Parameter buffer: the offscreen buffer, in grid squares
+        Precondition: buffer is a non-negative int
+        """
+        super().reset(row,speed,types,positions,names,shapes,width,buffer)
+        self._safefrogs = []
+        self._exits = self.gettypes().count('exit')
+        self._occupied = 0
+        self._columns = {}
+
+    def contfrg(self,frog,frogbox):
+        """
+        Returns True if an empty exit contains the center of the frog.
+
+        As in the original game, a frog found in an empty exit is recorded as a
+        safe frog as a side effect.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog in this lane
+
+        Parameter frogbox: the hitbox of the frog, relative to its center
+        Precondition: frogbox is a (lo,hi) tuple
+        """
+        for pos in self._nearby(frog.x,self._reach):
+            if self._names[self._ids[pos]] != 'open' and self._contains(pos,frog.x):
+                if not self.usedexit(frog,frogbox):
+                    self._safefrogs.append((frog.x,frog.y))
+                    col = self._column(frog.x)
+                    self._occupied |= 1 << col
+                    self._columns.setdefault(col,[]).append(frog.x)
+                    return True
+        return False
+
+    def foropen(self,frog):
+        """
+        Returns True if an open contains the center of the frog.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog in this lane
+        """
+        for pos in self._nearby(frog.x,self._reach):
+            if self._names[self._ids[pos]] == 'open' and self._contains(pos,frog.x):
+                return True
+        return False
+
+    def usedexit(self,frog,frogbox):
+        """
+        Returns True if the exit is already occupied by a safe frog.
+
+        A safe frog has the same hitbox as the frog, so the two overlap when
+        their centers are closer than the width of that hitbox. Only the safe
+        frogs in the few columns within that distance are looked at.
+
+        Parameter frog: the simulated frog
+        Precondition: frog is a SimFrog in this lane
+
+        Parameter frogbox: the hitbox of the frog, relative to its center
+        Precondition: frogbox is a (lo,hi) tuple
+        """
+        width = frogbox[1]-frogbox[0]
+        for col in range(self._column(frog.x-width),self._column(frog.x+width)+1):
+            if self._occupied >> col & 1:
+                for x in self._columns[col]:
+                    if abs(x-frog.x) < width:
+                        return True
+        return False
+
+    def _column(self,x):
+        """
+        Returns the grid column of the x coordinate x.
+
+        Coordinates left of the level are put in column 0.
+
+        Parameter x: an x coordinate in pixels
+        Precondition: x is a number
+        """
+        return max(int(x // GRID_SIZE),0)
+
+
+# The lane class for each lane type, indexed like LANE_TYPES
+LANE_CLASSES = (SimGrass, SimRoad, SimWater, SimHedge)
+
+
+class Simulation(object):
+    """
+    This class simulates a single level of Froggit without any graphics.
+
+    It follows the same rules as the Level class in level.py, which uses it to run
+    the game. It can also be driven on its own with a ScriptedInput.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _width: the width of the level in pixels
+    # Invariant: _width is a non-negative number
+    #
+    # Attribute _height: the height of the level in pixels
+    # Invariant: _height is a non-negative number
+    #
+    # Attribute _buffer: the offscreen buffer, in grid squares
+    # Invariant: _buffer is a non-negative int
+    #
+    # Attribute _lanes: the simulated lanes, from bottom to top
+    # Invariant: _lanes is a list of SimLane objects, where _lanes[row] is the
+    # lane whose bottom edge is at GRID_SIZE*row. A lane may be at an earlier
+    # time than _time until it is used (see getlane)
+    #
+    # Attribute _kinds: the lane type of each row
+    # Invariant: _kinds is a list of LANE_GRASS, LANE_ROAD, LANE_WATER or
+    # LANE_HEDGE, the same length as _lanes
+    #
+    # Attribute _moving: the lanes with obstacles that move (roads and water)
+    # Invariant: _moving is a list of SimLane objects
+    #
+    # Attribute _hedges: the hedges, from bottom to top
+    # Invariant: _hedges is a list of SimHedge objects
+    #
+    # Attribute _frog: the simulated frog
+    # Invariant: _frog is a SimFrog, or None if there is no frog in play
+    #
+    # Attribute _spare: the one frog object of the simulation, kept while the
+    # frog is out of play so that setfrog can reuse it
+    # Invariant: _spare is a SimFrog, and _frog is either None or _spare
+    #
+    # Attribute _frogbox: the hitbox of the frog, relative to its center
+    # Invariant: _frogbox is a (lo,hi) tuple
+    #
+    # Attribute _shapehash: the hash of the hitboxes the level is played with
+    # Invariant: _shapehash is the result of hashshapes for the object types of
+    # the level
+    #
+    # Attribute _lives: the number of lives left
+    # Invariant: _lives is an int between 0 and FROG_LIVES
+    #
+    # Attribute _exits: the number of exits in the level
+    # Invariant: _exits is an int >= 0
+    #
+    # Attribute _safe: the number of safe frogs (filled exits)
+    # Invariant: _safe is the total length of getsafefrogs() of every hedge
+    #
+    # Attribute _cooldown: the time left before the frog may move again
+    # Invariant: _cooldown is a float
+    #
+    # Attribute _time: the simulation time in seconds since the level started
+    # Invariant: _time is a non-negative float
+    #
+    # Attribute _profiler: the profiler that times the phases of update
+    # Invariant: _profiler is a FrameProfiler, or None if update is not timed
+    #
+    # Attribute _ticks: the number of times update has been called
+    # Invariant: _ticks is an int >= 0
+    #
+    # Attribute _recorder: the recorder that writes the keys and frogs to a replay
+    # Invariant: _recorder is a Recorder, or None if nothing is recorded
+    #
+    # Attribute _death: the row and cause of the last death of the frog
+    # Invariant: _death is a (row,cause) tuple where cause is 'road', 'water' or
+    # 'offscreen', or None if the frog has not died
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getwidth(self):
+        """
+        Returns the width of the level in pixels
+        """
+        return self._width
+
+    def getheight(self):
+        """
+        Returns the height of the level in pixels
+        """
+        return self._height
+
+    def getlanes(self):
+        """
+        Returns the list of simulated lanes, from bottom to top
+
+        Lanes are only moved when they are used, so this first moves every lane
+        to the current time. Use getlane to get one lane without doing that.
+        """
+        for lane in self._moving:
+            lane.settime(self._time)
+        return self._lanes
+
+    def getlane(self,row):
+        """
+        Returns the simulated lane in row, moved to the current time
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int in the range of getrows()
+        """
+        lane = self._lanes[row]
+        if lane.gettime() != self._time:
+            lane.settime(self._time)
+        return lane
+
+    def getlanecount(self):
+        """
+        Returns the number of lanes in the level
+        """
+        return len(self._lanes)
+
+    def getkind(self,row):
+        """
+        Returns the lane type of row (LANE_GRASS, LANE_ROAD, LANE_WATER or
+        LANE_HEDGE)
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int in the range of getrows()
+        """
+        return self._kinds[row]
+
+    def getrows(self):
+        """
+        Returns the (first,end) rows in play: the frog may be in any row from
+        first up to (but not including) end.
+        """
+        return (0,len(self._lanes))
+
+    def getfrog(self):
+        """
+        Returns the simulated frog, or None if there is no frog in play
+        """
+        return self._frog
+
+    def setfrog(self,frogx,frogy):
+        """
+        Puts the frog back in play at (frogx,frogy), facing north.
+
+        Parameter frogx: the x position of the frog (in pixels)
+        Precondition: frogx is a float
+
+        Parameter frogy: the y position of the frog (in pixels)
+        Precondition: frogy is a float
+        """
+        self._spare.reset(frogx,frogy)
+        self._frog = self._spare
+        if self._recorder is not None:
+            self._recorder.frog(self._ticks,frogx,frogy)
+
+    def getshapehash(self):
+        """
+        Returns the hash of the hitboxes the level is played with (see hashshapes)
+        """
+        return self._shapehash
+
+    def getlives(self):
+        """
+        Returns the number of lives left
+        """
+        return self._lives
+
+    def getsafe(self):
+        """
+        Returns the number of safe frogs (the exits filled so far)
+        """
+        return self._safe
+
+    def gettime(self):
+        """
+        Returns the simulation time in seconds since the level started
+        """
+        return self._time
+
+    def getticks(self):
+        """
+        Returns the number of times update has been called (the steps so far)
+        """
+        return self._ticks
+
+    def getdeath(self):
+        """
+        Returns the (row,cause) of the last death of the frog, or None if the
+        frog has not died.
+
+        The cause is 'road' (hit by a car), 'water' (fell in the water) or
+        'offscreen' (carried off the screen by a log).
+        """
+        return self._death
+
+    def setrecorder(self,recorder):
+        """
+        Sets the recorder that writes the keys of every step to a replay.
+
+        The recorder is also told whenever the frog is put back in play with
+        setfrog (see replay.py).
+
+        Parameter recorder: the recorder, or None to stop recording
+        Precondition: recorder is None or a Recorder
+        """
+        self._recorder = recorder
+
+    def setprofiler(self,profiler):
+        """
+        Sets the profiler that times the phases of update.
+
+        The phases are 'motion' (moving the lanes), 'collision' (resolving the
+        lane of the frog) and 'input' (handling the keys).
+
+        Parameter profiler: the profiler, or None to stop timing
+        Precondition: profiler is None or a FrameProfiler (see profiler.py)
+        """
+        self._profiler = profiler
+
+    # INITIALIZER TO CREATE THE FROG AND LANES
+    def __init__(self,json,shapes=None):
+        """
+        Initializes the simulation from the given level.
+
+        The level may be a level JSON dictionary or a CompiledLevel (see
+        compiler.py). A dictionary is compiled first.
+
+        The shapes dictionary gives the hitbox of each object type, as made by
+        compileshapes. The frog uses the type of FROG_IMAGE (e.g. 'frog1'). Types
+        that are missing are one grid square wide.
+
+        Parameter json: the level data
+        Precondition: json is a dictionary in the level JSON format or a
+        CompiledLevel
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+        """
+        if shapes is None:
+            shapes = {}
+        level = json if isinstance(json,CompiledLevel) else compilelevel(json)
+        self._width = level.getsize()[0]*GRID_SIZE
+        self._height = level.getsize()[1]*GRID_SIZE
+        self._buffer = level.getoffscreen()
+        self._frogbox = getshape(shapes,FROG_IMAGE[:-4])
+        self._shapehash = hashshapes(shapes,level.getnames())
+        self._lives = FROG_LIVES
+        self._exits = 0
+        self._safe = 0
+        self._cooldown = 0
+        self._time = 0.0
+        self._ticks = 0
+        self._profiler = None
+        self._recorder = None
+        self._death = None
+        self._lanes = []
+        self._kinds = []
+        self._moving = []
+        self._hedges = []
+
+        for row in range(level.getlanecount()):
+            kind = level.getkind(row)
+            lane = LANE_CLASSES[kind](row,level.getspeed(row),level.gettypes(row),
+                level.getpositions(row),level.getnames(),shapes,self._width,
+                self._buffer)
+            self._lanes.append(lane)
+            self._kinds.append(kind)
+            if kind == LANE_ROAD or kind == LANE_WATER:
+                self._moving.append(lane)
+            elif kind == LANE_HEDGE:
+                self._exits += lane.getexits()
+                self._hedges.append(lane)
+
+        start = level.getstart()
+        self._spare = SimFrog(start[0]*GRID_SIZE+0.5*GRID_SIZE,
+        start[1]*GRID_SIZE+0.5*GRID_SIZE)
+        self._frog = self._spare
+
+    # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
+    def update(self,input,dt):
+        """
+        Advances the simulation by one animation frame.
+
+        Parameter input: the keys held down in this frame
+        Precondition: input is a GInput or a ScriptedInput
+
+        Parameter dt: time in seconds since the last call to update
+        Precondition: dt is a non-negative float
+        """
+        if self._recorder is not None:
+            self._recorder.keys(self._ticks,input)
+        self._ticks += 1
+        profiler = self._profiler
+        if profiler is not None:
+            mark = profiler.mark()
+        # the lanes compute their positions from the time, so only the lane of
+        # the frog has to be moved now; the others catch up when they are used
+        self._time += dt
+        row = self._frogrow()
+        if row is not None:
+            lane = self.getlane(row)
+        if profiler is not None:
+            mark = profiler.lap('motion',mark)
+
+        if row is not None:
+            kind = self.getkind(row)
+            if kind == LANE_WATER:
+                if lane.onalog(self._frog):
+                    self._frog.x += lane.getspeed()*dt
+                    if lane.frogoffscreen(self._frog,self._width):
+                        self._killfrog(row,'offscreen')
+                else:
+                    self._killfrog(row,'water')
+            elif kind == LANE_ROAD:
+                if lane.carcollision(self._frog,self._frogbox):
+                    self._killfrog(row,'road')
+            elif kind == LANE_HEDGE:
+                if (self._enterexit(lane) and
+                    not lane.foropen(self._frog)):
+                    self._frog = None
+        if profiler is not None:
+            mark = profiler.lap('collision',mark)
+        self._whichkeypressed(input,dt)
+        if profiler is not None:
+            profiler.lap('input',mark)
+
+    def run(self,input,dt,steps):
+        """
+        Advances the simulation by steps frames, each dt seconds long.
+
+        The input is advanced by one frame after every step.
+
+        Parameter input: the keys to play back
+        Precondition: input is a ScriptedInput
+
+        Parameter dt: the length of each frame in seconds
+        Precondition: dt is a non-negative float
+
+        Parameter steps: the number of frames to simulate
+        Precondition: steps is an int >= 0
+        """
+        for _ in range(steps):
+            self.update(input,dt)
+            input.advance()
+
+    def seek(self,t):
+        """
+        Moves every obstacle to where it is at simulation time t.
+
+        The frog, the lives and the exits are left alone; only the simulation
+        clock and the obstacles change. Since each lane computes its positions
+        from the time, this works for any t, forwards (fast-forward) or
+        backwards (rewind), without replaying the frames in between.
+
+        Parameter t: the simulation time in seconds
+        Precondition: t is a non-negative float
+        """
+        self._time = t
+
+    def snapshot(self):
+        """
+        Returns a Snapshot of the current state of the simulation.
+
+        This is cheap enough to call every frame: the lanes are not copied, only
+        the time they are computed from.
+        """
+        frog = self._frog
+        if frog is not None:
+            frog = (frog.x,frog.y,frog.angle)
+        return Snapshot(self._time,self._ticks,self._cooldown,self._lives,
+            self._safe,frog,self._death,
+            tuple(hedge.getcoords() for hedge in self._hedges))
+
+    def restore(self,snapshot):
+        """
+        Puts the simulation back in the state of snapshot.
+
+        The recorder is not told about the change, so a game that is restored
+        while it is recorded will not replay the same way.
+
+        Parameter snapshot: the state to go back to
+        Precondition: snapshot is a Snapshot made by snapshot() of this
+        simulation
+        """
+        self._time = snapshot.time
+        self._ticks = snapshot.ticks
+        self._cooldown = snapshot.cooldown
+        self._lives = snapshot.lives
+        self._safe = snapshot.safe
+        self._death = snapshot.death
+        if snapshot.frog is None:
+            self._frog = None
+        else:
+            self._spare.x, self._spare.y, self._spare.angle = snapshot.frog
+            self._frog = self._spare
+        for pos in range(len(self._hedges)):
+            if self._hedges[pos].getcoords() != snapshot.hedges[pos]:
+                self._hedges[pos].setcoords(snapshot.hedges[pos])
+
+    # PUBLIC NECESSARY HELPERS
+    def nolives(self):
+        """
+        Returns True if there are no lives left. Returns False otherwise
+        """
+        return self._lives == 0
+
+    def exitfill(self):
+        """
+        Returns True if every exit holds a safe frog. Returns False otherwise
+        """
+        return self._safe == self._exits
+
+    # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
+    def _killfrog(self,row,cause):
+        """
+        Removes the frog from play and takes away one life.
+
+        Parameter row: the row the frog died in
+        Precondition: row is an int
+
+        Parameter cause: what killed the frog
+        Precondition: cause is 'road', 'water' or 'offscreen'
+        """
+        self._death = (row,cause)
+        self._frog = None
+        self._lives -= 1
+
+    def _whichkeypressed(self,input,dt):
+        """
+        Moves the frog according to the keys pressed, once the cooldown is over.
+
+        Parameter input: the keys held down in this frame
+        Precondition: input is a GInput or a ScriptedInput
+
+        Parameter dt: time in seconds since the last call to update
+        Precondition: dt is a non-negative float
+        """
+        if self._cooldown > dt:
+            self._cooldown = self._cooldown - dt
+        elif not self._frog is None:
+            if input.is_key_down('left'):
+                self._leftkeydown()
+            elif input.is_key_down('right'):
+                self._rightkeydown()
+            elif input.is_key_down('up'):
+                self._upkeydown()
+            elif input.is_key_down('down'):
+                self._downkeydown()
+
+    def _frogrow(self):
+        """
+        Returns the row the frog is in, or None if there is no frog in play.
+
+        The frog is always centered in a row, so its row is found directly from
+        its y coordinate instead of by searching the lanes.
+        """
+        if self._frog is None:
+            return None
+        row = int(self._frog.y // GRID_SIZE)
+        first, end = self.getrows()
+        if row < first or row >= end:
+            return None
+        return row
+
+    def _checklane(self):
+        """
+        Kills the frog if it just moved into a car or into the water.
+
+        Only the lane in the row of the frog is checked.
+        """
+        row = self._frogrow()
+        if row is None:
+            return
+        kind = self.getkind(row)
+        lane = self.getlane(row)
+        if kind == LANE_ROAD:
+            if lane.carcollision(self._frog,self._frogbox):
+                self._killfrog(row,'road')
+        elif kind == LANE_WATER:
+            if not lane.onalog(self._frog):
+                self._killfrog(row,'water')
+
+    def _checkmove(self,dx):
+        """
+        Resolves the lane after the frog moved sideways by dx pixels.
+
+        A frog that moves into the hedge anywhere but an empty exit is pushed back.
+        A frog that moves into a car or into the water dies.
+
+        Parameter dx: the horizontal distance the frog moved
+        Precondition: dx is GRID_SIZE or -GRID_SIZE
+        """
+        row = self._frogrow()
+        if row is not None and self.getkind(row) == LANE_HEDGE:
+            if not self._enterexit(self.getlane(row)):
+                self._frog.x -= dx
+        else:
+            self._checklane()
+
+    def _leftkeydown(self):
+        """
+        Moves the frog one grid square to the left, unless it is at the edge.
+        """
+        self._frog.angle = FROG_WEST
+        if self._frog.x > GRID_SIZE:
+            self._frog.x -= GRID_SIZE
+            self._checkmove(-GRID_SIZE)
+        self._cooldown = FROG_SPEED
+
+    def _rightkeydown(self):
+        """
+        Moves the frog one grid square to the right, unless it is at the edge.
+        """
+        self._frog.angle = FROG_EAST
+        if self._frog.x < self._width - GRID_SIZE:
+            self._frog.x += GRID_SIZE
+            self._checkmove(GRID_SIZE)
+            self._cooldown = FROG_SPEED
+
+    def _upkeydown(self):
+        """
+        Moves the frog one grid square up, unless it is at the top.
+
+        A frog that moves into an empty exit is safe and leaves play. A frog that
+        moves into the hedge anywhere but an exit or an open is pushed back.
+        """
+        self._frog.angle = FROG_NORTH
+        if self._frog.y < self._height - GRID_SIZE:
+            self._frog.y += GRID_SIZE
+            row = self._frogrow()
+            if row is not None and self.getkind(row) == LANE_HEDGE:
+                lane = self.getlane(row)
+                if self._enterexit(lane):
+                    self._frog = None
+                elif not lane.foropen(self._frog):
+                    self._frog.y -= GRID_SIZE
+            else:
+                self._checklane()
+            self._cooldown = FROG_SPEED
+
+    def _downkeydown(self):
+        """
+        Moves the frog one grid square down, unless it is at the bottom.
+
+        A frog may only move down into the hedge through an open.
+        """
+        self._frog.angle = FROG_SOUTH
+        if self._frog.y > (self.getrows()[0]+1)*GRID_SIZE:
+            self._frog.y -= GRID_SIZE
+            row = self._frogrow()
+            if row is not None and self.getkind(row) == LANE_HEDGE:
+                if not self.getlane(row).foropen(self._frog):
+                    self._frog.y += GRID_SIZE
+            else:
+                self._checklane()
+        self._cooldown = FROG_SPEED
+
+    def _enterexit(self,lane):
+        """
+        Returns True if the frog is in an empty exit of the hedge lane.
+
+        The frog is then recorded as a safe frog (see SimHedge.contfrg), and
+        counted towards filling the exits.
+
+        Parameter lane: the hedge the frog is in
+        Precondition: lane is a SimHedge
+        """
+        if lane.contfrg(self._frog,self._frogbox):
+            self._safe += 1
+            return True
+        return False
@@ -0,0 +1,873 @@
+"""
+Training environment module for Froggit
+
+This module lets an agent play Froggit through the usual reinforcement learning API:
+reset() starts a game and returns the first observation, and step(action) plays one
+animation frame and returns (observation, reward, done, info). An action is an index
+into ENV_ACTIONS, the key held down during the frame.
+
+The observation is an occupancy grid of the level, a NumPy array of shape
+(channels, rows, columns) with one channel for each entry of ENV_CHANNELS: the cells
+covered by cars, by logs, by water, by empty exits, and the cell of the frog. Row 0 is
+the bottom lane. The reward is ENV_REWARD_ROW for every row the frog gets higher than
+before in its life, ENV_REWARD_EXIT for every exit filled and ENV_REWARD_DEATH for every
+life lost. A frog that dies or reaches an exit is put back at the start, and the game
+is done when the lives run out, the exits are filled or ENV_SECONDS pass.
+
+There are two environments:
+
+    Env       one game, played by a Simulation (engine.py)
+    VecEnv    N games of the same level, stepped together with NumPy
+
+A VecEnv keeps the state of its games in arrays and follows the rules of the Simulation
+with array operations, so the cost of a step grows slowly with the number of games. On
+a level 12 columns wide with 14 lanes, a thousand games step in about 1.5 ms, the time of
+about 30 steps of an Env; about a third of that is making the observations, which a step
+may leave out (see VecEnv.step). Most of the rest is the fixed cost of each NumPy call,
+so a VecEnv only pays off with hundreds of games. Games that are done start again at
+once, and their last observation is not kept.
+
+The rules are written a second time here, as array operations (VecEnv._movefrogs and
+VecEnv._presskeys follow Simulation.update), so a change to the rules of engine.py must
+be made here too. tests/test_env.py plays both environments side by side to check this.
+
+Both environments need NumPy. Only consts.py, compiler.py and engine.py are used here,
+so an agent can be trained without game2d or Kivy.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from compiler import *
+from engine import *
+import math
+
+# NumPy is imported when the first LevelGrid is made (see _neednumpy), so that importing
+# this module stays quick; until then numpy is None (from engine.py).
+
+# The key held down for each action
+ENV_ACTIONS = (None,'left','right','up','down')
+# The channels of the observation grid
+ENV_CHANNELS = ('car','log','water','exit','frog')
+# The reward for each row the frog gets higher than before in its life
+ENV_REWARD_ROW = 1.0
+# The reward for each exit filled
+ENV_REWARD_EXIT = 10.0
+# The reward for each life lost
+ENV_REWARD_DEATH = -10.0
+# The longest a game may last, in seconds of simulation time
+ENV_SECONDS = 120
+
+
+class LevelGrid(object):
+    """
+    A class that keeps the obstacles of a level in NumPy arrays, one row per lane.
+
+    Lanes with fewer obstacles than the longest lane are padded with obstacles
+    that are not valid. The positions are computed in the same way as in a
+    SimLane, so they are the same numbers. The grid turns the positions into
+    occupancy grids, and gives a VecEnv the obstacles in the rows of its frogs.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _rows: the number of lanes
+    # Invariant: _rows is an int > 0
+    #
+    # Attribute _cols: the number of columns of the level
+    # Invariant: _cols is an int > 0
+    #
+    # Attribute _margin: the offscreen buffer in pixels
+    # Invariant: _margin is a non-negative number
+    #
+    # Attribute _period: the distance an obstacle travels before it wraps around
+    # Invariant: _period is the level width plus twice _margin
+    #
+    # Attribute _kinds: the lane type of each row
+    # Invariant: _kinds is an int array of length _rows
+    #
+    # Attribute _speeds: the speed of each lane in pixels per second
+    # Invariant: _speeds is a float array of length _rows
+    #
+    # Attribute _base: the center of each obstacle at the start, plus _margin
+    # Invariant: _base is a float array of shape (_rows, obstacles)
+    #
+    # Attribute _los: the left edge of each hitbox, relative to its center
+    # Invariant: _los is a float array the shape of _base
+    #
+    # Attribute _his: the right edge of each hitbox, relative to its center
+    # Invariant: _his is a float array the shape of _base
+    #
+    # Attribute _valid: whether each obstacle is real (and not padding)
+    # Invariant: _valid is a bool array the shape of _base
+    #
+    # Attribute _open: whether each obstacle is an open of a hedge
+    # Invariant: _open is a bool array the shape of _base
+    #
+    # Attribute _channels: the channel of the observation each lane fills
+    # Invariant: _channels is an int array of length _rows (-1 for none)
+    #
+    # Attribute _cover: whether each pixel of the ring of a lane is covered by an
+    # obstacle at the start, where pixel p of row r is at x = p+0.5-_margin; the
+    # ring is stored twice in a row, so that a run of pixels never wraps around
+    # Invariant: _cover is a bool array of shape (_rows, 2*_period)
+    #
+    # Attribute _lanes: the rows that fill a channel of the observation
+    # Invariant: _lanes is an int array of the rows where _channels >= 0
+    #
+    # Attribute _turns: how far each of _lanes turns its ring back per second,
+    # in laps
+    # Invariant: _turns is a float array the length of _lanes
+    #
+    # Attribute _windows: the cells of a row whose first cell is on pixel p, for
+    # every p; a view of _cover that does not copy it
+    # Invariant: _windows is a read-only bool array of shape (_rows, _period+1,
+    # _cols), where _windows[r,p,c] is _cover[r,p+c*GRID_SIZE]
+    #
+    # Attribute _exits: the number of exits in the level
+    # Invariant: _exits is an int >= 0
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getshape(self):
+        """
+        Returns the shape (channels, rows, columns) of an observation
+        """
+        return (len(ENV_CHANNELS),self._rows,self._cols)
+
+    def getkinds(self):
+        """
+        Returns the lane type of each row, as an int array
+        """
+        return self._kinds
+
+    def getspeeds(self):
+        """
+        Returns the speed of each lane in pixels per second, as a float array
+        """
+        return self._speeds
+
+    def getexits(self):
+        """
+        Returns the number of exits in the level
+        """
+        return self._exits
+
+    # INITIALIZER TO BUILD THE ARRAYS
+    def __init__(self,level,shapes=None):
+        """
+        Initializes the arrays of the given level.
+
+        Parameter level: the level
+        Precondition: level is a CompiledLevel or a dictionary in the level JSON
+        format
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+        """
+        _neednumpy()
+        if shapes is None:
+            shapes = {}
+        if not isinstance(level,CompiledLevel):
+            level = compilelevel(level)
+        self._rows = level.getlanecount()
+        self._cols = level.getsize()[0]
+        self._margin = level.getoffscreen()*GRID_SIZE
+        self._period = self._cols*GRID_SIZE+2*self._margin
+        names = level.getnames()
+        count = max([len(level.gettypes(row)) for row in range(self._rows)]+[1])
+
+        self._kinds = numpy.zeros(self._rows,dtype=numpy.intp)
+        self._speeds = numpy.zeros(self._rows)
+        self._base = numpy.zeros((self._rows,count))
+        self._los = numpy.zeros((self._rows,count))
+        self._his = numpy.zeros((self._rows,count))
+        self._valid = numpy.zeros((self._rows,count),dtype=bool)
+        self._open = numpy.zeros((self._rows,count),dtype=bool)
+        self._channels = numpy.full(self._rows,-1,dtype=numpy.intp)
+        self._cover = numpy.zeros((self._rows,2*int(self._period)),dtype=bool)
+        self._exits = 0
+        shift = .5*GRID_SIZE+self._margin
+        channels = {LANE_ROAD: 0, LANE_WATER: 1, LANE_HEDGE: 3}
+        for row in range(self._rows):
+            kind = level.getkind(row)
+            speed = level.getspeed(row)
+            types = level.gettypes(row)
+            size = len(types)
+            self._kinds[row] = kind
+            self._speeds[row] = speed
+            self._channels[row] = channels.get(kind,-1)
+            self._base[row,:size] = numpy.remainder(
+                numpy.asarray(level.getpositions(row),dtype=float)*GRID_SIZE+shift,
+                self._period)
+            self._valid[row,:size] = True
+            for pos in range(size):
+                name = names[types[pos]]
+                lo, hi = getshape(shapes,name)
+                if speed < 0:
+                    lo, hi = -hi, -lo
+                self._los[row,pos] = lo
+                self._his[row,pos] = hi
+                self._open[row,pos] = name == 'open'
+                if kind in channels and name != 'open':
+                    self._addcover(row,self._base[row,pos],lo,hi)
+                if kind == LANE_HEDGE and name == 'exit':
+                    self._exits += 1
+        # fold the two laps of the ring together, and store the result twice
+        period = int(self._period)
+        self._cover = numpy.tile(self._cover[:,:period] | self._cover[:,period:],2)
+        self._lanes = numpy.nonzero(self._channels >= 0)[0]
+        self._turns = -self._speeds[self._lanes]/self._period
+        rowstride, stride = self._cover.strides
+        self._windows = numpy.lib.stride_tricks.as_strided(self._cover,
+            shape=(self._rows,period+1,self._cols),
+            strides=(rowstride,stride,stride*GRID_SIZE),writeable=False)
+
+    # PUBLIC NECESSARY HELPERS
+    def getobstacles(self,times,rows):
+        """
+        Returns (xs,los,his,valid,opens), the obstacles of one row for each game.
+
+        xs is a float array of shape (games, obstacles) with the x coordinates of
+        the obstacle centers in the row of each game, at the time of that game.
+        The others are the arrays of the rows, in the same shape.
+
+        Parameter times: the simulation time of each game
+        Precondition: times is a float array
+
+        Parameter rows: the row of each game
+        Precondition: rows is an int array the length of times
+        """
+        offset = numpy.remainder(times*self._speeds[rows],self._period)
+        xs = numpy.remainder(self._base[rows]+offset[:,None],self._period)
+        xs -= self._margin
+        return (xs,self._los[rows],self._his[rows],self._valid[rows],
+                self._open[rows])
+
+    def observe(self,times,frogxs,frogys,alive,safexs,saferows):
+        """
+        Returns the observation grid of each game, as a uint8 array of shape
+        (games, channels, rows, columns).
+
+        A cell is covered by an obstacle when its center is inside the hitbox of
+        the obstacle, to the nearest pixel. Each cell is looked up in the pixels
+        of its lane that are covered at the start (_cover), moved back by how far
+        the lane has moved since, so the cost does not depend on the number of
+        obstacles. That is one multiply and floor per lane and game, and one
+        gather of a window of _cover per lane and game. The cells of the safe
+        frogs are taken out of the exits.
+
+        Parameter times: the simulation time of each game
+        Precondition: times is a float array
+
+        Parameter frogxs: the x coordinate of the frog of each game
+        Precondition: frogxs is a float array the length of times
+
+        Parameter frogys: the y coordinate of the frog of each game
+        Precondition: frogys is a float array the length of times
+
+        Parameter alive: whether the frog of each game is in play
+        Precondition: alive is a bool array the length of times
+
+        Parameter safexs: the x coordinates of the safe frogs of each game
+        Precondition: safexs is a float array of shape (games, exits), with NaN
+        where there is no safe frog
+
+        Parameter saferows: the rows of the safe frogs of each game
+        Precondition: saferows is an int array the shape of safexs
+        """
+        rows, cols = self._rows, self._cols
+        grid = numpy.zeros((len(times),len(ENV_CHANNELS),rows,cols),dtype=numpy.uint8)
+
+        # the pixel of the first cell of each lane, turned back by how far it moved
+        lanes = self._lanes
+        turn = times[:,None]*self._turns
+        turn += (.5*GRID_SIZE+self._margin)/self._period
+        turn -= numpy.floor(turn)
+        turn *= self._period
+        first = turn.astype(numpy.intp)
+        grid[:,self._channels[lanes],lanes,:] = self._windows[lanes,first]
+
+        grid[:,2,self._kinds == LANE_WATER,:] = 1
+        game, pos = numpy.nonzero(~numpy.isnan(safexs))
+        if len(game) > 0:
+            col = numpy.clip(safexs[game,pos]//GRID_SIZE,0,cols-1).astype(numpy.intp)
+            grid[game,3,saferows[game,pos],col] = 0
+        col = numpy.floor(frogxs/GRID_SIZE)
+        row = numpy.floor(frogys/GRID_SIZE)
+        game = numpy.nonzero(alive & (col >= 0) & (col < cols) &
+            (row >= 0) & (row < rows))[0]
+        grid[game,4,row[game].astype(numpy.intp),col[game].astype(numpy.intp)] = 1
+        return grid
+
+    # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
+    def _addcover(self,row,base,lo,hi):
+        """
+        Marks the pixels of row covered by an obstacle at the start.
+
+        The pixels are marked on two laps of the ring, so that an obstacle that
+        wraps around is one slice; the laps are folded together afterwards (see
+        the initializer).
+
+        Parameter row: the row of the obstacle
+        Precondition: row is an int in range(_rows)
+
+        Parameter base: the center of the obstacle at the start, plus _margin
+        Precondition: base is a float in [0,_period)
+
+        Parameter lo: the left edge of the hitbox, relative to its center
+        Precondition: lo is a number
+
+        Parameter hi: the right edge of the hitbox, relative to its center
+        Precondition: hi is a number > lo, and hi-lo is at most _period
+        """
+        period = int(self._period)
+        first = int(math.floor(base+lo-.5))+1
+        end = int(math.ceil(base+hi-.5))
+        shift = (first % period)-first
+        self._cover[row,first+shift:min(end+shift,2*period)] = True
+
+
+class Env(object):
+    """
+    A class for one game of Froggit, played one animation frame at a time.
+
+    The game is played by a Simulation with the same rules as the Level class,
+    so the agent plays exactly the game a player would.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _level: the level played
+    # Invariant: _level is a CompiledLevel
+    #
+    # Attribute _shapes: the hitboxes of the object types
+    # Invariant: _shapes is a dictionary mapping strings to (lo,hi) tuples
+    #
+    # Attribute _grid: the arrays that make the observations
+    # Invariant: _grid is a LevelGrid of _level
+    #
+    # Attribute _sim: the game being played
+    # Invariant: _sim is a Simulation of _level
+    #
+    # Attribute _start: the center of the frog at the start
+    # Invariant: _start is an (x,y) tuple of floats
+    #
+    # Attribute _best: the highest row the frog has reached in its life
+    # Invariant: _best is an int >= 0
+    #
+    # Attribute _ticks: the number of frames a game may last
+    # Invariant: _ticks is an int > 0
+    #
+    # Attribute _input: the key held down in the current frame
+    # Invariant: _input is a ScriptedInput
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getsim(self):
+        """
+        Returns the Simulation of the game being played
+        """
+        return self._sim
+
+    def getshape(self):
+        """
+        Returns the shape (channels, rows, columns) of an observation
+        """
+        return self._grid.getshape()
+
+    def getactions(self):
+        """
+        Returns the number of actions
+        """
+        return len(ENV_ACTIONS)
+
+    # INITIALIZER TO LOAD THE LEVEL
+    def __init__(self,level,shapes=None,seconds=ENV_SECONDS):
+        """
+        Initializes an environment for the given level, and starts a game.
+
+        Parameter level: the level to play
+        Precondition: level is a CompiledLevel or a dictionary in the level JSON
+        format
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+
+        Parameter seconds: the longest a game may last
+        Precondition: seconds is a number > 0
+        """
+        if not isinstance(level,CompiledLevel):
+            level = compilelevel(level)
+        self._level = level
+        self._shapes = {} if shapes is None else shapes
+        self._grid = LevelGrid(level,self._shapes)
+        self._ticks = int(seconds*TICK_RATE)
+        self.reset()
+
+    # PUBLIC METHODS TO PLAY THE GAME
+    def reset(self):
+        """
+        Starts a new game and returns its first observation.
+        """
+        self._sim = Simulation(self._level,self._shapes)
+        frog = self._sim.getfrog()
+        self._start = (frog.x,frog.y)
+        self._best = int(frog.y // GRID_SIZE)
+        return self.observe()
+
+    def step(self,action,observe=True):
+        """
+        Plays one animation frame and returns (observation, reward, done, info).
+
+        The info is a dictionary with the 'lives' left, the 'safe' frogs and the
+        simulation 'time'. A frog that died or reached an exit is put back at the
+        start, unless the game is done.
+
+        Parameter action: the key to hold down, as an index into ENV_ACTIONS
+        Precondition: action is an int in range(len(ENV_ACTIONS)), and the game
+        is not done
+
+        Parameter observe: whether to make the observation (if not, it is None,
+        and observe() makes it when it is needed)
+        Precondition: observe is a bool
+        """
+        sim = self._sim
+        lives = sim.getlives()
+        safe = sim.getsafe()
+        sim.update(ScriptedInput((ENV_ACTIONS[action],)),1.0/TICK_RATE)
+
+        reward = ENV_REWARD_DEATH*(lives-sim.getlives())
+        reward += ENV_REWARD_EXIT*(sim.getsafe()-safe)
+        frog = sim.getfrog()
+        if not frog is None:
+            row = int(frog.y // GRID_SIZE)
+            if row > self._best:
+                reward += ENV_REWARD_ROW*(row-self._best)
+                self._best = row
+        done = (sim.nolives() or sim.exitfill() or sim.getticks() >= self._ticks)
+        if frog is None and not done:
+            sim.setfrog(*self._start)
+            self._best = int(self._start[1] // GRID_SIZE)
+        info = {'lives': sim.getlives(), 'safe': sim.getsafe(),
+                'time': sim.gettime()}
+        return (self.observe() if observe else None,reward,done,info)
+
+    def observe(self):
+        """
+        Returns the observation grid of the game (see LevelGrid.observe)
+        """
+        sim = self._sim
+        frog = sim.getfrog()
+        safexs = numpy.full((1,max(self._grid.getexits(),1)),numpy.nan)
+        saferows = numpy.zeros(safexs.shape,dtype=numpy.intp)
+        pos = 0
+        for row in numpy.nonzero(self._grid.getkinds() == LANE_HEDGE)[0]:
+            for x, y in sim.getlane(int(row)).getsafefrogs():
+                if pos < safexs.shape[1]:
+                    safexs[0,pos] = x
+                    saferows[0,pos] = row
+                    pos += 1
+        return self._grid.observe(numpy.array([sim.gettime()]),
+            numpy.array([0.0 if frog is None else frog.x]),
+            numpy.array([0.0 if frog is None else frog.y]),
+            numpy.array([not frog is None]),safexs,saferows)[0]
+
+
+class VecEnv(object):
+    """
+    A class for N games of the same level of Froggit, stepped together.
+
+    The state of every game is kept in NumPy arrays, and a step applies the
+    rules of the Simulation to all of the games at once. The obstacles of each
+    game are found from its own time, so the games are independent. A game that
+    is done starts again at once.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _grid: the obstacles of the level
+    # Invariant: _grid is a LevelGrid
+    #
+    # Attribute _count: the number of games
+    # Invariant: _count is an int > 0
+    #
+    # Attribute _width: the width of the level in pixels
+    # Invariant: _width is a number > 0
+    #
+    # Attribute _height: the height of the level in pixels
+    # Invariant: _height is a number > 0
+    #
+    # Attribute _start: the center of the frog at the start
+    # Invariant: _start is an (x,y) tuple of floats
+    #
+    # Attribute _frogbox: the hitbox of the frog, relative to its center
+    # Invariant: _frogbox is a (lo,hi) tuple
+    #
+    # Attribute _ticks: the number of frames a game may last
+    # Invariant: _ticks is an int > 0
+    #
+    # Attribute _xs, _ys: the center of the frog of each game
+    # Invariant: _xs and _ys are float arrays of length _count
+    #
+    # Attribute _alive: whether the frog of each game is in play
+    # Invariant: _alive is a bool array of length _count
+    #
+    # Attribute _cooldown: the time left before the frog of each game may move
+    # Invariant: _cooldown is a float array of length _count
+    #
+    # Attribute _lives: the lives left in each game
+    # Invariant: _lives is an int array of length _count
+    #
+    # Attribute _times: the simulation time of each game
+    # Invariant: _times is a float array of length _count
+    #
+    # Attribute _steps: the number of frames played in each game
+    # Invariant: _steps is an int array of length _count
+    #
+    # Attribute _best: the highest row the frog of each game reached in its life
+    # Invariant: _best is an int array of length _count
+    #
+    # Attribute _safe: the number of safe frogs in each game
+    # Invariant: _safe is an int array of length _count
+    #
+    # Attribute _safexs, _saferows: the x coordinate and row of each safe frog
+    # Invariant: _safexs is a float array of shape (_count, exits) with NaN
+    # after the first _safe[game] entries of a game; _saferows is an int array
+    # of the same shape
+
+    # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
+    def getcount(self):
+        """
+        Returns the number of games
+        """
+        return self._count
+
+    def getshape(self):
+        """
+        Returns the shape (channels, rows, columns) of the observation of one game
+        """
+        return self._grid.getshape()
+
+    def getactions(self):
+        """
+        Returns the number of actions
+        """
+        return len(ENV_ACTIONS)
+
+    # INITIALIZER TO LOAD THE LEVEL
+    def __init__(self,level,count,shapes=None,seconds=ENV_SECONDS):
+        """
+        Initializes count games of the given level.
+
+        Parameter level: the level to play
+        Precondition: level is a CompiledLevel or a dictionary in the level JSON
+        format
+
+        Parameter count: the number of games
+        Precondition: count is an int > 0
+
+        Parameter shapes: the hitboxes of the object types (optional)
+        Precondition: shapes is None or a dictionary mapping strings to (lo,hi)
+        tuples
+
+        Parameter seconds: the longest a game may last
+        Precondition: seconds is a number > 0
+        """
+        if shapes is None:
+            shapes = {}
+        if not isinstance(level,CompiledLevel):
+            level = compilelevel(level)
+        self._grid = LevelGrid(level,shapes)
+        self._count = count
+        self._width = level.getsize()[0]*GRID_SIZE
+        self._height = level.getsize()[1]*GRID_SIZE
+        start = level.getstart()
+        self._start = (start[0]*GRID_SIZE+0.5*GRID_SIZE,
+            start[1]*GRID_SIZE+0.5*GRID_SIZE)
+        self._frogbox = getshape(shapes,FROG_IMAGE[:-4])
+        self._ticks = int(seconds*TICK_RATE)
+
+        exits = max(self._grid.getexits(),1)
+        self._xs = numpy.zeros(count)
+        self._ys = numpy.zeros(count)
+        self._alive = numpy.zeros(count,dtype=bool)
+        self._cooldown = numpy.zeros(count)
+        self._lives = numpy.zeros(count,dtype=numpy.intp)
+        self._times = numpy.zeros(count)
+        self._steps = numpy.zeros(count,dtype=numpy.intp)
+        self._best = numpy.zeros(count,dtype=numpy.intp)
+        self._safe = numpy.zeros(count,dtype=numpy.intp)
+        self._safexs = numpy.zeros((count,exits))
+        self._saferows = numpy.zeros((count,exits),dtype=numpy.intp)
+        self.reset()
+
+    # PUBLIC METHODS TO PLAY THE GAMES
+    def reset(self):
+        """
+        Starts every game again and returns their first observations.
+        """
+        self._restart(numpy.arange(self._count))
+        return self.observe()
+
+    def step(self,actions,observe=True):
+        """
+        Plays one animation frame of every game and returns (observations,
+        rewards, dones, info).
+
+        The observations are stacked in an array of shape (games, channels,
+        rows, columns), and the rewards and dones are arrays with one entry for
+        each game. The info is a dictionary with the arrays 'lives', 'safe' and
+        'time' of the games before any were started again. A game that is done
+        is started again, and its observation is the first of the new game.
+
+        Making the observations is about a third of a step. An agent that does
+        not look at every frame (one that holds its action for a few frames,
+        say) can leave them out and call observe() when it needs them.
+
+        Parameter actions: the key to hold down in each game, as indices into
+        ENV_ACTIONS
+        Precondition: actions is a sequence of ints the length of the games
+
+        Parameter observe: whether to make the observations (if not, they are
+        None)
+        Precondition: observe is a bool
+        """
+        actions = numpy.asarray(actions)
+        lives = self._lives.copy()
+        safe = self._safe.copy()
+        dt = 1.0/TICK_RATE
+        self._times += dt
+        self._steps += 1
+        self._movefrogs(dt)
+        self._presskeys(actions,dt)
+
+        rewards = ENV_REWARD_DEATH*(lives-self._lives)
+        rewards += ENV_REWARD_EXIT*(self._safe-safe)
+        rows = (self._ys // GRID_SIZE).astype(numpy.intp)
+        gain = numpy.where(self._alive,numpy.maximum(rows-self._best,0),0)
+        rewards += ENV_REWARD_ROW*gain
+        self._best += gain
+        dones = ((self._lives == 0) | (self._safe == self._grid.getexits()) |
+            (self._steps >= self._ticks))
+        info = {'lives': self._lives.copy(), 'safe': self._safe.copy(),
+                'time': self._times.copy()}
+
+        self._restart(numpy.nonzero(dones)[0])
+        respawn = numpy.nonzero(~self._alive)[0]
+        self._xs[respawn] = self._start[0]
+        self._ys[respawn] = self._start[1]
+        self._alive[respawn] = True
+        self._best[respawn] = int(self._start[1] // GRID_SIZE)
+        return (self.observe() if observe else None,rewards,dones,info)
+
+    def observe(self):
+        """
+        Returns the observation grids of every game (see LevelGrid.observe)
+        """
+        return self._grid.observe(self._times,self._xs,self._ys,self._alive,
+            self._safexs,self._saferows)
+
+    # HELPER METHODS FOR THE RULES
+    def _restart(self,games):
+        """
+        Starts the given games again.
+
+        Parameter games: the games to start again
+        Precondition: games is an int array of game indices
+        """
+        self._xs[games] = self._start[0]
+        self._ys[games] = self._start[1]
+        self._alive[games] = True
+        self._cooldown[games] = 0
+        self._lives[games] = FROG_LIVES
+        self._times[games] = 0.0
+        self._steps[games] = 0
+        self._best[games] = int(self._start[1] // GRID_SIZE)
+        self._safe[games] = 0
+        self._safexs[games] = numpy.nan
+        self._saferows[games] = 0
+
+    def _movefrogs(self,dt):
+        """
+        Carries the frogs on logs, and kills or saves the frogs in their lanes.
+
+        This is the first half of Simulation.update.
+
+        Parameter dt: time in seconds since the last step
+        Precondition: dt is a non-negative float
+        """
+        games = numpy.nonzero(self._alive)[0]
+        kinds = self._grid.getkinds()[self._rows(games)]
+
+        water = games[kinds == LANE_WATER]
+        onlog = self._contains(water,False)
+        self._kill(water[~onlog])
+        water = water[onlog]
+        self._xs[water] += self._grid.getspeeds()[self._rows(water)]*dt
+        x = self._xs[water]
+        self._kill(water[(x < -GRID_SIZE//4) | (x > self._width+GRID_SIZE//4)])
+
+        road = games[kinds == LANE_ROAD]
+        self._kill(road[self._carhit(road)])
+
+        hedge = games[kinds == LANE_HEDGE]
+        hedge = hedge[self._enterexit(hedge)]
+        self._alive[hedge[~self._contains(hedge,True)]] = False
+
+    def _presskeys(self,actions,dt):
+        """
+        Moves the frogs according to the actions, once their cooldown is over.
+
+        This is the second half of Simulation.update.
+
+        Parameter actions: the key held down in each game
+        Precondition: actions is an int array the length of the games
+
+        Parameter dt: time in seconds since the last step
+        Precondition: dt is a non-negative float
+        """
+        wait = self._cooldown > dt
+        self._cooldown[wait] -= dt
+        ready = ~wait & self._alive
+
+        games = numpy.nonzero(ready & (actions == 1))[0]
+        moved = games[self._xs[games] > GRID_SIZE]
+        self._xs[moved] -= GRID_SIZE
+        self._checkmove(moved,-GRID_SIZE)
+        self._cooldown[games] = FROG_SPEED
+
+        games = numpy.nonzero(ready & (actions == 2))[0]
+        moved = games[self._xs[games] < self._width-GRID_SIZE]
+        self._xs[moved] += GRID_SIZE
+        self._checkmove(moved,GRID_SIZE)
+        self._cooldown[moved] = FROG_SPEED
+
+        games = numpy.nonzero(ready & (actions == 3))[0]
+        moved = games[self._ys[games] < self._height-GRID_SIZE]
+        self._ys[moved] += GRID_SIZE
+        hedge = self._grid.getkinds()[self._rows(moved)] == LANE_HEDGE
+        self._checklane(moved[~hedge])
+        hedge = moved[hedge]
+        entered = self._enterexit(hedge)
+        self._alive[hedge[entered]] = False
+        hedge = hedge[~entered]
+        self._ys[hedge[~self._contains(hedge,True)]] -= GRID_SIZE
+        self._cooldown[moved] = FROG_SPEED
+
+        games = numpy.nonzero(ready & (actions == 4))[0]
+        moved = games[self._ys[games] > GRID_SIZE]
+        self._ys[moved] -= GRID_SIZE
+        hedge = self._grid.getkinds()[self._rows(moved)] == LANE_HEDGE
+        self._checklane(moved[~hedge])
+        hedge = moved[hedge]
+        self._ys[hedge[~self._contains(hedge,True)]] += GRID_SIZE
+        self._cooldown[games] = FROG_SPEED
+
+    def _checkmove(self,games,dx):
+        """
+        Resolves the lanes of the frogs that just moved sideways by dx pixels.
+
+        See Simulation._checkmove.
+
+        Parameter games: the games whose frogs moved
+        Precondition: games is an int array of game indices
+
+        Parameter dx: the horizontal distance the frogs moved
+        Precondition: dx is GRID_SIZE or -GRID_SIZE
+        """
+        hedge = self._grid.getkinds()[self._rows(games)] == LANE_HEDGE
+        self._checklane(games[~hedge])
+        hedge = games[hedge]
+        self._xs[hedge[~self._enterexit(hedge)]] -= dx
+
+    def _checklane(self,games):
+        """
+        Kills the frogs that just moved into a car or into the water.
+
+        Parameter games: the games whose frogs moved (not into a hedge)
+        Precondition: games is an int array of game indices
+        """
+        kinds = self._grid.getkinds()[self._rows(games)]
+        road = games[kinds == LANE_ROAD]
+        self._kill(road[self._carhit(road)])
+        water = games[kinds == LANE_WATER]
+        self._kill(water[~self._contains(water,False)])
+
+    def _kill(self,games):
+        """
+        Removes the frogs of the given games from play, and takes away a life.
+
+        Parameter games: the games whose frogs died
+        Precondition: games is an int array of game indices
+        """
+        self._alive[games] = False
+        self._lives[games] -= 1
+
+    def _rows(self,games):
+        """
+        Returns the row of the frog of each of the given games.
+
+        Parameter games: the games
+        Precondition: games is an int array of game indices
+        """
+        return (self._ys[games] // GRID_SIZE).astype(numpy.intp)
+
+    def _carhit(self,games):
+        """
+        Returns a bool array, True where a car overlaps the hitbox of the frog.
+
+        Parameter games: the games whose frogs are on a road
+        Precondition: games is an int array of game indices
+        """
+        xs, los, his, valid, opens = self._grid.getobstacles(self._times[games],
+            self._rows(games))
+        left = (self._xs[games]+self._frogbox[0])[:,None]
+        right = (self._xs[games]+self._frogbox[1])[:,None]
+        return (valid & (xs+los < right) & (left < xs+his)).any(axis=1)
+
+    def _contains(self,games,opens):
+        """
+        Returns a bool array, True where an obstacle contains the center of the
+        frog. The obstacles are the opens if opens is True, and the others if not.
+
+        Parameter games: the games
+        Precondition: games is an int array of game indices
+
+        Parameter opens: whether to look at the opens of a hedge
+        Precondition: opens is a bool
+        """
+        xs, los, his, valid, isopen = self._grid.getobstacles(self._times[games],
+            self._rows(games))
+        d = self._xs[games][:,None]-xs
+        found = valid & (isopen == opens) & (los < d) & (d < his)
+        return found.any(axis=1)
+
+    def _enterexit(self,games):
+        """
+        Returns a bool array, True where the frog is in an empty exit.
+
+        Those frogs are recorded as safe frogs (see SimHedge.contfrg).
+
+        Parameter games: the games whose frogs are in a hedge
+        Precondition: games is an int array of game indices
+        """
+        x = self._xs[games]
+        width = self._frogbox[1]-self._frogbox[0]
+        used = ((self._saferows[games] == self._rows(games)[:,None]) &
+            (numpy.abs(self._safexs[games]-x[:,None]) < width)).any(axis=1)
+        entered = self._contains(games,False) & ~used
+        games = games[entered]
+        slots = numpy.minimum(self._safe[games],self._safexs.shape[1]-1)
+        self._safexs[games,slots] = self._xs[games]
+        self._saferows[games,slots] = self._rows(games)
+        self._safe[games] += 1
+        return entered
+
+
+def _neednumpy():
+    """
+    Imports NumPy into this module, if it was not yet.
+
+    Every class here makes a LevelGrid before it uses numpy, and LevelGrid calls
+    this first.
+    """
+    global numpy
+    if numpy is None:
+        numpy = loadnumpy()
+        if numpy is None:
+            raise RuntimeError('the training environments need NumPy')
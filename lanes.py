@@ -4,12 +4,16 @@ Lanes module for Froggit
 This module contains the lane classes for the Frogger game. The lanes are the vertical
 slice that the frog goes through: grass, roads, water, and the exit hedge.
 
+The rules for each lane (moving obstacles, collisions, exits) are in engine.py. The
+classes here only display a simulated lane, copying its state into GImage objects.
+
 Author: Caroline Ryu 
 Date: December 21, 2020
 """
 from game2d import *
 from consts import *
 from models import *
+from cache import *
 
 # PRIMARY RULE: Lanes are not allowed to access anything in any level.py or app.py.
 # They can only access models.py and const.py. If you need extra information from the
@@ -26,13 +30,26 @@ class Lane(object):         # You are permitted to change the parent class if yo
     # Attribute _tile: A tiling of one lane using one image
     # Invariant: _tile is a GTile
     #
-    # Attribute _objs: A list of GImage attributes (obstacles) with specified
+    # Attribute _objs: A list of images (obstacles) with specified
     # x and y position and the source image
-    # Invariant: Each element of _objs is a GImage
+    # Invariant: Each element of _objs is a CachedImage
+    #
+    # Attribute _sources: The image file of each obstacle image
+    # Invariant: _sources is a list of strings, the same length as _objs
     #
-    # Attribute _safefrogs: A list of GImage attributes (frogheads) with
+    # Attribute _safefrogs: A list of images (frogheads) with
     # specified x and y position and the source image
-    # Invariant: Each element of _objs is a GImage
+    # Invariant: Each element of _safefrogs is a CachedImage
+    #
+    # Attribute _images: The image cache shared by every lane of the level
+    # Invariant: _images is an ImageCache
+    #
+    # Attribute _markers: The blue frog images not shown yet (hedge only)
+    # Invariant: _markers is a list of CachedImage objects
+    #
+    # Attribute _shown: The list of safe frogs of the simulated hedge that
+    # _safefrogs was made from (hedge only)
+    # Invariant: _shown is the list from getsafefrogs() of a SimHedge
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def gettile(self):
@@ -44,18 +61,39 @@ class Lane(object):         # You are permitted to change the parent class if yo
 
     def getobjs(self):
         """
-        Returns the list of GImage obstacles with specified x,y position and
+        Returns the list of obstacle images with specified x,y position and
         the source file
         """
         return self._objs
 
+    def release(self,lane):
+        """
+        Gives the obstacle images back to the image cache, for another lane to
+        use. This lane may not be drawn afterwards.
+
+        The images are given back under the files they were made from, since
+        the simulated lane may already have been reset to another row.
+
+        Parameter lane: the simulated lane that this lane displays
+        Precondition: lane is a SimLane
+        """
+        for pos in range(len(self._objs)):
+            self._images.release(self._sources[pos],self._objs[pos])
+        self._objs = []
+        self._sources = []
+
     # INITIALIZER TO SET LANE POSITION, BACKGROUND,AND OBJECTS
-    def __init__(self,item,width,l):
+    def __init__(self,lane,kind,width,l,images):
         """
         Initializes one lane of the window from the passed-down parameters.
 
-        Parameter item: a passed down parameter from Level, referring to one lane
-        Precondition: item is a dictionary
+        Parameter lane: a passed down parameter from Level, the simulated lane
+        that this lane displays
+        Precondition: lane is a SimLane
+
+        Parameter kind: a passed down parameter from Level, the type of lane
+        Precondition: kind is one of LANE_GRASS, LANE_ROAD, LANE_WATER or
+        LANE_HEDGE
 
         Parameter width: a passed down parameter from Level, the width of a
         game in pixels
@@ -64,63 +102,69 @@ class Lane(object):         # You are permitted to change the parent class if yo
         Parameter l: a passed down parameter from Level, the bottom position
         of the tile that each lane is going to be drawn
         Precondition: l is a non-negative float value
+
+        Parameter images: a passed down parameter from Level, the image cache
+        that every obstacle image is made from
+        Precondition: images is an ImageCache
         """
+        self._images = images
         self._objs = []
+        self._sources = []
         self._tile = GTile(left = 0, bottom = l, width= width,
-        height= GRID_SIZE, source = str(item['type'])+'.png')
+        height= GRID_SIZE, source = LANE_TYPES[kind]+'.png')
         self._safefrogs = []
 
-        if 'objects' in item:
-            for pos in range(len(item['objects'])):
-                self._objs.append(GImage
-                (x=item['objects'][pos]['position']*GRID_SIZE+.5*GRID_SIZE,
-                y=.5*GRID_SIZE+l,source=str(item['objects'][pos]['type'])+'.png'))
+        xs = lane.getxs()
+        types = lane.gettypes()
+        angle = 180 if lane.getspeed() < 0 else 0
+        for pos in range(len(types)):
+            self._sources.append(types[pos]+'.png')
+            self._objs.append(images.getimage(self._sources[pos],x=xs[pos],
+            y=.5*GRID_SIZE+l,angle=angle))
 
-        if 'speed' in item:
-            if item['speed'] < 0 :
-                for element in range(len(item['objects'])):
-                    self._objs[element].angle = 180
-                    speed = item['speed']
-
-    def update(self,dt,speed,width,buffer,frog):
+    def update(self,lane,t=None):
         """
         Updates the lane for the next animation frame
 
-        The main function of this update is moving obstacles in relation to the
-        speed of the lane, wrapping around with the buffer attribute, and
+        The obstacles are moved by the simulated lane in engine.py. This method
+        only copies their positions at time t into the obstacle images.
+
+        Parameter lane: the simulated lane that this lane displays
+        Precondition: lane is a SimLane for the same row of the level
 
-        Parameter input: A valid user input
-        Precondition: input is an instance of GInput
+        Parameter t: the simulation time to show, or None for the current time
+        Precondition: t is None or a float
+
+        This method returns True if any of the objects from getstatic changed,
+        and False otherwise. For a moving lane only the obstacles change, so it
+        always returns False.
+        """
+        xs = lane.getxs(t)
+        for pos in range(len(self._objs)):
+            self._objs[pos].x = xs[pos]
+        return False
 
-        Parameter dt: time in seconds since the last call to update
-        Precondition dt: dt is a non-negative float
+    def getstatic(self):
         """
-        for obstacle in self._objs:
-            obstacle.x = obstacle.x + dt*speed
-            if speed < 0:
-                if obstacle.x < (-buffer*GRID_SIZE):
-                    d = -buffer*GRID_SIZE-obstacle.x
-                    obstacle.x = width + buffer*GRID_SIZE -d
-            if speed > 0:
-                if obstacle.x > (buffer*GRID_SIZE+width):
-                    d = obstacle.x - (buffer*GRID_SIZE+width)
-                    obstacle.x = (-buffer*GRID_SIZE) + d
+        Returns the list of objects in this lane that do not move
+
+        These are drawn by the Level as part of one cached background, so
+        draw leaves them out. For most lanes this is only the tile.
+        """
+        return [self._tile]
 
     def draw(self,view):
         """
         Instructs Python to draw the values in the body in the window.
 
+        Only the objects that move are drawn here (see getstatic).
+
         Parameter view: The view window
         Precondition: view is a GView
         """
-        self._tile.draw(view)
-
         for element in self._objs:
             element.draw(view)
 
-        for element in self._safefrogs:
-            element.draw(view)
-
 
 class Grass(Lane):                           # We recommend AGAINST changing this one
     """
@@ -133,17 +177,7 @@ class Road(Lane):                           # We recommend AGAINST changing this
     """
     A class representing a roadway with cars.
     """
-    def carcollision(self,frog):
-        """
-        Returns True if a car collides with the frog.
-
-        Parameter frog: a frog to play the game
-        Precondition: frog is a Frog object
-        """
-        if not frog is None:
-            for obstacle in range(len(self._objs)):
-                if self._objs[obstacle].collides(frog):
-                    return True
+    pass
 
 
 class Water(Lane):
@@ -153,56 +187,23 @@ class Water(Lane):
     In addition, the logs move the frog. If the frog is currently in this lane, then the
     frog moves at the same rate as all of the logs.
     """
-    def onalog(self,frog):
-        """
-        Returns True if the log contains a center of the frog.
-
-        This method loops over the obstacles to find the logs and if the
-        log contains the center of the frog when the frog is still visible
-        on the screen, it returns True.
-
-        Parameter frog: a frog to play the game
-        Precondition: frog is a Frog object
-        """
-        a = 'log1.png'
-        b = 'log2.png'
-        c = 'log3.png'
-        d = 'log4.png'
-        e = 'log5.png'
-        for obstacle in self._objs:
-            if obstacle.source is a or b or c or d or e:
-                if not frog is None:
-                    if obstacle.contains((frog.x,frog.y)):
-                        return True
-
-    def frogoffscreen(self,frog):
-        """
-        Returns True if the frog is off screen in the water lane(s).
-
-        This method checks if the frog is off screen when it is being carried
-        away by the log.
-
-        Parameter frog: a frog to play the game
-        Precondition: frog is a Frog object
-        """
-
-        a = frog.x<self._tile.left-GRID_SIZE//4
-        b = frog.x>self._tile.width+GRID_SIZE//4
-        if not frog is None:
-            if a or b:
-                return True
+    pass
 
 
 class Hedge(Lane):
     """
     A class representing the exit hedge.
     """
-    def __init__(self,item,width,l):
+    def __init__(self,lane,kind,width,l,images):
         """
         Initializes one Hedge Lane.
 
-        Parameter item: a passed down parameter from Lane, referring to one lane
-        Precondition: item is a dictionary
+        Parameter lane: a passed down parameter from Level, the simulated hedge
+        that this lane displays
+        Precondition: lane is a SimHedge
+
+        Parameter kind: a passed down parameter from Level, the type of lane
+        Precondition: kind is LANE_HEDGE
 
         Parameter width: a passed down parameter from Lane, the width of a
         game in pixels
@@ -211,58 +212,97 @@ class Hedge(Lane):
         Parameter l: a passed down parameter from Lane, the bottom position
         of the tile that each lane is going to be drawn
         Precondition: l is a non-negative float value
+
+        Parameter images: a passed down parameter from Level, the image cache
+        Precondition: images is an ImageCache
         """
-        super().__init__(item,width,l)
+        super().__init__(lane,kind,width,l,images)
 
-    def contfrg(self,f):
+        # every exit can hold one safe frog, so their images are made up front
+        self._markers = []
+        for name in lane.gettypes():
+            if name != 'open':
+                self._markers.append(images.getimage(FROG_SAFE))
+        self._shown = lane.getsafefrogs()
+
+    def update(self,lane,t=None):
         """
-        Returns True if an empty exit contains the center of the frog.
+        Updates the hedge for the next animation frame
+
+        The exits and opens never move. This only adds a blue frog (safe.png)
+        for every frog that the simulated hedge has recorded as safe since the
+        last frame, and returns True if it added any (False otherwise).
+
+        If the simulated hedge has a new list of safe frogs (because the level
+        was restored from a snapshot), every blue frog is put back in place.
+
+        Parameter lane: the simulated hedge that this lane displays
+        Precondition: lane is a SimHedge for the same row of the level
 
-        Parameter frog: a frog to play the game
-        Precondition: f is a Frog object
+        Parameter t: the simulation time to show, or None for the current time
+        Precondition: t is None or a float
         """
-        for obstacle in self._objs:
-            if not f is None:
-                if obstacle.source != 'open.png':
-                    if obstacle.contains((f.x, f.y)) and not self.usedexit(f):
-                        self._safefrogs.append(GImage(x=f.x,y=f.y,
-                        source = 'safe.png'))
-                        return True
-
-    def foropen(self,frog):
+        safefrogs = lane.getsafefrogs()
+        if not safefrogs is self._shown:
+            self._markers.extend(self._safefrogs)
+            self._safefrogs = []
+            self._shown = safefrogs
+        elif len(self._safefrogs) == len(safefrogs):
+            return False
+        for pos in range(len(self._safefrogs),len(safefrogs)):
+            if len(self._markers) > 0:
+                marker = self._markers.pop()
+            else:
+                marker = self._images.getimage(FROG_SAFE)
+            marker.x = safefrogs[pos][0]
+            marker.y = safefrogs[pos][1]
+            self._safefrogs.append(marker)
+        return True
+
+    def getstatic(self):
         """
-        Returns True if the obstacle is an open and contains the center
-        of the frog.
+        Returns the list of objects in this lane that do not move
 
-        This method loops over the obstacle in the lane and returns True if
-        the obstacle is an open and contains the center of the frog.
+        For the hedge this is everything: the tile, the exits and opens, and
+        the blue frogs.
+        """
+        return [self._tile]+self._objs+self._safefrogs
 
-        Parameter frog: a frog to play the game
-        Precondition: frog is a Frog object
+    def draw(self,view):
         """
+        Instructs Python to draw the values in the body in the window.
 
-        for obstacle in self._objs:
-            if not frog is None:
-                if obstacle.source == 'open.png':
-                    if obstacle.contains((frog.x, frog.y)):
-                        return True
+        Everything in the hedge is static (see getstatic), so nothing is drawn
+        here.
 
-    def usedexit(self,frog):
+        Parameter view: The view window
+        Precondition: view is a GView
         """
-        Returns True is the exit is already occupied by a blue frog.
+        pass
 
-        Parameter frog: a frog to play the game
-        Precondition: frog is a Frog object
+    def release(self,lane):
         """
+        Gives the images of the exits, the opens and the blue frogs back to the
+        image cache, for another lane to use. This lane may not be drawn
+        afterwards.
 
-        for frogs in self._safefrogs:
-            if frogs.collides(frog):
-                return True
+        Parameter lane: the simulated hedge that this lane displays
+        Precondition: lane is a SimHedge
+        """
+        super().release(lane)
+        for marker in self._markers+self._safefrogs:
+            self._images.release(FROG_SAFE,marker)
+        self._markers = []
+        self._safefrogs = []
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getsafefrogs(self):
         """
-        Returns self._safefrogs, a list of GImages with blue frog (safe.png)
+        Returns self._safefrogs, a list of images with blue frog (safe.png)
         as the source file and the positions of the frog.
         """
         return self._safefrogs
+
+
+# The lane class for each lane type, indexed like LANE_TYPES
+LANE_VIEWS = (Grass, Road, Water, Hedge)
@@ -9,6 +9,16 @@ The subcontroller Level manages the frog and all of the obstacles. However, thos
 all defined in models.py.  The only thing in this class is the level class and all of
 the individual lanes.
 
+The rules of the game are simulated by a Simulation object from engine.py, which needs
+neither game2d nor Kivy. Level is only a view of that simulation: after every update it
+copies the positions of the frog and the obstacles into the objects that are drawn.
+
+A level taller than VIEW_HEIGHT does not fit in the window. The view then scrolls with
+the frog, and only the lanes in the window are brought up to date and drawn. The same
+is true of an EndlessLevel, whose lanes are made as the frog moves up (see endless.py).
+Only the lanes in the window have lane objects and images at all: the obstacles of the
+other lanes are just numbers in the simulation, however tall the level is.
+
 Author: Caroline Ryu 
 Date: December 21, 2020
 """
@@ -16,6 +26,10 @@ from game2d import *
 from consts import *
 from lanes  import *
 from models import *
+from engine import *
+from endless import *
+from cache import *
+from kivy.graphics import PushMatrix, PopMatrix, Translate
 
 
 class Level(object):
@@ -27,34 +41,74 @@ class Level(object):
     # Invariant: _width is a non-negative float value and is provided by the
     # JSON
     #
-    # Attribute: _height: a height of the game in pixels
-    # Invariant: _height is a non-negative float value and is provided by the
-    # JSON
+    # Attribute: _sim: the simulation that runs the rules of this level
+    # Invariant: _sim is a Simulation object
     #
     # Attribute: _lanes: # a list of lanes that will contain the lane objetcts
     # Invariant: _lanes is a list of lane objects of either Grass, Road, Water,
-    # or Hedge
+    # or Hedge (or None), enough for every row that can be drawn at once. Row r
+    # is shown by _lanes[r % len(_lanes)], once _getslot(r) has been called
     #
-    # Attribute: _livesc: a list of lives counter that will keep track of the
-    # frogheads depending on number of lives left
-    # Invariant: _livesc is a list of GImage objects or None if there are
-    # no lives left
+    # Attribute: _simlanes: the simulated lane shown by each lane object
+    # Invariant: _simlanes is a list of SimLanes (or None), where
+    # _simlanes[slot] is shown by _lanes[slot]
     #
-    # Attribute: _cooldown: a cooldown attribute to avoid the frog rocketing
-    # off screen
-    # Invariant: _cooldown is a float value
+    # Attribute: _simrows: the row shown by each lane object
+    # Invariant: _simrows is a list of ints (or None), where _simrows[slot] is
+    # the row of _simlanes[slot] when _lanes[slot] was made
     #
-    # Attribute: _speed: a list of speeds for each lane in a given JSon
-    # Invariant: _speed is a list of integers provided by the JSON
+    # Attribute: _images: the images of the lanes
+    # Invariant: _images is an ImageCache
     #
-    # Attribute: _buffer: a buffer size to avoid snapping
-    # Invariant: _buffer is a non-negative interger provided by the JSON
+    # Attribute: _viewheight: the height of the part of the level in the window
+    # Invariant: _viewheight is the smaller of the height of the rows in play
+    # and VIEW_HEIGHT
+    #
+    # Attribute: _camera: the level y coordinate at the bottom of the window
+    # Invariant: _camera is a float, such that the window only shows rows in
+    # play
+    #
+    # Attribute: _shift: the instruction that scrolls the level by _camera
+    # Invariant: _shift is a Translate
+    #
+    # Attribute: _livesc: a list of lives counter that will keep track of the
+    # frogheads depending on number of lives left
+    # Invariant: _livesc is a list of CachedImage objects, one for each life
+    # left in _sim
     #
     # Attribute: _frog: a frog object to play in the game
-    # Invariant: _frog is a Frog Object
+    # Invariant: _frog is a Frog Object, or None if _sim has no frog in play
+    #
+    # Attribute: _spare: the one Frog object of the level, kept while the frog
+    # is out of play so that setfrog can reuse it
+    # Invariant: _spare is a Frog object, and _frog is either None or _spare
+    #
+    # Attribute: _heads: every froghead of the lives counter, lost or not
+    # Invariant: _heads is a list of FROG_LIVES GImage objects, and _livesc is
+    # the last getlives() of them
     #
     # Attribute: _livest: a text to display 'Lives'
     # Invariant: _livest is a GLabel, or None if there is no message to display
+    #
+    # Attribute: _statics: the lane tiles and everything else that does not
+    # move, drawn as one cached layer for each lane
+    # Invariant: _statics is a list of StaticLayers, where _statics[slot] holds
+    # the getstatic() objects of _lanes[slot]
+    #
+    # Attribute: _hud: the 'LIVES:' label and the frogheads as one cached layer
+    # Invariant: _hud is a StaticLayer of _livest and _livesc
+    #
+    # Attribute: _prevtime: the simulation time before the last update
+    # Invariant: _prevtime is a float no larger than the time of _sim
+    #
+    # Attribute: _prevx: the x position of the frog before the last update
+    # Invariant: _prevx is a float
+    #
+    # Attribute: _prevy: the y position of the frog before the last update
+    # Invariant: _prevy is a float
+    #
+    # Attribute: _profiler: the profiler that times the phases of the level
+    # Invariant: _profiler is a FrameProfiler, or None if nothing is timed
 
     # GETTERS AND SETTERS (ONLY ADD IF YOU NEED THEM)
     def getwidth(self):
@@ -66,10 +120,25 @@ class Level(object):
 
     def getheight(self):
         """
-        Returns self._height, the height of the game in pixels by multiplying
-        GRID_SIZE to the height provided by the json
+        Returns the height of the game in pixels by multiplying GRID_SIZE to
+        the height provided by the json (for an endless level, the height of
+        every lane made so far)
+        """
+        return self._sim.getheight()
+
+    def getviewheight(self):
+        """
+        Returns self._viewheight, the height in pixels of the part of the
+        level shown in the window (the whole level if it fits)
         """
-        return self._height
+        return self._viewheight
+
+    def getcamera(self):
+        """
+        Returns self._camera, the level y coordinate at the bottom of the
+        window
+        """
+        return self._camera
 
     def getfrog(self):
         """
@@ -89,134 +158,236 @@ class Level(object):
         Parameter frogy: the y position of the frog to set to (in pixels)
         Precondition: frogy is a float
         """
-        self._frog = Frog(frogx,frogy)
+        self._sim.setfrog(frogx,frogy)
+        frog = self._sim.getfrog()
+        self._spare.reset(frog.x,frog.y)
+        self._frog = self._spare
+        self._prevx = frog.x
+        self._prevy = frog.y
+
+    def getsim(self):
+        """
+        Returns self._sim, the Simulation that runs the rules of this level
+        """
+        return self._sim
+
+    def getticks(self):
+        """
+        Returns the number of simulation steps run so far
+        """
+        return self._sim.getticks()
+
+    def setrecorder(self,recorder):
+        """
+        Sets the recorder that writes the keys of every step to a replay.
+
+        Parameter recorder: the recorder, or None to stop recording
+        Precondition: recorder is None or a Recorder (see replay.py)
+        """
+        self._sim.setrecorder(recorder)
+
+    def setprofiler(self,profiler):
+        """
+        Sets the profiler that times the phases of update and draw.
+
+        The simulation times its own phases (see Simulation.setprofiler). The
+        drawing phases are 'sync' (moving the images), 'background', 'lanes',
+        'frog' and 'hud'.
+
+        Parameter profiler: the profiler, or None to stop timing
+        Precondition: profiler is None or a FrameProfiler
+        """
+        self._profiler = profiler
+        self._sim.setprofiler(profiler)
 
     # INITIALIZER (standard form) TO CREATE THE FROG AND LANES
-    def __init__(self, json):
+    def __init__(self, json, objects=None, labels=None, images=None):
         """
         Initializes the level settings to create a frog and the lanes from the
         given JSON
 
+        The level may also be given already compiled (see compiler.py), which
+        is much faster for large levels.
+
         Parameter json: A json file to set the level to
         Precondition: A valid json file containing all information to set the
-        level in this game
-        """
-        # exactly 30 lines
+        level in this game, or a CompiledLevel
 
-        self._lanes = []
-        self._livesc = []
-        self._cooldown = 0
-        self._width = json['size'][0]*GRID_SIZE
-        self._height = json['size'][1]*GRID_SIZE
-        self._speed = []
-        self._buffer = json['offscreen']
-
-        # going over each lane to add the corersponding lane objects (and speed
-        # for Road and Water types) to self_lanes (and self._speed), respectively
-        for pos in range(len(json['lanes'])):
-            # an item refers to one lane
-            item = json['lanes'][pos]
-            l = GRID_SIZE * pos
-            if json['lanes'][pos]['type'] == 'grass':
-                self._lanes.append(Grass(item, self._width, l))
-            elif json['lanes'][pos]['type'] == 'road':
-                self._lanes.append(Road(item, self._width, l))
-                self._speed.append(json['lanes'][pos]['speed'])
-            elif json['lanes'][pos]['type'] == 'water':
-                self._lanes.append(Water(item, self._width, l))
-                self._speed.append(json['lanes'][pos]['speed'])
-            elif json['lanes'][pos]['type'] == 'hedge':
-                self._lanes.append(Hedge(item, self._width, l))
-
-        # creating a frog object
-        self._frog = Frog(json['start'][0]*GRID_SIZE+0.5*GRID_SIZE,
-        json['start'][1]*GRID_SIZE+0.5*GRID_SIZE)
+        Parameter objects: The object data with the hitboxes (optional)
+        Precondition: objects is None or the contents of OBJECT_DATA
 
-        # adding frogheads to self._livesc
-        for element in range(FROG_LIVES):
-            n = element + 1
-            self._livesc.append(GImage(x=self._width-GRID_SIZE*n+0.5*GRID_SIZE,
-            y= self._height+(GRID_SIZE//2),width = GRID_SIZE,height = GRID_SIZE,
-            source = FROG_HEAD))
+        Parameter labels: The cache to get the 'LIVES:' label from (optional)
+        Precondition: labels is None or a LabelCache
 
-        # creating a label to display the lives
-        self._livest = GLabel(text = "LIVES:",right = self._livesc[2].left,
-        y =self._height+(GRID_SIZE//2),font_name = ALLOY_FONT,
-        font_size = ALLOY_SMALL, linecolor = 'dark green')
+        Parameter images: The cache to get every lane image from (optional)
+        Precondition: images is None or an ImageCache
+        """
+        level = json if isinstance(json,CompiledLevel) else compilelevel(json)
+        if images is None:
+            images = ImageCache()
+        shapes = self._makefrog(level.getstart(), level.getnames(), objects,
+        images)
+        self._setup(Simulation(level, shapes), labels, images)
 
     # UPDATE METHOD TO MOVE THE FROG AND UPDATE ALL OF THE LANES
     def update(self, input, dt):
         """
         Updates the level for the next animation frame
 
+        The simulation moves the obstacles and the frog. Afterwards the lives
+        counter is brought up to date with it. The frog and obstacle images are
+        only moved when the level is drawn, which may be in between two updates.
+
         Parameter input: A valid user input
         Precondition: input is an instance of GInput
 
         Parameter dt: time in seconds since the last call to update
         Precondition dt: dt is a non-negative float
         """
-        next = -1
-        for lanes in (self._lanes):
-            if isinstance(lanes,Water):
-                next = next +1
-                lanes.update(dt, self._speed[next],self._width, self._buffer,
-                self._frog)
-                if not self._frog is None:
-                    if lanes.gettile().collides(self._frog):
-                        if lanes.onalog(self._frog):
-                            self._frog.x += self._speed[next]*dt
-                            if lanes.frogoffscreen(self._frog):
-                                self._frog = None
-                                del self._livesc[0]
-                        elif not lanes.onalog(self._frog):
-                            self._frog = None
-                            del self._livesc[0]
-            elif isinstance(lanes,Road):
-                next = next +1
-                lanes.update(dt, self._speed[next],self._width, self._buffer,
-                self._frog)
-                if not self._frog is None:
-                    if lanes.carcollision(self._frog):
-                        del self._livesc[0]
-                        self._frog = None
-            elif isinstance(lanes,Hedge):
-                if not self._frog is None:
-                    if lanes.contfrg(self._frog) and not lanes.foropen(self._frog):
-                        self._frog = None
-        self.exitfill()
-        self._whichkeypressed(input,dt)
+        self._prevtime = self._sim.gettime()
+        frog = self._sim.getfrog()
+        if not frog is None:
+            self._prevx = frog.x
+            self._prevy = frog.y
+
+        self._sim.update(input,dt)
+
+        if self._sim.getfrog() is None:
+            self._frog = None
+
+        if len(self._livesc) > self._sim.getlives():
+            while len(self._livesc) > self._sim.getlives():
+                del self._livesc[0]
+            self._hud.setobjects([self._livest]+self._livesc)
 
     # DRAW METHOD TO DRAW THE FROG AND THE INDIVIDUAL LANES
-    def draw(self,view):
+    def draw(self,view,alpha=1.0):
         """
         Instructs Python to draw the values in the body in the window.
 
+        The frog and the obstacles are drawn at a fraction alpha of the way
+        from where they were before the last update to where they are now.
+        Everything that does not move is drawn from the cached lane and HUD
+        layers, which are only rebuilt when something in them changes.
+
+        The view is scrolled to keep the frog in the middle of the window, as
+        far as the level allows. Only the lanes in the window, and VIEW_MARGIN
+        lanes past each edge, are brought up to date and drawn, so the time this
+        takes does not depend on the height of the level.
+
         Parameter view: The view window
         Precondition: view is a GView
-        """
-        for pos in self._lanes:
-            pos.draw(view)
-        if not self._frog is None:
+
+        Parameter alpha: how far to go from the previous to the current state
+        Precondition: alpha is a float between 0 and 1
+        """
+        profiler = self._profiler
+        if profiler is not None:
+            mark = profiler.mark()
+        t = self._prevtime+alpha*(self._sim.gettime()-self._prevtime)
+        frog = self._sim.getfrog()
+        if not self._frog is None and not frog is None:
+            self._frog.x = self._prevx+alpha*(frog.x-self._prevx)
+            self._frog.y = self._prevy+alpha*(frog.y-self._prevy)
+            self._frog.angle = frog.angle
+            self._camera = self._frog.y-self._viewheight/2
+        rows = self._sim.getrows()
+        self._camera = min(max(self._camera,rows[0]*GRID_SIZE),
+        rows[1]*GRID_SIZE-self._viewheight)
+
+        first = max(int(self._camera // GRID_SIZE)-VIEW_MARGIN,rows[0])
+        last = min(int((self._camera+self._viewheight) // GRID_SIZE)+VIEW_MARGIN,
+        rows[1]-1)
+        slots = []
+        for row in range(first,last+1):
+            slot = self._getslot(row)
+            if self._lanes[slot].update(self._simlanes[slot],t):
+                self._statics[slot].setobjects(self._lanes[slot].getstatic())
+            slots.append(slot)
+        if profiler is not None:
+            mark = profiler.lap('sync',mark)
+
+        view.draw(PushMatrix())
+        self._shift.y = -self._camera
+        view.draw(self._shift)
+        for slot in slots:
+            self._statics[slot].draw(view)
+        if profiler is not None:
+            mark = profiler.lap('background',mark)
+        for slot in slots:
+            self._lanes[slot].draw(view)
+        if profiler is not None:
+            mark = profiler.lap('lanes',mark)
+        if not self._frog is None and not frog is None:
             self._frog.draw(view)
-        self._livest.draw(view)
-        for pos in self._livesc:
-            pos.draw(view)
+        view.draw(PopMatrix())
+        if profiler is not None:
+            mark = profiler.lap('frog',mark)
+        self._hud.draw(view)
+        if profiler is not None:
+            profiler.lap('hud',mark)
+
+    def seek(self,t):
+        """
+        Moves every obstacle to where it is at time t (in seconds) of the level.
+
+        This can jump forwards or backwards at once; the obstacle images are
+        brought up to date the next time the level is drawn.
+
+        Parameter t: the time to move to, in seconds since the level started
+        Precondition: t is a non-negative float
+        """
+        self._sim.seek(t)
+
+    def snapshot(self):
+        """
+        Returns a Snapshot of the state of the level (see engine.py)
+
+        The snapshot only holds the state of the simulation, not any image, so
+        it can be made every frame.
+        """
+        return self._sim.snapshot()
+
+    def restore(self,snapshot):
+        """
+        Puts the level back in the state of snapshot
+
+        The frog and the lives counter are brought up to date at once; the
+        obstacles and the safe frogs the next time the level is drawn.
+
+        Parameter snapshot: the state to go back to
+        Precondition: snapshot is a Snapshot made by snapshot() of this level
+        """
+        self._sim.restore(snapshot)
+        self._prevtime = self._sim.gettime()
+        frog = self._sim.getfrog()
+        if frog is None:
+            self._frog = None
+        else:
+            self._frog = self._spare
+            self._frog.x = self._prevx = frog.x
+            self._frog.y = self._prevy = frog.y
+            self._frog.angle = frog.angle
+
+        if len(self._livesc) != self._sim.getlives():
+            self._livesc = self._heads[len(self._heads)-self._sim.getlives():]
+            self._hud.setobjects([self._livest]+self._livesc)
+
+    def gettime(self):
+        """
+        Returns the time in seconds since the level started
+        """
+        return self._sim.gettime()
 
     # PUBLIC NECESSARY HELPERS
     def nolives(self):
         """
         Returns True if there are no lives left. Returns False otherwise
 
-        This method determines whether there are no lives left with the list
-        that keeps track of how many lives are left. If this list if empty,
-        it means there are no lives left, hence returning True. This method is
-        used in app.py to determine if the user lost the game. That is, if this
-        is True, the state will change to STATE_COMPLETE.
+        This method is used in app.py to determine if the user lost the game.
+        That is, if this is True, the state will change to STATE_COMPLETE.
         """
-        if self._livesc == []:
-            return True
-        else:
-            return False
+        return self._sim.nolives()
 
     def exitfill(self):
         """
@@ -226,223 +397,172 @@ class Level(object):
         This method is used in app.py to determine if the user won the game.
         That is, if this is True, the state will change to STATE_COMPLETE.
         """
-        if self._numberoffrogs() == self._numberofexits():
-            return True
-        else:
-            return False
+        return self._sim.exitfill()
 
     # ANY NECESSARY HELPERS (SHOULD BE HIDDEN)
-    def _whichkeypressed(self, input, dt):
+    def _makefrog(self, start, names, objects, images):
         """
-        Calls the corresponding helper functions when each of the keys are
-        pressed.
+        Creates the frog, loads the images, and returns the hitboxes of the
+        object types (see compileshapes)
 
-        Parameter input: A valid user input
-        Precondition: input is an instance of GInput
+        Parameter start: the grid square the frog starts in
+        Precondition: start is an (x,y) pair of numbers
 
-        Parameter dt: time in seconds since the last call to update
-        Precondition dt: dt is a non-negative float
+        Parameter names: the object types in the level
+        Precondition: names is a sequence of strings
+
+        Parameter objects: The object data with the hitboxes (optional)
+        Precondition: objects is None or the contents of OBJECT_DATA
+
+        Parameter images: The cache to load the images into
+        Precondition: images is an ImageCache
         """
-        if self._cooldown > dt:
-            self._cooldown = self._cooldown - dt
-        else:
-            if input.is_key_down('left'):
-                self._leftkeydown()
-            elif input.is_key_down('right'):
-                self._rightkeydown()
-            elif input.is_key_down('up'):
-                self._upkeydown()
-            elif input.is_key_down('down'):
-                self._downkeydown()
-
-    def _leftkeydown(self):
-        """
-        Sets the motion of the frog accordingly when the 'left' key is pressed
-        once
-
-        This method makes sure that if the frog is near the edge of the window,
-        it doens't go off screen. It allows the frog to move left a grid as
-        long as the frog is not in an open where the movement is restricted.
-        It also takes cooldown into consideration to not let the frog rocket off
-        screen and make the frog face West when it's moving.
-        """
-        if self._frog.x <= GRID_SIZE:
-            self._frog.x = self._frog.x
-            self._frog.angle = FROG_WEST
-        else:
-            self._frog.x -= GRID_SIZE
-            self._frog.angle = FROG_WEST
-            for lanes in self._lanes:
-                if isinstance(lanes,Hedge):
-                    if self._frog is not None:
-                        if lanes.gettile().collides(self._frog):
-                            if not lanes.contfrg(self._frog):
-                                self._frog.x += GRID_SIZE
-                if isinstance(lanes,Road):
-                    if self._frog is not None:
-                        if lanes.carcollision(self._frog):
-                            self._frog = None
-                            del self._livesc[0]
-                if isinstance(lanes,Water):
-                    if self._frog is not None:
-                        if lanes.gettile().collides(self._frog):
-                            if not lanes.onalog(self._frog):
-                                self._frog = None
-                                del self._livesc[0]
-        self._cooldown = FROG_SPEED
-
-    def _rightkeydown(self):
-        """
-        Sets the motion of the frog accordingly when the 'right' key is pressed
-        once
-
-        This method makes sure that if the frog is near the edge of the window,
-        it doens't go off screen. It allows the frog to move right a grid as
-        long as the frog is not in an open where the movement is restricted.
-        It also takes cooldown into consideration to not let the frog rocket off
-        screen and make the frog face East when it's moving.
-        """
-        if self._frog is not None:
-            if self._frog.x >= self._width - GRID_SIZE:
-                self._frog.x = self._frog.x
-                self._frog.angle = FROG_EAST
-            else:
-                self._frog.x += GRID_SIZE
-                self._frog.angle = FROG_EAST
-                for lanes in self._lanes:
-                    if isinstance(lanes,Hedge):
-                        if self._frog is not None:
-                            if lanes.gettile().collides(self._frog):
-                                if not lanes.contfrg(self._frog):
-                                    self._frog.x -= GRID_SIZE
-                    if isinstance(lanes,Road):
-                        if self._frog is not None:
-                            if lanes.carcollision(self._frog):
-                                self._frog.angle = FROG_EAST
-                                self._frog = None
-                                del self._livesc[0]
-                    if isinstance(lanes,Water):
-                        if self._frog is not None:
-                            if lanes.gettile().collides(self._frog):
-                                if not lanes.onalog(self._frog):
-                                    self._frog.angle = FROG_EAST
-                                    self._frog = None
-                                    del self._livesc[0]
-                self._cooldown = FROG_SPEED
-
-    def _upkeydown(self):
-        """
-        Sets the motion of the frog accordingly when the 'up' key is pressed
-        once
-
-        This method makes sure that if the frog is near the edge of the window,
-        it doens't go off screen. It allows the frog to move up a grid as
-        long as the frog is trying to enter a filled exit or a Hedge tile that
-        isn't an exit. It sets the frog to None if it enters an unfilled exit.
-        It also takes cooldown into consideration to not let the frog rocket off
-        screen and make the frog face North when it's moving.
-        """
-        if not self._frog is None:
-            if self._frog.y >= self._height - GRID_SIZE:
-                self._frog.y = self._frog.y
-                self._frog.angle = FROG_NORTH
-            else:
-                self._frog.y += GRID_SIZE
-                self._frog.angle = FROG_NORTH
-                for lanes in self._lanes:
-                    if not self._frog is None:
-                        if isinstance(lanes,Hedge):
-                            if lanes.gettile().collides(self._frog):
-                                if not lanes.contfrg(self._frog):
-                                    if lanes.foropen(self._frog):
-                                        self._frog.y = self._frog.y
-                                    else:
-                                        self._frog.y -= GRID_SIZE
-                                else:
-                                    self._frog = None
-                            else:
-                                self._frog.y = self._frog.y
-                        if isinstance(lanes,Road):
-                            if lanes.carcollision(self._frog):
-                                self._frog = None
-                                del self._livesc[0]
-                        if isinstance(lanes,Water):
-                            if lanes.gettile().collides(self._frog):
-                                if not lanes.onalog(self._frog):
-                                    self._frog = None
-                                    del self._livesc[0]
-                    self._cooldown = FROG_SPEED
-
-    def _downkeydown(self):
-        """
-        Sets the motion of the frog accordingly when the 'down' key is pressed
-        once
-
-        This method makes sure that if the frog is near the edge of the window,
-        it doens't go off screen. It allows the frog to move down a grid as
-        long as the frog is trying to enter a filled exit or a Hedge tile that
-        isn't an exit. It sets the frog to None if it enters an unfilled exit.
-        It also takes cooldown into consideration to not let the frog rocket off
-        screen and make the frog face South when it's moving.
-        """
-        if self._frog.y <= GRID_SIZE:
-            self._frog.y = self._frog.y
-            self._frog.angle = FROG_SOUTH
-        else:
-            self._frog.y -= GRID_SIZE
-            self._frog.angle = FROG_SOUTH
-            for lanes in self._lanes:
-                if not self._frog is None:
-                    if isinstance(lanes,Hedge):
-                        if lanes.gettile().collides(self._frog):
-                            if lanes.foropen(self._frog):
-                                self._frog.y = self._frog.y
-                                self._frog.angle = FROG_SOUTH
-                            else:
-                                self._frog.y += GRID_SIZE
-                                self._frog.angle = FROG_SOUTH
-                    if isinstance(lanes,Road):
-                        if lanes.carcollision(self._frog):
-                            self._frog = None
-                            del self._livesc[0]
-                    if isinstance(lanes,Water):
-                        if lanes.gettile().collides(self._frog):
-                            if not lanes.onalog(self._frog):
-                                self._frog = None
-                                del self._livesc[0]
-        self._cooldown = FROG_SPEED
-
-    def _numberofexits(self):
-        """
-        Returns the total number of exits in the level
-
-        This method loops over each of the lanes and if that lane is a
-        Hedge object, loop over the obstacle and adds the total number of exits
-        to an accumulator if obstacle is an exit (and not an open). The
-        accumulator is returned at the end to show the total number of exits
-        and is later used to compare with the total number of filled exits
-        to determine if the game is complete.
-        """
-        accum = 0
-        for lanes in self._lanes:
-            if isinstance(lanes,Hedge):
-                for obstacle in lanes.getobjs():
-                    if obstacle.source == 'exit.png':
-                        accum += 1
-        return accum
-
-    def _numberoffrogs(self):
-        """
-        Returns the total number of blue frogs
-
-        This method loops over each of the lanes and if that lane is a
-        Hedge object, it adds the total number of blue frogs to an accumulator,
-        which will be returned at the end to display the total number of
-        blue frogs—that is, the number of filled exits.
-
-        """
-        numberoffrogs = 0
-        for lanes in self._lanes:
-            if isinstance(lanes,Hedge):
-                numberoffrogs += len(lanes.getsafefrogs())
-        return numberoffrogs
+        self._spare = Frog(start[0]*GRID_SIZE+0.5*GRID_SIZE,
+        start[1]*GRID_SIZE+0.5*GRID_SIZE)
+        self._frog = self._spare
+
+        # every image of the level goes into one atlas; the hitboxes come from
+        # the object data, or else from the widths of the images
+        images.preload([name+'.png' for name in names]+[FROG_SAFE, FROG_HEAD])
+        return compileshapes(objects, self._imagesizes(names, images))
+
+    def _setup(self, sim, labels, images):
+        """
+        Creates the lanes and the lives counter to display the simulation sim
+
+        Parameter sim: The simulation of the level
+        Precondition: sim is a Simulation whose frog is where _frog is
+
+        Parameter labels: The cache to get the 'LIVES:' label from (optional)
+        Precondition: labels is None or a LabelCache
+
+        Parameter images: The cache to get every lane image from
+        Precondition: images is an ImageCache
+        """
+        self._sim = sim
+        self._images = images
+        self._profiler = None
+        self._prevtime = 0.0
+        self._prevx = self._frog.x
+        self._prevy = self._frog.y
+        self._lanes = []
+        self._simlanes = []
+        self._simrows = []
+        self._statics = []
+        self._livesc = []
+        first, end = sim.getrows()
+        self._width = sim.getwidth()
+        self._viewheight = min((end-first)*GRID_SIZE,VIEW_HEIGHT)
+        self._camera = first*GRID_SIZE
+        self._shift = Translate(0,0)
+
+        # making room for a lane object for each row that can be drawn at once,
+        # and the parts of it that rarely change as a cached layer; the lane
+        # objects are made by _getslot when their rows are drawn
+        slots = -(-self._viewheight // GRID_SIZE)+2*VIEW_MARGIN+1
+        for slot in range(min(slots,end-first)):
+            self._lanes.append(None)
+            self._simlanes.append(None)
+            self._simrows.append(None)
+            self._statics.append(StaticLayer())
+
+        # adding frogheads to self._livesc
+        for element in range(FROG_LIVES):
+            n = element + 1
+            self._livesc.append(images.getimage(FROG_HEAD,
+            x=self._width-GRID_SIZE*n+0.5*GRID_SIZE,
+            y= self._viewheight+(GRID_SIZE//2),width = GRID_SIZE,
+            height = GRID_SIZE))
+
+        self._heads = list(self._livesc)
+
+        # creating a label to display the lives
+        if labels is None:
+            labels = LabelCache()
+        self._livest = labels.getlabel("LIVES:",right = self._livesc[2].left,
+        y =self._viewheight+(GRID_SIZE//2),font_name = ALLOY_FONT,
+        font_size = ALLOY_SMALL, linecolor = 'dark green')
+
+        # the HUD rarely changes, so it is drawn as a cached layer too
+        self._hud = StaticLayer([self._livest]+self._livesc)
+
+    def _getslot(self, row):
+        """
+        Returns the position in _lanes of the lane object that shows row
+
+        If that position shows another row, or the simulation has replaced the
+        lane in row (as an endless level does, either with a new SimLane or by
+        resetting one that showed another row), a new lane object is made in
+        that position first. The images of the old one go back to the image
+        cache to be used again.
+
+        Parameter row: the row of the lane, counted from the bottom
+        Precondition: row is an int in the range of the rows in play of _sim
+        """
+        slot = row % len(self._lanes)
+        lane = self._sim.getlane(row)
+        if not self._simlanes[slot] is lane or self._simrows[slot] != row:
+            if not self._lanes[slot] is None:
+                self._lanes[slot].release(self._simlanes[slot])
+            kind = self._sim.getkind(row)
+            self._lanes[slot] = LANE_VIEWS[kind](lane, kind, self._width,
+            GRID_SIZE * row, self._images)
+            self._simlanes[slot] = lane
+            self._simrows[slot] = row
+            self._statics[slot].setobjects(self._lanes[slot].getstatic())
+        return slot
+
+    def _imagesizes(self, names, images):
+        """
+        Returns a dictionary with the width in pixels of each object type
+
+        The keys are the object types (the image file name without '.png'),
+        including the type of the frog image.
+
+        Parameter names: the object types in the level
+        Precondition: names is a sequence of strings
+
+        Parameter images: the cache with the images of the level
+        Precondition: images is an ImageCache
+        """
+        sizes = {FROG_IMAGE[:-4]: self._frog.width}
+        for name in names:
+            sizes[name] = images.getsize(name+'.png')[0]
+        return sizes
+
+
+class EndlessLevel(Level):
+    """
+    This class controls an endless level of Froggit.
+
+    The lanes are made from a seed as the frog moves up (see endless.py). The
+    level is shown and played just like any other Level.
+    """
+
+    def __init__(self, seed=ENDLESS_SEED, objects=None, labels=None, images=None):
+        """
+        Initializes an endless level with the given seed
+
+        Parameter seed: The seed of the level
+        Precondition: seed is an int
+
+        Parameter objects: The object data with the hitboxes (optional)
+        Precondition: objects is None or the contents of OBJECT_DATA
+
+        Parameter labels: The cache to get the 'LIVES:' label from (optional)
+        Precondition: labels is None or a LabelCache
+
+        Parameter images: The cache to get every lane image from (optional)
+        Precondition: images is None or an ImageCache
+        """
+        if images is None:
+            images = ImageCache()
+        shapes = self._makefrog((ENDLESS_WIDTH//2,0), ENDLESS_NAMES, objects,
+        images)
+        self._setup(EndlessSimulation(seed, shapes), labels, images)
+
+    def getscore(self):
+        """
+        Returns the highest row the frog has reached
+        """
+        return self._sim.getscore()
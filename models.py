@@ -36,4 +36,21 @@ class Frog(GImage):         # You will need to change this by Task 3
         Precondition: y is a float value
         """
         super().__init__(x=x, y=y, source = FROG_IMAGE)
-        self.angle = FROG_NORTh
+        self.angle = FROG_NORTH
+
+    def reset(self,x,y):
+        """
+        moves the frog to x and y and turns it to face north again.
+
+        This is how a frog is reused when the player continues, instead of
+        making a new Frog (and loading its image again).
+
+        Parameter x: a new x position of the frog
+        Precondition: x is a float value
+
+        Parameter y: a new y position of the frog
+        Precondition: y is a float value
+        """
+        self.x = x
+        self.y = y
+        self.angle = FROG_NORTH
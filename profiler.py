@@ -0,0 +1,290 @@
+"""
+Frame profiler module for Froggit
+
+This module measures how long each phase of a frame takes: moving the lanes, checking
+collisions, handling the input, and drawing each layer. Every phase keeps its most
+recent timings in a fixed-size ring buffer, so profiling a long session uses no more
+memory than a short one. The timings can be summarized as percentiles, shown on the
+screen, or written to a JSON file to compare between builds.
+
+The startup of the game is timed the same way, once, by a StartupTimer.
+
+Only consts.py is used here, so the simulation can be profiled without game2d or Kivy.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from array import array
+import json
+import math
+import sys
+import time
+
+
+class RingBuffer(object):
+    """
+    A class that keeps the most recent values of a fixed-size series of numbers.
+
+    Once the buffer is full, each new value replaces the oldest one.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _values: The values in the buffer, in no particular order
+    # Invariant: _values is an array of floats of fixed length
+    #
+    # Attribute _next: The position of the next value to write
+    # Invariant: _next is an int between 0 and len(_values)-1
+    #
+    # Attribute _count: The number of values written so far (up to the size)
+    # Invariant: _count is an int between 0 and len(_values)
+
+    def __init__(self,size):
+        """
+        Initializes an empty ring buffer.
+
+        Parameter size: the number of values kept
+        Precondition: size is an int > 0
+        """
+        self._values = array('d',bytes(8*size))
+        self._next = 0
+        self._count = 0
+
+    def __len__(self):
+        """
+        Returns the number of values in the buffer
+        """
+        return self._count
+
+    def add(self,value):
+        """
+        Adds a value to the buffer, replacing the oldest if it is full.
+
+        Parameter value: the value to add
+        Precondition: value is a number
+        """
+        self._values[self._next] = value
+        self._next += 1
+        if self._next == len(self._values):
+            self._next = 0
+        if self._count < len(self._values):
+            self._count += 1
+
+    def getvalues(self):
+        """
+        Returns a list of the values in the buffer, in no particular order
+        """
+        return self._values[:self._count].tolist()
+
+
+class FrameProfiler(object):
+    """
+    A class that times the phases of every frame.
+
+    A phase is timed by taking a mark before it and calling lap after it:
+
+        mark = profiler.mark()
+        ...                                 # the work to time
+        mark = profiler.lap('motion',mark)
+
+    lap returns a new mark, so phases that follow each other can be timed without
+    reading the clock twice. Phases are made the first time they are timed.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _size: The number of timings kept for each phase
+    # Invariant: _size is an int > 0
+    #
+    # Attribute _phases: The timings of each phase, in seconds
+    # Invariant: _phases is a dictionary mapping phase names to RingBuffers
+
+    def __init__(self,size=PROFILE_SIZE):
+        """
+        Initializes a profiler with no phases.
+
+        Parameter size: the number of timings kept for each phase
+        Precondition: size is an int > 0
+        """
+        self._size = size
+        self._phases = {}
+
+    def mark(self):
+        """
+        Returns the current time, to pass to lap when the phase ends.
+        """
+        return time.perf_counter()
+
+    def lap(self,phase,mark):
+        """
+        Records the time since mark for phase, and returns the current time.
+
+        Parameter phase: the name of the phase
+        Precondition: phase is a string
+
+        Parameter mark: the time the phase started
+        Precondition: mark is a value returned by mark or lap
+        """
+        now = time.perf_counter()
+        self.record(phase,now-mark)
+        return now
+
+    def record(self,phase,seconds):
+        """
+        Records a timing for phase.
+
+        Parameter phase: the name of the phase
+        Precondition: phase is a string
+
+        Parameter seconds: how long the phase took
+        Precondition: seconds is a non-negative number
+        """
+        buffer = self._phases.get(phase)
+        if buffer is None:
+            buffer = RingBuffer(self._size)
+            self._phases[phase] = buffer
+        buffer.add(seconds)
+
+    def getphases(self):
+        """
+        Returns the names of the phases timed so far, in the order first timed
+        """
+        return list(self._phases)
+
+    def getstats(self,phase):
+        """
+        Returns a dictionary with the statistics of phase, in milliseconds.
+
+        The keys are 'count', 'mean', 'p50', 'p95', 'p99' and 'max'. The times
+        are over the timings still in the ring buffer of the phase.
+
+        Parameter phase: the name of the phase
+        Precondition: phase is a string returned by getphases
+        """
+        values = sorted(self._phases[phase].getvalues())
+        count = len(values)
+        return {'count': count,
+                'mean': 1000*sum(values)/count,
+                'p50': 1000*_percentile(values,50),
+                'p95': 1000*_percentile(values,95),
+                'p99': 1000*_percentile(values,99),
+                'max': 1000*values[-1]}
+
+    def summary(self):
+        """
+        Returns a dictionary mapping every phase to its statistics (see getstats)
+        """
+        result = {}
+        for phase in self._phases:
+            result[phase] = self.getstats(phase)
+        return result
+
+    def totext(self):
+        """
+        Returns the statistics as text, one line for each phase.
+        """
+        lines = []
+        for phase in self._phases:
+            stats = self.getstats(phase)
+            lines.append('%-10s p50 %6.2f  p95 %6.2f  p99 %6.2f ms' %
+                (phase,stats['p50'],stats['p95'],stats['p99']))
+        return '\n'.join(lines)
+
+    def dump(self,filename=PROFILE_FILE,info=None):
+        """
+        Writes the statistics of every phase to a JSON file.
+
+        The file holds a dictionary with the ring buffer size, the tick rate,
+        the statistics of each phase (see summary), and the entries of info.
+
+        Parameter filename: the file to write
+        Precondition: filename is a string
+
+        Parameter info: extra entries describing the run, like the level (optional)
+        Precondition: info is None or a dictionary that can be written as JSON
+        """
+        data = {'size': self._size, 'tickrate': TICK_RATE,
+                'phases': self.summary()}
+        if info is not None:
+            data.update(info)
+        with open(filename,'w') as file:
+            json.dump(data,file,indent=2,sort_keys=True)
+
+
+class StartupTimer(object):
+    """
+    A class that times the steps of the startup of the game.
+
+    Each step is marked when it ends, with the time since the timer started.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _start: The time the startup began
+    # Invariant: _start is a float, a value of time.perf_counter()
+    #
+    # Attribute _marks: The steps marked so far, in order
+    # Invariant: _marks is a list of (name,seconds) tuples, with the seconds
+    # since _start at the end of each step
+
+    def __init__(self,start=STARTUP_TIME):
+        """
+        Initializes a timer with no steps.
+
+        Parameter start: the time the startup began
+        Precondition: start is a float, a value of time.perf_counter()
+        """
+        self._start = start
+        self._marks = []
+
+    def mark(self,step):
+        """
+        Marks the end of step, and returns the seconds since the startup began.
+
+        Parameter step: the name of the step
+        Precondition: step is a string
+        """
+        seconds = time.perf_counter()-self._start
+        self._marks.append((step,seconds))
+        return seconds
+
+    def getmarks(self):
+        """
+        Returns the list of (name,seconds) of the steps marked so far, in order
+        """
+        return list(self._marks)
+
+    def dump(self,filename=STARTUP_FILE,info=None):
+        """
+        Writes the times of the steps to a JSON file.
+
+        The file holds a dictionary with the time of each step in milliseconds
+        (both since the startup began and since the step before), the number
+        of modules loaded, and the entries of info.
+
+        Parameter filename: the file to write
+        Precondition: filename is a string
+
+        Parameter info: extra entries describing the run, like the level (optional)
+        Precondition: info is None or a dictionary that can be written as JSON
+        """
+        steps = []
+        last = 0.0
+        for step, seconds in self._marks:
+            steps.append({'step': step, 'total': 1000*seconds,
+                          'time': 1000*(seconds-last)})
+            last = seconds
+        data = {'steps': steps, 'modules': len(sys.modules)}
+        if info is not None:
+            data.update(info)
+        with open(filename,'w') as file:
+            json.dump(data,file,indent=2,sort_keys=True)
+
+
+def _percentile(values,percent):
+    """
+    Returns the nearest-rank percentile of a sorted list of numbers.
+
+    Parameter values: the numbers
+    Precondition: values is a non-empty sorted list of numbers
+
+    Parameter percent: the percentile
+    Precondition: percent is a number between 0 and 100
+    """
+    rank = int(math.ceil(percent/100.0*len(values)))
+    return values[min(max(rank,1),len(values))-1]
@@ -0,0 +1,460 @@
+"""
+Replay module for Froggit
+
+This module records a game as the keys held down on each simulation step, and plays
+it back. The simulation runs on a fixed tick (see TICK_RATE) and computes the obstacle
+positions from the time, so the same level and the same keys always give the same
+game. A replay only has to store which level was played and when the keys changed.
+Games are only recorded when the game is started with --record (see RECORD).
+
+A replay file starts with a header: the level hash, the hash of the hitboxes (see
+hashshapes in engine.py), the endless seed, the tick rate and the frog speed. The game
+takes its hitboxes from the widths of the images it loads, so a replay is only played
+back with the same hitboxes it was recorded with. After that come the events, each
+appended to the end of the file as it happens, so a replay of a game that crashed is
+still readable up to the crash:
+
+    keys     the tick and the new set of arrow keys held down (5 bytes)
+    frog     the tick and the position the frog was put back at (21 bytes)
+    end      the tick the game ended on (5 bytes)
+
+Only consts.py, compiler.py, engine.py and endless.py are used here, so replays can be
+played back without game2d or Kivy, much faster than real time.
+
+Author: Caroline Ryu
+Date: October 18, 2026
+"""
+from consts import *
+from compiler import *
+from engine import *
+from endless import *
+import os
+import struct
+import time
+
+# The first bytes of every replay file
+REPLAY_MAGIC   = b'FRGR'
+# The version of the replay format (change it whenever the format changes)
+REPLAY_VERSION = 2
+# The header: magic, version, tick rate, endless (0 or 1), endless seed, frog speed,
+# level hash, hitbox hash
+REPLAY_HEADER  = struct.Struct('<4sHHBxxxqd32s32s')
+# An event: the tick and the event code
+REPLAY_EVENT   = struct.Struct('<IB')
+# The position that follows a frog event
+REPLAY_POINT   = struct.Struct('<dd')
+
+# The arrow keys, in the order of their bits in a keys event
+REPLAY_KEYS    = ('left','right','up','down')
+# The event code of a frog event (a keys event has the key bits as its code)
+REPLAY_FROG    = 0x80
+# The event code of an end event
+REPLAY_END     = 0x40
+
+
+class Recorder(object):
+    """
+    A class that writes a replay file as a game is played.
+
+    A Simulation given a recorder (see Simulation.setrecorder) calls keys on every
+    step and frog whenever the frog is put back in play. Only changes in the keys
+    are written, and every event is written to the file at once.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _file: The replay file
+    # Invariant: _file is a binary file open for writing, or None once closed
+    #
+    # Attribute _mask: The arrow keys in the last keys event
+    # Invariant: _mask is an int with one bit for each key of REPLAY_KEYS
+
+    def __init__(self,filename,digest,shapehash,seed=None):
+        """
+        Initializes a recorder that writes a new replay file.
+
+        Parameter filename: the replay file to write
+        Precondition: filename is a string
+
+        Parameter digest: the hash of the level being played
+        Precondition: digest is the result of CompiledLevel.gethash
+
+        Parameter shapehash: the hash of the hitboxes the level is played with
+        Precondition: shapehash is the result of Simulation.getshapehash
+
+        Parameter seed: the seed of an endless level, or None for a level file
+        Precondition: seed is None or an int
+        """
+        folder = os.path.dirname(filename)
+        if folder:
+            os.makedirs(folder,exist_ok=True)
+        self._file = open(filename,'wb')
+        self._file.write(REPLAY_HEADER.pack(REPLAY_MAGIC,REPLAY_VERSION,TICK_RATE,
+            0 if seed is None else 1,0 if seed is None else seed,FROG_SPEED,
+            digest,shapehash))
+        self._file.flush()
+        self._mask = 0
+
+    def keys(self,tick,input):
+        """
+        Records the arrow keys held down on step tick, if they changed.
+
+        Parameter tick: the number of steps the simulation has run
+        Precondition: tick is an int >= 0
+
+        Parameter input: the keys held down on this step
+        Precondition: input is a GInput or a ScriptedInput
+        """
+        mask = 0
+        for pos in range(len(REPLAY_KEYS)):
+            if input.is_key_down(REPLAY_KEYS[pos]):
+                mask |= 1 << pos
+        if mask != self._mask:
+            self._mask = mask
+            self._write(REPLAY_EVENT.pack(tick,mask))
+
+    def frog(self,tick,x,y):
+        """
+        Records that the frog was put back in play at (x,y) before step tick.
+
+        Parameter tick: the number of steps the simulation has run
+        Precondition: tick is an int >= 0
+
+        Parameter x: the x position of the frog (in pixels)
+        Precondition: x is a float
+
+        Parameter y: the y position of the frog (in pixels)
+        Precondition: y is a float
+        """
+        self._write(REPLAY_EVENT.pack(tick,REPLAY_FROG)+REPLAY_POINT.pack(x,y))
+
+    def finish(self,tick):
+        """
+        Records that the game ended on step tick, and closes the file.
+
+        Parameter tick: the number of steps the simulation has run
+        Precondition: tick is an int >= 0
+        """
+        self._write(REPLAY_EVENT.pack(tick,REPLAY_END))
+        self.close()
+
+    def close(self):
+        """
+        Closes the file. Nothing more is recorded afterwards.
+        """
+        if not self._file is None:
+            self._file.close()
+            self._file = None
+
+    def _write(self,data):
+        """
+        Appends data to the file, if it is still open.
+
+        Parameter data: the event to write
+        Precondition: data is a bytes object
+        """
+        if not self._file is None:
+            self._file.write(data)
+            self._file.flush()
+
+
+class Replay(object):
+    """
+    A class representing a replay file that has been read.
+
+    The events are (tick, code, position) tuples in the order they happened. The
+    code is REPLAY_FROG, REPLAY_END or the key bits of a keys event; the position
+    is the (x,y) of a frog event and None otherwise.
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _digest: The hash of the level that was played
+    # Invariant: _digest is a bytes object of length 32
+    #
+    # Attribute _shapehash: The hash of the hitboxes the level was played with
+    # Invariant: _shapehash is a bytes object of length 32
+    #
+    # Attribute _seed: The seed of the endless level that was played
+    # Invariant: _seed is an int, or None if a level file was played
+    #
+    # Attribute _tickrate: The number of simulation steps per second
+    # Invariant: _tickrate is an int > 0
+    #
+    # Attribute _frogspeed: The FROG_SPEED the game was played with
+    # Invariant: _frogspeed is a float
+    #
+    # Attribute _events: The events of the game
+    # Invariant: _events is a list of (tick,code,position) tuples, sorted by tick
+
+    def gethash(self):
+        """
+        Returns the hash of the level that was played (see CompiledLevel.gethash)
+        """
+        return self._digest
+
+    def getshapehash(self):
+        """
+        Returns the hash of the hitboxes the level was played with (see
+        Simulation.getshapehash)
+        """
+        return self._shapehash
+
+    def getseed(self):
+        """
+        Returns the seed of the endless level played, or None for a level file
+        """
+        return self._seed
+
+    def gettickrate(self):
+        """
+        Returns the number of simulation steps per second of the game
+        """
+        return self._tickrate
+
+    def getfrogspeed(self):
+        """
+        Returns the FROG_SPEED the game was played with
+        """
+        return self._frogspeed
+
+    def getevents(self):
+        """
+        Returns the list of (tick,code,position) events of the game
+        """
+        return self._events
+
+    def getmismatch(self,digest,shapehash,tickrate=None):
+        """
+        Returns why this replay would not play back the same way, or None if it
+        would.
+
+        It would not if it was recorded on another level, with other hitboxes,
+        or with another FROG_SPEED. If tickrate is given, it would not either if
+        it was recorded at another tick rate. (playback runs a replay at its own
+        tick rate, but the game can only run at TICK_RATE.)
+
+        Parameter digest: the hash of the level to play it back on
+        Precondition: digest is the result of CompiledLevel.gethash
+
+        Parameter shapehash: the hash of the hitboxes to play it back with
+        Precondition: shapehash is the result of Simulation.getshapehash
+
+        Parameter tickrate: the tick rate to play it back at (optional)
+        Precondition: tickrate is None or an int > 0
+        """
+        if digest != self._digest:
+            return 'the replay was not recorded on this level'
+        if shapehash != self._shapehash:
+            return 'the replay was recorded with other hitboxes'
+        if self._frogspeed != FROG_SPEED:
+            return 'the replay was recorded with FROG_SPEED %g' % self._frogspeed
+        if not tickrate is None and tickrate != self._tickrate:
+            return 'the replay was recorded at a TICK_RATE of %d' % self._tickrate
+        return None
+
+    def getlength(self):
+        """
+        Returns the number of steps in the game.
+
+        If the game has no end event (it crashed or is still being played), this
+        is the number of steps up to the last event.
+        """
+        if len(self._events) == 0:
+            return 0
+        return self._events[-1][0]+(0 if self._events[-1][1] == REPLAY_END else 1)
+
+    def __init__(self,digest,shapehash,seed,tickrate,frogspeed,events):
+        """
+        Initializes a replay from its contents.
+
+        Use loadreplay instead of calling this directly.
+
+        Parameter digest: the hash of the level that was played
+        Precondition: digest is a bytes object of length 32
+
+        Parameter shapehash: the hash of the hitboxes the level was played with
+        Precondition: shapehash is a bytes object of length 32
+
+        Parameter seed: the seed of the endless level that was played
+        Precondition: seed is an int, or None if a level file was played
+
+        Parameter tickrate: the number of simulation steps per second
+        Precondition: tickrate is an int > 0
+
+        Parameter frogspeed: the FROG_SPEED the game was played with
+        Precondition: frogspeed is a float
+
+        Parameter events: the events of the game
+        Precondition: events is a list of (tick,code,position) tuples
+        """
+        self._digest = digest
+        self._shapehash = shapehash
+        self._seed = seed
+        self._tickrate = tickrate
+        self._frogspeed = frogspeed
+        self._events = events
+
+
+class ReplayInput(object):
+    """
+    A replacement for GInput that plays back the keys of a replay.
+
+    Before each step, apply must be called with the number of steps run so far.
+    It applies every event up to that step: keys events change the keys held
+    down, and frog events put the frog back in play.
+
+    Attribute key_count: The number of keys held down
+    Invariant: key_count is an int >= 0
+    """
+    # HIDDEN ATTRIBUTES
+    # Attribute _events: The events of the replay
+    # Invariant: _events is a list of (tick,code,position) tuples
+    #
+    # Attribute _next: The index of the first event not applied yet
+    # Invariant: _next is an int between 0 and len(_events)
+    #
+    # Attribute _mask: The arrow keys held down
+    # Invariant: _mask is an int with one bit for each key of REPLAY_KEYS
+
+    def __init__(self,replay):
+        """
+        Initializes the input at the start of replay.
+
+        Parameter replay: the replay to play back
+        Precondition: replay is a Replay
+        """
+        self._events = replay.getevents()
+        self._next = 0
+        self._mask = 0
+        self.key_count = 0
+
+    def is_key_down(self,key):
+        """
+        Returns True if key is held down.
+
+        Parameter key: The key name
+        Precondition: key is a string
+        """
+        if key in REPLAY_KEYS:
+            return (self._mask >> REPLAY_KEYS.index(key)) & 1 == 1
+        return False
+
+    def apply(self,tick,target):
+        """
+        Applies every event up to step tick.
+
+        Frog events call target.setfrog, so target may be a Simulation or a
+        Level. This returns True if a frog event was applied.
+
+        Parameter tick: the number of steps run so far
+        Precondition: tick is an int >= 0
+
+        Parameter target: what the frog is put back in play in
+        Precondition: target has a method setfrog(x,y)
+        """
+        result = False
+        while self._next < len(self._events) and self._events[self._next][0] <= tick:
+            event = self._events[self._next]
+            if event[1] == REPLAY_FROG:
+                target.setfrog(*event[2])
+                result = True
+            elif event[1] != REPLAY_END:
+                self._mask = event[1]
+                self.key_count = bin(self._mask).count('1')
+            self._next += 1
+        return result
+
+    def finished(self):
+        """
+        Returns True if every event has been applied.
+        """
+        return self._next >= len(self._events)
+
+
+def loadreplay(filename):
+    """
+    Returns the Replay in the file filename, or None if it is not a replay.
+
+    A replay cut off in the middle of an event (by a crash) is read up to the
+    last whole event.
+
+    Parameter filename: the replay file
+    Precondition: filename is a string
+    """
+    with open(filename,'rb') as file:
+        data = file.read()
+    if len(data) < REPLAY_HEADER.size:
+        return None
+    (magic,version,tickrate,endless,seed,frogspeed,digest,
+     shapehash) = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        return None
+
+    events = []
+    pos = REPLAY_HEADER.size
+    while pos+REPLAY_EVENT.size <= len(data):
+        tick, code = REPLAY_EVENT.unpack_from(data,pos)
+        pos += REPLAY_EVENT.size
+        point = None
+        if code == REPLAY_FROG:
+            if pos+REPLAY_POINT.size > len(data):
+                break
+            point = REPLAY_POINT.unpack_from(data,pos)
+            pos += REPLAY_POINT.size
+        events.append((tick,code,point))
+    return Replay(digest,shapehash,seed if endless else None,tickrate,frogspeed,
+        events)
+
+
+def replayname(folder=None):
+    """
+    Returns the name of a new replay file, from the current date and time.
+
+    Parameter folder: the folder of the file (REPLAY_FOLDER next to the code if None)
+    Precondition: folder is None or a string
+    """
+    if folder is None:
+        folder = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+            REPLAY_FOLDER)
+    return os.path.join(folder,time.strftime('%Y%m%d-%H%M%S')+
+        '-%d.frr' % os.getpid())
+
+
+def playback(replay,level=None,shapes=None,ticks=None):
+    """
+    Returns the Simulation after playing back replay, without any graphics.
+
+    The game is simulated step by step as fast as possible, at the tick rate it
+    was recorded at. The level, the hitboxes and FROG_SPEED must be the ones the
+    game was played with, which is checked with getmismatch. An endless replay
+    makes its own level from its seed.
+
+    Parameter replay: the replay to play back
+    Precondition: replay is a Replay
+
+    Parameter level: the level that was played (ignored for an endless replay)
+    Precondition: level is a CompiledLevel or a level JSON dictionary, or None
+    for an endless replay
+
+    Parameter shapes: the hitboxes the game was played with (see loadshapes)
+    Precondition: shapes is None or a dictionary mapping strings to (lo,hi) tuples
+
+    Parameter ticks: the number of steps to play (the whole replay if None)
+    Precondition: ticks is None or an int >= 0
+    """
+    if replay.getseed() is None:
+        if not isinstance(level,CompiledLevel):
+            level = compilelevel(level)
+        sim = Simulation(level,shapes)
+    else:
+        level = compilelevel(makelevel(replay.getseed()))
+        sim = EndlessSimulation(replay.getseed(),shapes)
+    mismatch = replay.getmismatch(level.gethash(),sim.getshapehash())
+    if not mismatch is None:
+        raise ValueError(mismatch)
+
+    if ticks is None:
+        ticks = replay.getlength()
+    input = ReplayInput(replay)
+    dt = 1.0/replay.gettickrate()
+    while sim.getticks() < ticks:
+        input.apply(sim.getticks(),sim)
+        sim.update(input,dt)
+    return sim
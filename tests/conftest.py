@@ -0,0 +1,33 @@
+"""
+Test setup shared by every test module.
+
+The game modules are not a package, so the folder with the code is put on the path.
+"""
+import os
+import sys
+
+sys.path.insert(0,os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def small():
+    """
+    Returns a 5x5 level with one lane of each kind.
+
+    Row 0 is grass with the start in column 0. Row 1 is a road with a car that
+    does not move in column 2. Row 2 is water with one log in column 0, moving
+    right at 60 pixels a second. Row 3 is grass. Row 4 is the hedge, with an
+    exit in column 2 and an opening in column 4.
+    """
+    return {'version':1,'size':[5,5],'start':[0,0],'offscreen':1,
+            'lanes':[{'type':'grass'},
+                     {'type':'road','speed':0,
+                      'objects':[{'type':'car1','position':2}]},
+                     {'type':'water','speed':60,
+                      'objects':[{'type':'log2','position':0}]},
+                     {'type':'grass'},
+                     {'type':'hedge',
+                      'objects':[{'type':'exit','position':2},
+                                 {'type':'open','position':4}]}]}
@@ -0,0 +1,72 @@
+"""
+Tests that the level analyzer (analyze.py) follows the rules of the Simulation.
+"""
+from analyze import *
+from bench import makebenchlevel
+
+SHAPES = {'frog1':(-20,20),'car1':(-40,40),'log2':(-64,64)}
+
+
+def play(level,shapes,keys):
+    """
+    Returns the number of frames before the frog is safe when keys are played.
+
+    The result is None if no frog is safe after all of the keys.
+    """
+    sim = Simulation(level,shapes)
+    for frame, key in enumerate(keys):
+        sim.update(ScriptedInput([key]),1.0/TICK_RATE)
+        if sim.getsafe() > 0:
+            return frame+1
+    return None
+
+
+def checkpaths(level,shapes):
+    """
+    Checks that the shortest path to every exit reaches it at the reported time
+    """
+    analyzer = Analyzer(level,shapes)
+    result = analyzer.analyze()
+    assert result['reachable']
+    for exit, info in enumerate(result['exits']):
+        keys = analyzer.getpath(exit)
+        assert len(keys) == round(info['time']*TICK_RATE)
+        assert play(level,shapes,keys) == len(keys)
+
+
+def test_small_paths(small):
+    checkpaths(small,None)
+    checkpaths(small,SHAPES)
+
+
+def test_bench_paths():
+    for seed in range(4):
+        checkpaths(makebenchlevel(10,6,3,seed=seed),SHAPES)
+
+
+def test_no_logs(small):
+    small['lanes'][2]['objects'] = []
+    result = analyzelevel(small)
+    assert result['reachable'] is False
+    assert result['exits'][0]['time'] is None
+    assert result['completion'] is None
+    assert 2 in result['bottlenecks']
+
+
+def test_many_exits():
+    lanes = [{'type':'grass'}]*3
+    lanes.append({'type':'hedge',
+        'objects':[{'type':'exit','position':2*pos+1} for pos in range(ANALYZE_ORDERS+4)]})
+    level = {'version':1,'size':[2*ANALYZE_ORDERS+9,4],'start':[0,0],
+             'offscreen':1,'lanes':lanes}
+    result = analyzelevel(level)
+    assert result['reachable']
+    assert result['exact'] is False
+    assert result['timeout'] is False
+    assert result['completion'] >= max(exit['time'] for exit in result['exits'])
+
+
+def test_budget():
+    result = analyzelevel(makebenchlevel(10,6,3,seed=0),SHAPES,budget=0)
+    assert result['timeout'] is True
+    assert result['exact'] is False
@@ -0,0 +1,70 @@
+"""
+Tests for the batch runner (batch.py).
+"""
+import json
+
+from batch import *
+from batch import _newtotals, _addgame, _summarize
+
+
+def makelevel(exits):
+    """
+    Returns a level of grass with a hedge on top, with an exit in each of exits
+    """
+    return {'version':1,'size':[5,4],'start':[0,0],'offscreen':1,
+            'lanes':[{'type':'grass'}]*3+
+                    [{'type':'hedge','objects':[{'type':'exit','position':pos}
+                                               for pos in exits]}]}
+
+
+def test_playgame_complete():
+    result = playgame(makelevel([0]),{},uppolicy,0,10)
+    assert result['complete']
+    assert result['lives'] == FROG_LIVES
+    assert result['deaths'] == []
+    assert not result['timeout']
+    assert 0 < result['time'] < 10
+
+
+def test_playgame_timeout():
+    result = playgame(makelevel([2]),{},uppolicy,0,5)
+    assert not result['complete']
+    assert result['timeout']
+
+
+def test_playgame_seed(small):
+    results = [playgame(small,{},randompolicy,seed,20) for seed in (1,1,2)]
+    assert results[0] == results[1]
+    for result in results:
+        assert len(result['deaths']) == FROG_LIVES-result['lives']
+        for row, cause in result['deaths']:
+            assert cause in ('road','water','offscreen')
+
+
+def test_script():
+    policy = ScriptPolicy(['right',None]+[None]*20+['right']+[None]*20+['up']*60)
+    result = playgame(makelevel([2]),{},policy,0,10)
+    assert result['complete']
+
+
+def test_pool(small,tmp_path):
+    path = tmp_path/'small.json'
+    path.write_text(json.dumps(small))
+    runs = 2*BATCH_CHUNK+3
+    reports = []
+    for jobs in (1,2):
+        output = tmp_path/('jobs%d.json' % jobs)
+        main([str(path),'--runs',str(runs),'--jobs',str(jobs),'--seconds','20',
+              '--policy','random','--policy','forward','--output',str(output)])
+        reports.append(json.loads(output.read_text()))
+    assert reports[0]['results'] == reports[1]['results']
+
+    for result in reports[0]['results']:
+        totals = _newtotals()
+        policy = getpolicy(result['policy'])
+        for seed in range(runs):
+            _addgame(totals,playgame(small,loadshapes(),policy,seed,20))
+        expected = _summarize(totals)
+        assert result['runs'] == runs
+        for key in expected:
+            assert result[key] == expected[key]
@@ -0,0 +1,58 @@
+"""
+Tests for compiling, caching and unpacking levels in compiler.py.
+"""
+import json
+import os
+
+from compiler import *
+
+
+def same(level1,level2):
+    """
+    Returns True if the compiled levels level1 and level2 hold the same level
+    """
+    if (level1.getsize() != level2.getsize() or
+        level1.getoffscreen() != level2.getoffscreen() or
+        level1.getstart() != level2.getstart() or
+        list(level1.getnames()) != list(level2.getnames()) or
+        level1.getlanecount() != level2.getlanecount()):
+        return False
+    for row in range(level1.getlanecount()):
+        if (level1.getkind(row) != level2.getkind(row) or
+            level1.getspeed(row) != level2.getspeed(row) or
+            list(level1.gettypes(row)) != list(level2.gettypes(row)) or
+            list(level1.getpositions(row)) != list(level2.getpositions(row))):
+            return False
+    return True
+
+
+def test_compile(small):
+    level = compilelevel(small)
+    assert level.getsize() == (5,5)
+    assert level.getstart() == (0,0)
+    assert level.getlanecount() == 5
+    assert level.getspeed(2) == 60
+    assert list(level.getpositions(4)) == [2,4]
+
+
+def test_unpack(small):
+    level = compilelevel(small)
+    copy = unpacklevel(level.tobytes())
+    assert same(level,copy)
+    assert copy.gethash() == level.gethash()
+
+
+def test_cache(small,tmp_path):
+    path = tmp_path/'small.json'
+    path.write_text(json.dumps(small))
+    cache = tmp_path/'cache'
+
+    cold = loadlevel(str(path),str(cache))
+    files = os.listdir(str(cache))
+    assert len(files) == 1 and files[0].endswith('.lvl')
+
+    warm = loadlevel(str(path),str(cache))
+    assert os.listdir(str(cache)) == files
+    assert same(cold,compilelevel(small))
+    assert same(warm,cold)
+    assert warm.gethash() == cold.gethash()
@@ -0,0 +1,143 @@
+"""
+Tests for the endless mode (endless.py).
+"""
+import random
+
+from endless import *
+
+DT = 1.0/TICK_RATE
+
+
+def climb(sim,row):
+    """
+    Puts the frog on the grass in row and plays one frame.
+
+    Parameter row: a multiple of ENDLESS_GRASS in the rows in play
+    """
+    sim.setfrog(GRID_SIZE//2,row*GRID_SIZE+GRID_SIZE//2)
+    sim.update(ScriptedInput([None]),DT)
+
+
+def ahead(sim):
+    """
+    Returns the lowest grass row from which new lanes are made
+    """
+    top = sim.getrows()[1]-ENDLESS_AHEAD
+    return -(-top//ENDLESS_GRASS)*ENDLESS_GRASS
+
+
+def wander(sim,frames,seed):
+    """
+    Plays frames frames of random keys, putting the frog back when it dies.
+    """
+    rand = random.Random(seed)
+    for _ in range(frames):
+        if sim.getfrog() is None:
+            climb(sim,sim.getscore()//ENDLESS_GRASS*ENDLESS_GRASS)
+        sim.update(ScriptedInput([rand.choice([None,'up','up','left','right'])]),DT)
+
+
+def samestate(sim1,sim2):
+    """
+    Returns True if the frogs, lives, scores and times of sim1 and sim2 are the same
+    """
+    frog1 = sim1.getfrog()
+    frog2 = sim2.getfrog()
+    if (frog1 is None) != (frog2 is None):
+        return False
+    if not frog1 is None and (frog1.x,frog1.y) != (frog2.x,frog2.y):
+        return False
+    return (sim1.getlives() == sim2.getlives() and
+            sim1.getscore() == sim2.getscore() and
+            sim1.gettime() == sim2.gettime())
+
+
+def samesnapshot(snap1,snap2):
+    """
+    Returns True if the snapshots snap1 and snap2 hold the same state
+    """
+    return all(getattr(snap1,name) == getattr(snap2,name)
+               for name in Snapshot.__slots__)
+
+
+def samelanes(sim1,sim2):
+    """
+    Returns True if the lanes in play in sim1 and sim2 are the same
+    """
+    if sim1.getrows() != sim2.getrows():
+        return False
+    for row in range(*sim1.getrows()):
+        lane1 = sim1.getlane(row)
+        lane2 = sim2.getlane(row)
+        if (lane1.getrow() != row or lane2.getrow() != row or
+            sim1.getkind(row) != sim2.getkind(row) or
+            list(lane1.gettypes()) != list(lane2.gettypes()) or
+            list(lane1.getxs()) != list(lane2.getxs())):
+            return False
+    return True
+
+
+def test_ring():
+    sim = EndlessSimulation(3)
+    assert sim.getrows() == (0,ENDLESS_LANES)
+    climb(sim,20)
+    first, end = sim.getrows()
+    assert first > 0 and end-first == ENDLESS_LANES
+    assert end > 20+ENDLESS_AHEAD
+
+
+def test_seed():
+    sim1 = EndlessSimulation(5)
+    sim2 = EndlessSimulation(5)
+    for sim in (sim1,sim2):
+        climb(sim,25)
+        wander(sim,300,1)
+    assert samestate(sim1,sim2)
+    assert samelanes(sim1,sim2)
+
+
+def test_snapshot_restore():
+    sim = EndlessSimulation(7)
+    climb(sim,20)
+    wander(sim,200,1)
+    snap = sim.snapshot()
+
+    climb(sim,ahead(sim))
+    climb(sim,ahead(sim))
+    wander(sim,200,2)
+    later = sim.snapshot()
+    assert later.extra[0] > snap.extra[0]
+
+    sim.restore(snap)
+    assert samesnapshot(sim.snapshot(),snap)
+    fresh = EndlessSimulation(7)
+    fresh.restore(snap)
+    assert samelanes(sim,fresh)
+
+    climb(sim,ahead(sim))
+    climb(sim,ahead(sim))
+    wander(sim,200,2)
+    assert samesnapshot(sim.snapshot(),later)
+
+
+def test_spares():
+    sim = EndlessSimulation(11)
+    seen = set(sim.getlanes())
+    for step in range(100):
+        climb(sim,ahead(sim))
+        seen.update(sim.getlanes())
+    assert sim.getrows()[0] > 10*ENDLESS_LANES
+    # a lane is only made when every lane of its type is in play
+    assert len(seen) <= len(LANE_TYPES)*ENDLESS_LANES
+
+    for row in range(*sim.getrows()):
+        data = makelane(11,row,ENDLESS_WIDTH)
+        lane = sim.getlane(row)
+        assert lane.getrow() == row
+        assert LANE_TYPES[sim.getkind(row)] == data['type']
+        assert lane.getspeed() == data.get('speed',0)
+        assert list(lane.gettypes()) == [obj['type'] for obj in data.get('objects',[])]
+
+    fresh = EndlessSimulation(11)
+    fresh.restore(sim.snapshot())
+    assert samelanes(sim,fresh)
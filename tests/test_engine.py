@@ -0,0 +1,166 @@
+"""
+Tests for the rules of the headless Simulation in engine.py.
+"""
+from engine import *
+
+DT = 1.0/TICK_RATE
+
+
+def center(col,row):
+    """
+    Returns the (x,y) center of the grid square at col, row
+    """
+    return (col*GRID_SIZE+GRID_SIZE//2,row*GRID_SIZE+GRID_SIZE//2)
+
+
+def step(sim,key=None):
+    """
+    Advances sim by one frame with key held down (no key if None)
+    """
+    sim.update(ScriptedInput([key]),DT)
+
+
+def wait(sim):
+    """
+    Advances sim with no keys until the frog may move again
+    """
+    for _ in range(int(FROG_SPEED*TICK_RATE)+1):
+        step(sim)
+
+
+def test_start(small):
+    sim = Simulation(small)
+    frog = sim.getfrog()
+    assert (frog.x,frog.y) == center(0,0)
+    assert sim.getlives() == FROG_LIVES
+    assert sim.getsafe() == 0
+    assert not sim.exitfill()
+    assert sim.getdeath() is None
+
+
+def test_move_waits_for_cooldown(small):
+    sim = Simulation(small)
+    step(sim,'up')
+    assert (sim.getfrog().x,sim.getfrog().y) == center(0,1)
+    step(sim,'up')
+    assert (sim.getfrog().x,sim.getfrog().y) == center(0,1)
+    wait(sim)
+    step(sim,'right')
+    assert (sim.getfrog().x,sim.getfrog().y) == center(1,1)
+
+
+def test_edges(small):
+    sim = Simulation(small)
+    step(sim,'left')
+    assert (sim.getfrog().x,sim.getfrog().y) == center(0,0)
+    step(sim,'down')
+    assert (sim.getfrog().x,sim.getfrog().y) == center(0,0)
+
+
+def test_car_kills(small):
+    sim = Simulation(small)
+    sim.setfrog(*center(2,0))
+    step(sim,'up')
+    step(sim)
+    assert sim.getfrog() is None
+    assert sim.getlives() == FROG_LIVES-1
+    assert sim.getdeath() == (1,'road')
+
+
+def test_water_kills(small):
+    sim = Simulation(small)
+    sim.setfrog(*center(3,1))
+    step(sim,'up')
+    step(sim)
+    assert sim.getfrog() is None
+    assert sim.getlives() == FROG_LIVES-1
+    assert sim.getdeath() == (2,'water')
+
+
+def test_log_carries(small):
+    sim = Simulation(small)
+    sim.setfrog(*center(0,1))
+    step(sim,'up')
+    x = sim.getfrog().x
+    for frame in range(1,11):
+        step(sim)
+        assert sim.getfrog().x == x+60*DT*frame
+    assert sim.getdeath() is None
+
+
+def test_exit(small):
+    sim = Simulation(small)
+    sim.setfrog(*center(2,3))
+    step(sim,'up')
+    step(sim)
+    assert sim.getfrog() is None
+    assert sim.getsafe() == 1
+    assert sim.exitfill()
+    assert sim.getlives() == FROG_LIVES
+
+
+def test_hedge_pushes_back(small):
+    sim = Simulation(small)
+    sim.setfrog(*center(0,3))
+    step(sim,'up')
+    step(sim)
+    assert (sim.getfrog().x,sim.getfrog().y) == center(0,3)
+    assert sim.getsafe() == 0
+
+
+def test_snapshot_restore(small):
+    sim = Simulation(small)
+    keys = ['up']+[None]*20+['up']+[None]*5
+    sim.run(ScriptedInput(keys),DT,len(keys))
+    snap = sim.snapshot()
+    later = ['right']+[None]*20+['up']+[None]*30
+    sim.run(ScriptedInput(later),DT,len(later))
+    first = sim.snapshot()
+
+    sim.restore(snap)
+    again = sim.snapshot()
+    for name in Snapshot.__slots__:
+        assert getattr(again,name) == getattr(snap,name)
+
+    sim.run(ScriptedInput(later),DT,len(later))
+    second = sim.snapshot()
+    for name in Snapshot.__slots__:
+        assert getattr(second,name) == getattr(first,name)
+
+
+def test_filled_exits():
+    level = {'version':1,'size':[7,3],'start':[0,0],'offscreen':1,
+             'lanes':[{'type':'grass'},{'type':'grass'},
+                      {'type':'hedge',
+                       'objects':[{'type':'exit','position':pos}
+                                  for pos in (0,3,6)]}]}
+    sim = Simulation(level)
+    for filled, col in enumerate((3,0,6)):
+        sim.setfrog(*center(col,1))
+        step(sim,'up')
+        assert sim.getfrog() is None
+        sim.setfrog(*center(col,1))
+        wait(sim)
+        step(sim,'up')
+        assert (sim.getfrog().x,sim.getfrog().y) == center(col,1)
+        assert sim.getsafe() == filled+1
+        wait(sim)
+    assert sim.getsafe() == 3
+    assert sim.exitfill()
+
+
+def test_used_exit():
+    level = {'version':1,'size':[12,2],'start':[0,0],'offscreen':1,
+             'lanes':[{'type':'grass'},
+                      {'type':'hedge',
+                       'objects':[{'type':'exit','position':pos}
+                                  for pos in (0,1,4,10)]}]}
+    hedge = Simulation(level).getlanes()[1]
+    frogbox = (-20,20)
+    width = frogbox[1]-frogbox[0]
+    for x in (5.0,70.0,300.5,700.0):
+        assert hedge.contfrg(SimFrog(x,96.0),frogbox)
+    safe = [frog[0] for frog in hedge.getsafefrogs()]
+    for x in range(-64,12*GRID_SIZE+64):
+        near = any(abs(pos-x) < width for pos in safe)
+        assert hedge.usedexit(SimFrog(x,96.0),frogbox) == near
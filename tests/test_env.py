@@ -0,0 +1,97 @@
+"""
+Tests that VecEnv plays its games exactly like separate Envs (env.py).
+"""
+import random
+
+import pytest
+
+from env import Env, VecEnv, ENV_ACTIONS, GRID_SIZE, FROG_LIVES
+
+numpy = pytest.importorskip('numpy')
+
+WAIT, LEFT, RIGHT, UP, DOWN = range(len(ENV_ACTIONS))
+
+
+def play(level,scripts,shapes=None,seconds=5):
+    """
+    Returns the Envs after playing each script in one game of a VecEnv and in an Env.
+
+    Every frame, the rewards, dones and observations of the two must be the same.
+    A script is a list of actions, and all of the scripts have the same length.
+    """
+    vec = VecEnv(level,len(scripts),shapes,seconds)
+    envs = [Env(level,shapes,seconds) for _ in scripts]
+    first = vec.reset()
+    for game in range(len(scripts)):
+        assert numpy.array_equal(envs[game].reset(),first[game])
+
+    for frame in range(len(scripts[0])):
+        actions = [script[frame] for script in scripts]
+        obs, rewards, dones, info = vec.step(actions)
+        for game in range(len(scripts)):
+            eobs, ereward, edone, einfo = envs[game].step(actions[game])
+            if edone:
+                eobs = envs[game].reset()
+            assert ereward == rewards[game]
+            assert edone == dones[game]
+            assert einfo['safe'] == info['safe'][game]
+            assert numpy.array_equal(eobs,obs[game])
+    return envs
+
+
+def getrow(env):
+    """
+    Returns the row of the frog of env
+    """
+    return int(env.getsim().getfrog().y // GRID_SIZE)
+
+
+def makegrass(rows,exits):
+    """
+    Returns a level of grass, with a hedge on top with an exit in each of exits.
+    """
+    return {'version':1,'size':[5,rows],'start':[0,0],'offscreen':1,
+            'lanes':[{'type':'grass'}]*(rows-1)+
+                    [{'type':'hedge','objects':[{'type':'exit','position':pos}
+                                               for pos in exits]}]}
+
+
+@pytest.mark.parametrize('shapes',[None,{'frog1':(-20,20),'car1':(-40,40)}])
+def test_random(small,shapes):
+    rand = random.Random(1)
+    scripts = [[rand.choice([0,0,1,2,3,3,3,4]) for _ in range(1200)]
+               for _ in range(8)]
+    envs = play(small,scripts,shapes)
+    assert sum(env.getsim().getlives() < FROG_LIVES for env in envs) > 0
+
+
+def test_cooldown():
+    level = makegrass(8,[2])
+    held = [UP]*60
+    tapped = [UP,WAIT]*30
+    late = [WAIT]*20+[UP]*40
+    side = [RIGHT]*30+[LEFT]*30
+    envs = play(level,[held,tapped,late,side])
+    assert 1 < getrow(envs[0]) < 60
+    assert getrow(envs[1]) == getrow(envs[0])
+    assert getrow(envs[2]) < getrow(envs[0])
+    assert getrow(envs[3]) == 0
+    assert envs[3].getsim().getfrog().x == GRID_SIZE//2
+
+
+def test_log_offscreen(small):
+    small['lanes'][2]['speed'] = 120
+    shapes = {'log2':(-96,96)}
+    envs = play(small,[[UP]*20+[WAIT]*200],shapes)
+    sim = envs[0].getsim()
+    assert sim.getdeath() == (2,'offscreen')
+    assert sim.getlives() == FROG_LIVES-1
+
+
+def test_filled_exit():
+    level = makegrass(4,[0,2])
+    envs = play(level,[[UP]*150],seconds=10)
+    sim = envs[0].getsim()
+    assert sim.getsafe() == 1
+    assert sim.getlives() == FROG_LIVES
+    assert getrow(envs[0]) == 2
@@ -0,0 +1,50 @@
+"""
+Tests for the frame profiler (profiler.py).
+"""
+import json
+
+from profiler import *
+from profiler import _percentile
+
+
+def test_ring_buffer():
+    buffer = RingBuffer(4)
+    assert len(buffer) == 0
+    assert buffer.getvalues() == []
+    for value in range(1,4):
+        buffer.add(value)
+    assert len(buffer) == 3
+    assert sorted(buffer.getvalues()) == [1,2,3]
+    for value in range(4,11):
+        buffer.add(value)
+    assert len(buffer) == 4
+    assert sorted(buffer.getvalues()) == [7,8,9,10]
+
+
+def test_percentile():
+    values = list(range(1,101))
+    assert _percentile(values,50) == 50
+    assert _percentile(values,95) == 95
+    assert _percentile(values,99) == 99
+    assert _percentile(values,100) == 100
+    assert _percentile(values,0) == 1
+    assert _percentile([5],50) == 5
+    assert _percentile([1,2,3],50) == 2
+
+
+def test_stats(tmp_path):
+    profiler = FrameProfiler(10)
+    for ms in range(1,26):
+        profiler.record('update',ms/1000)
+    profiler.record('draw',0.004)
+    assert profiler.getphases() == ['update','draw']
+    stats = profiler.getstats('update')
+    assert stats['count'] == 10
+    assert abs(stats['mean']-20.5) < 1e-9
+    assert abs(stats['p50']-20) < 1e-9
+    assert abs(stats['max']-25) < 1e-9
+
+    path = tmp_path/'profile.json'
+    profiler.dump(str(path))
+    data = json.loads(path.read_text())
+    assert 'update' in json.dumps(data)
@@ -0,0 +1,68 @@
+"""
+Tests that a recorded game plays back to the same state (replay.py).
+"""
+import random
+
+import pytest
+
+from replay import *
+
+DT = 1.0/TICK_RATE
+SHAPES = {'car1':(-40,40)}
+
+
+def record(level,filename,frames,every=50):
+    """
+    Returns the states of a game of frames random moves recorded to filename.
+
+    The frog is put back at the start whenever it dies or reaches an exit. The
+    result maps the tick of every every-th step (and of the end) to a state.
+    """
+    sim = Simulation(level,SHAPES)
+    recorder = Recorder(filename,compilelevel(level).gethash(),sim.getshapehash())
+    sim.setrecorder(recorder)
+    rand = random.Random(0)
+    snaps = {}
+    for _ in range(frames):
+        if sim.getticks() % every == 0:
+            snaps[sim.getticks()] = state(sim)
+        if sim.getfrog() is None and not sim.nolives():
+            sim.setfrog(GRID_SIZE//2,GRID_SIZE//2)
+        sim.update(ScriptedInput([rand.choice([None,'up','left','right'])]),DT)
+    recorder.finish(sim.getticks())
+    snaps[sim.getticks()] = state(sim)
+    return snaps
+
+
+def state(sim):
+    """
+    Returns the state of sim as a tuple that can be compared
+    """
+    frog = sim.getfrog()
+    lanes = []
+    for lane in sim.getlanes():
+        lanes.append(list(lane.getxs()))
+        if isinstance(lane,SimHedge):
+            lanes.append(list(lane.getsafefrogs()))
+    return (sim.getticks(),sim.gettime(),sim.getlives(),
+            None if frog is None else (frog.x,frog.y,frog.angle),lanes)
+
+
+def test_playback(small,tmp_path):
+    filename = str(tmp_path/'game.frr')
+    snaps = record(small,filename,600)
+    replay = loadreplay(filename)
+    assert replay.getlength() == 600
+
+    for ticks in sorted(snaps):
+        sim = playback(replay,small,SHAPES,ticks)
+        assert sim.getticks() == ticks
+        assert state(sim) == snaps[ticks]
+    assert state(playback(replay,small,SHAPES)) == snaps[600]
+
+
+def test_other_shapes(small,tmp_path):
+    filename = str(tmp_path/'game.frr')
+    record(small,filename,60)
+    with pytest.raises(ValueError):
+        playback(loadreplay(filename),small,{})